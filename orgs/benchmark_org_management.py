@@ -0,0 +1,253 @@
+# Benchmarks for org_management.py:
+# - micro benchmarks comparing optimized code paths with their previous implementation
+# - generation suite with wall time and peak memory of all generation phases on a synthetic project (see synthetic_project.py)
+#
+# Usage: python -m benchmark_org_management [-n NUMBER] [--orgs N] [--wgs M] [--areas K] [--repos R] [--users U] [--json-out FILE]
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import platform
+import random
+import tempfile
+import time
+import timeit
+import tracemalloc
+import jsonschema
+import yaml
+from typing import Any, Callable, Dict
+from org_management import OrgGenerator, WorkingGroup, _SCRIPT_PATH
+from synthetic_project import generate_project, synthetic_wg
+
+
+def _project_inputs():
+    org_cfg = OrgGenerator._read_yml_file(f"{_SCRIPT_PATH}/orgs.yml", lambda x: x)
+    contributors = OrgGenerator._read_yml_file(f"{_SCRIPT_PATH}/contributors.yml", lambda x: x)
+    branch_protection = OrgGenerator._read_yml_file(f"{_SCRIPT_PATH}/branchprotection.yml", lambda x: x)
+    wgs = []
+    for wg_file in glob.glob(f"{_SCRIPT_PATH}/../toc/working-groups/*.md") + [f"{_SCRIPT_PATH}/../toc/TOC.md"]:
+        wg = OrgGenerator._read_wg_charter(wg_file)
+        if wg:
+            wgs.append(wg)
+    return org_cfg, contributors, branch_protection, wgs
+
+
+def bench_validation(number: int):
+    org_cfg, contributors, branch_protection, wgs = _project_inputs()
+
+    def validate_per_call():
+        jsonschema.validate(org_cfg, OrgGenerator._GITHUB_ORG_CFG_SCHEMA)
+        jsonschema.validate(contributors, OrgGenerator._CONTRIBUTORS_SCHEMA)
+        jsonschema.validate(branch_protection, OrgGenerator._BRANCH_PROTECTION_SCHEMA)
+        for wg in wgs:
+            jsonschema.validate(wg, OrgGenerator._WG_SCHEMA)
+
+    def validate_precompiled():
+        OrgGenerator._validate_github_org_cfg(org_cfg)
+        OrgGenerator._validate_contributors(contributors)
+        OrgGenerator._validate_branch_protection(branch_protection)
+        for wg in wgs:
+            OrgGenerator._validate_wg(wg)
+
+    before = min(timeit.repeat(validate_per_call, number=number, repeat=3)) / number
+    after = min(timeit.repeat(validate_precompiled, number=number, repeat=3)) / number
+    print(f"validation of project data ({len(wgs)} charters)")
+    print(f"  jsonschema.validate per call: {before * 1000:8.2f} ms")
+    print(f"  precompiled validators:       {after * 1000:8.2f} ms ({before / after:.1f}x)")
+    return {"charters": len(wgs), "before_seconds": before, "after_seconds": after}
+
+
+# RFC-0015 branch protection as generated before the repo index, for comparison
+def _branch_protection_per_repo_scan(generator: OrgGenerator, wg):
+    org = wg["org"]
+    org_prefix = org + "/"
+    org_prefix_len = len(org_prefix)
+    repos = {r[org_prefix_len:] for a in wg["areas"] for r in a["repositories"] if r.startswith(org_prefix)}
+    wg_name = f"wg-{wg['name']}"
+    wg_bots = OrgGenerator._kebab_case(f"{wg_name}-bots")
+
+    def approvers(repo):
+        return {u["github"] for a in wg["areas"] if org_prefix + repo in a["repositories"] for u in a["approvers"]}
+
+    return {
+        repo: {
+            "protect": True,
+            "enforce_admins": True,
+            "allow_force_pushes": False,
+            "allow_deletions": False,
+            "allow_disabled_policies": True,
+            "include": [f"^{generator._get_default_branch(org, repo)}$", "^v[0-9]*$"],
+            "required_pull_request_reviews": {
+                "dismiss_stale_reviews": True,
+                "require_code_owner_reviews": True,
+                "required_approving_review_count": 0 if len(approvers(repo)) < 4 else 1,
+                "bypass_pull_request_allowances": {
+                    "teams": [wg_bots]
+                    + [
+                        OrgGenerator._kebab_case(f"{wg_name}-{a['name']}-bots")
+                        for a in wg["areas"]
+                        if org_prefix + repo in a["repositories"] and "bots" in a and len(a["bots"]) > 0
+                    ]
+                },
+            },
+        }
+        for repo in repos
+    }
+
+
+def bench_branch_protection(number: int, areas: int = 200, repos: int = 4000):
+    generator = OrgGenerator()
+    users = [f"user-{u}" for u in range(100)]
+    wg_repos = [f"cloudfoundry/repo-{r}" for r in range(repos)]
+    wg = OrgGenerator._validate_wg(synthetic_wg("Synthetic", "cloudfoundry", areas, wg_repos, users, random.Random(0)))
+    assert _branch_protection_per_repo_scan(generator, wg) == generator._generate_wg_branch_protection(wg)
+
+    before = min(timeit.repeat(lambda: _branch_protection_per_repo_scan(generator, wg), number=number, repeat=3)) / number
+    after = min(timeit.repeat(lambda: generator._generate_wg_branch_protection(wg), number=number, repeat=3)) / number
+    print(f"RFC-0015 branch protection of synthetic WG ({areas} areas, {repos} repos)")
+    print(f"  scan of all areas per repo:   {before * 1000:8.2f} ms")
+    print(f"  repo index:                   {after * 1000:8.2f} ms ({before / after:.1f}x)")
+    return {"areas": areas, "repos": repos, "before_seconds": before, "after_seconds": after}
+
+
+# WG role sets as computed from the charter dicts on every generator call before the WorkingGroup model, for comparison
+def _wg_role_sets_from_dicts(wg):
+    leads = {u["github"] for u in wg["execution_leads"]} | {u["github"] for u in wg["technical_leads"]}
+    users = leads | {u["github"] for u in wg["bots"]}
+    for area in wg["areas"]:
+        users |= {u["github"] for key in ["approvers", "reviewers", "bots"] for u in area.get(key) or []}
+    return users, leads
+
+
+def _retained(build: Callable[[], Any]):
+    tracemalloc.start()
+    try:
+        result = build()
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    stats = snapshot.statistics("filename")
+    return result, sum(s.size for s in stats), sum(s.count for s in stats)
+
+
+def bench_wg_model(number: int, wgs: int = 100, areas: int = 10, repos: int = 5000, users: int = 10000):
+    rnd = random.Random(0)
+    logins = [f"user-{u}" for u in range(users)]
+    charters = [
+        json.dumps(synthetic_wg(f"WG {w}", "cloudfoundry", areas, [f"cloudfoundry/repo-{r}" for r in range(w, repos, wgs)], logins, rnd))
+        for w in range(wgs)
+    ]
+    # retained memory and allocated blocks of the parsed charters (json copies, i.e. distinct strings like parsed yaml)
+    dicts, dict_bytes, dict_blocks = _retained(lambda: [json.loads(c) for c in charters])
+
+    def build_models():
+        pool = {}
+        return [WorkingGroup.from_dict(json.loads(c), pool) for c in charters]
+
+    models, model_bytes, model_blocks = _retained(build_models)
+    assert models == dicts
+    assert [(m.user_logins, m.lead_logins) for m in models] == [_wg_role_sets_from_dicts(wg) for wg in dicts]
+
+    # role sets are needed by several generators per run (org members, wg-leads teams, WG teams)
+    before = min(timeit.repeat(lambda: [_wg_role_sets_from_dicts(wg) for wg in dicts], number=number, repeat=3)) / number
+    after = min(timeit.repeat(lambda: [(m.user_logins, m.lead_logins) for m in models], number=number, repeat=3)) / number
+    print(f"in-memory model of synthetic WGs ({wgs} WGs, {areas} areas per WG)")
+    print(f"  charter dicts:                {dict_bytes / 2**20:8.2f} MiB {dict_blocks:10} blocks")
+    print(f"  WorkingGroup model:           {model_bytes / 2**20:8.2f} MiB {model_blocks:10} blocks")
+    print(f"  role sets from dicts:         {before * 1000:8.2f} ms")
+    print(f"  frozen role sets:             {after * 1000:8.2f} ms ({before / after:.1f}x)")
+    return {
+        "wgs": wgs,
+        "areas": areas,
+        "before_bytes": dict_bytes,
+        "after_bytes": model_bytes,
+        "before_blocks": dict_blocks,
+        "after_blocks": model_blocks,
+        "before_seconds": before,
+        "after_seconds": after,
+    }
+
+
+def _generation_phases(generator: OrgGenerator, project_path: str, out_path: str) -> Dict[str, Callable[[], Any]]:
+    return {
+        "load_from_project": lambda: generator.load_from_project(project_path=project_path),
+        "validate_repo_ownership": generator.validate_repo_ownership,
+        "generate_org_members": generator.generate_org_members,
+        "generate_teams": generator.generate_teams,
+        "generate_branch_protection": generator.generate_branch_protection,
+        "write_org_config": lambda: generator.write_org_config(f"{out_path}/orgs.out.yml"),
+        "write_branch_protection": lambda: generator.write_branch_protection(f"{out_path}/branchprotection.out.yml"),
+    }
+
+
+def _run_generation(project_path: str, out_path: str, trace_memory: bool) -> Dict[str, Dict[str, float]]:
+    results = {}
+    generator = OrgGenerator()
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for name, phase in _generation_phases(generator, project_path, out_path).items():
+                if trace_memory:
+                    tracemalloc.reset_peak()
+                    before, _ = tracemalloc.get_traced_memory()
+                    phase()
+                    current, peak = tracemalloc.get_traced_memory()
+                    results[name] = {"peak_memory_bytes": peak - before, "retained_memory_bytes": current - before}
+                else:
+                    start = time.perf_counter()
+                    phase()
+                    results[name] = {"seconds": time.perf_counter() - start}
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return results
+
+
+def bench_generation(number: int, orgs: int, wgs: int, areas: int, repos: int, users: int) -> Dict[str, Any]:
+    managed_orgs = OrgGenerator._MANAGED_ORGS
+    with tempfile.TemporaryDirectory() as tmp:
+        OrgGenerator._MANAGED_ORGS = generate_project(tmp, orgs, wgs, areas, repos, users)
+        try:
+            # timings w/o tracemalloc overhead (best of number runs), memory in an extra run
+            runs = [_run_generation(tmp, tmp, trace_memory=False) for _ in range(number)]
+            memory = _run_generation(tmp, tmp, trace_memory=True)
+        finally:
+            OrgGenerator._MANAGED_ORGS = managed_orgs
+    phases = {name: {"seconds": min(r[name]["seconds"] for r in runs)} | memory[name] for name in memory}
+    print(f"generation of synthetic project ({orgs} orgs, {wgs} WGs, {areas} areas per WG, {repos} repos, {users} users)")
+    for name, result in phases.items():
+        print(f"  {name:28}{result['seconds'] * 1000:10.2f} ms {result['peak_memory_bytes'] / 2**20:10.2f} MiB peak")
+    return {
+        "parameters": {"orgs": orgs, "wgs": wgs, "areas": areas, "repos": repos, "users": users},
+        "phases": phases,
+        "total_seconds": sum(p["seconds"] for p in phases.values()),
+        "peak_memory_bytes": max(p["peak_memory_bytes"] for p in phases.values()),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="org_management.py benchmarks")
+    parser.add_argument("-n", "--number", type=int, default=20, help="iterations per measurement")
+    parser.add_argument("--orgs", type=int, default=2, help="number of github orgs of the synthetic project")
+    parser.add_argument("--wgs", type=int, default=50, help="number of working groups of the synthetic project")
+    parser.add_argument("--areas", type=int, default=10, help="number of areas per working group of the synthetic project")
+    parser.add_argument("--repos", type=int, default=5000, help="number of repositories of the synthetic project")
+    parser.add_argument("--users", type=int, default=10000, help="number of users of the synthetic project")
+    parser.add_argument("--json-out", help="output file for machine readable results")
+    args = parser.parse_args()
+
+    results = {
+        "environment": {"python": platform.python_version(), "pyyaml": yaml.__version__, "libyaml": yaml.__with_libyaml__},
+        "micro": {
+            "validation": bench_validation(args.number),
+            "branch_protection": bench_branch_protection(max(1, args.number // 10)),
+            "wg_model": bench_wg_model(args.number),
+        },
+        "generation": bench_generation(max(1, args.number // 10), args.orgs, args.wgs, args.areas, args.repos, args.users),
+    }
+    if args.json_out:
+        with open(args.json_out, "w") as stream:
+            json.dump(results, stream, indent=2)
@@ -0,0 +1,76 @@
+# Load test of InactiveUserHandler against the local Github API stand-in (see github_stand_in.py):
+# throughput of an inactive user scan for a synthetic org with configurable latency, errors and rate limits
+#
+# Usage: python -m benchmark_org_user_management [--members N] [--latency SECONDS] [--latency-per-user SECONDS] [--error-rate SHARE]
+#                                               [--workers W] [--batchsize B] [--json-out FILE]
+
+import argparse
+import contextlib
+import io
+import json
+import time
+from typing import Any, Dict
+from github_stand_in import GitHubStandIn, synthetic_members
+from org_user_management import InactiveUserHandler
+
+_ACTIVITY_DATE = "2024-01-01T00:00:00Z"
+
+
+def bench_inactive_user_scan(
+    members: int, latency: float, latency_per_user: float, error_rate: float, workers: int, batch_size: int
+) -> Dict[str, Any]:
+    org_members = synthetic_members(members, inactive_before=_ACTIVITY_DATE)
+    expected = {login for login, last_active in org_members.items() if last_active is None or last_active < _ACTIVITY_DATE}
+    with GitHubStandIn(org_members, latency=latency, latency_per_user=latency_per_user, error_rate=error_rate) as stand_in:
+        handler = InactiveUserHandler(
+            "org", "org-id", _ACTIVITY_DATE, "token", graphql_url=stand_in.graphql_url, max_workers=workers, batch_size=batch_size
+        )
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            inactive_users = handler.get_inactive_users()
+        seconds = time.perf_counter() - start
+    assert inactive_users == expected
+    result = {
+        "parameters": {
+            "members": members,
+            "latency": latency,
+            "latency_per_user": latency_per_user,
+            "error_rate": error_rate,
+            "workers": workers,
+            "batch_size": batch_size,
+        },
+        "seconds": seconds,
+        "users_per_second": members / seconds,
+        "inactive_users": len(inactive_users),
+        "server_requests": stand_in.requests,
+        "injected_errors": stand_in.errors,
+        "scheduler": handler.scheduler.counters(),
+    }
+    setup = f"{latency * 1000:.0f} ms latency, {error_rate:.0%} errors, {workers} workers, batch size {batch_size}"
+    print(f"inactive user scan ({members} members, {setup})")
+    print(f"  {seconds:8.2f} s {members / seconds:10.1f} users/s {stand_in.requests:8d} requests {handler.scheduler.retries:6d} retries")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="org_user_management.py benchmarks")
+    parser.add_argument("--members", type=int, default=5000, help="number of org members")
+    parser.add_argument("--latency", type=float, default=0.05, help="latency per request in seconds")
+    parser.add_argument("--latency-per-user", type=float, default=0.002, help="additional latency per user of an activity query in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="share of requests failing with 502")
+    parser.add_argument("--workers", type=int, default=InactiveUserHandler._MAX_WORKERS, help="number of concurrent requests")
+    parser.add_argument(
+        "--batchsize", type=int, default=InactiveUserHandler._ACTIVITY_BATCH_SIZE, help="number of users per activity query"
+    )
+    parser.add_argument("--json-out", help="output file for machine readable results")
+    args = parser.parse_args()
+
+    results = {
+        "sequential": bench_inactive_user_scan(args.members, args.latency, args.latency_per_user, args.error_rate, 1, 1),
+        "concurrent_batched": bench_inactive_user_scan(
+            args.members, args.latency, args.latency_per_user, args.error_rate, args.workers, args.batchsize
+        ),
+    }
+    if args.json_out:
+        with open(args.json_out, "w") as stream:
+            json.dump(results, stream, indent=2)
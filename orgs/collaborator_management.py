@@ -0,0 +1,153 @@
+# Removes direct (individual) collaborators from the repositories of all working groups,
+# access to WG repositories shall be governed by the generated teams only (see org_management.py)
+#
+# Repositories are audited concurrently over a shared session, collaborator lists are fetched with conditional requests
+# (ETag) so that unchanged repositories don't count against the rate limit.
+
+import argparse
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from github_api import RequestScheduler
+from org_management import OrgGenerator
+
+
+class DirectCollaboratorHandler:
+    _API_URL = "https://api.github.com"
+    _MAX_WORKERS = 16
+    _PAGE_SIZE = 100
+
+    def __init__(
+        self,
+        github_org: str,
+        github_token: str,
+        api_url: str = _API_URL,
+        max_workers: int = _MAX_WORKERS,
+        etag_cache_path: Optional[str] = None,
+    ):
+        self.github_org = github_org
+        self.api_url = api_url
+        self.max_workers = max_workers
+        self.etag_cache_path = etag_cache_path
+        # collaborators page url -> {"etag": ..., "collaborators": [...], "next": ...}
+        self.etag_cache: Dict[str, Dict] = {}
+        if etag_cache_path and os.path.exists(etag_cache_path):
+            with open(etag_cache_path, "r") as stream:
+                self.etag_cache = json.load(stream)
+        self.unchanged_pages = 0
+        self._lock = threading.Lock()
+        headers = {"Authorization": f"Bearer {github_token}", "Accept": "application/vnd.github+json"}
+        self.scheduler = RequestScheduler(headers, pool_size=max_workers)
+
+    def get_wg_repos(self, working_groups: List[Dict]) -> List[str]:
+        prefix = f"{self.github_org}/"
+        return sorted({r for wg in working_groups for a in wg.get("areas", []) for r in a.get("repositories", []) if r.startswith(prefix)})
+
+    def _get_page(self, url: str) -> Tuple[List[str], Optional[str]]:
+        cached = self.etag_cache.get(url)
+        headers = {"If-None-Match": cached["etag"]} if cached else {}
+        response = self.scheduler.get(url, headers=headers)
+        if response.status_code == 304:
+            with self._lock:
+                self.unchanged_pages += 1
+            return cached["collaborators"], cached["next"]
+        if response.status_code != 200:
+            raise Exception(f"Request {url} failed with status code of {response.status_code}. {response.text}")
+        collaborators = [c["login"] for c in response.json()]
+        next_url = response.links.get("next", {}).get("url")
+        if "ETag" in response.headers:
+            self.etag_cache[url] = {"etag": response.headers["ETag"], "collaborators": collaborators, "next": next_url}
+        return collaborators, next_url
+
+    def get_direct_collaborators(self, repo: str) -> List[str]:
+        collaborators = []
+        url = f"{self.api_url}/repos/{repo}/collaborators?affiliation=direct&per_page={self._PAGE_SIZE}"
+        while url:
+            page, url = self._get_page(url)
+            collaborators += page
+        return collaborators
+
+    def _remove_collaborator(self, repo: str, user: str) -> bool:
+        response = self.scheduler.delete(f"{self.api_url}/repos/{repo}/collaborators/{user}")
+        if response.status_code != 204:
+            print(f"Failed to remove {user} from {repo} with status code of {response.status_code}. {response.text}")
+            return False
+        print(f"Removed {user} from {repo}")
+        return True
+
+    # removes the direct collaborators of the repos unless dry_run,
+    # returns {repo: {"removed"|"failed"|"found": [users]}} of all repos with direct collaborators
+    def remove_direct_collaborators(self, repos: List[str], dry_run: bool = False) -> Dict[str, Dict[str, List[str]]]:
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # audit of all repos first, deletions are submitted as one batch afterwards
+            audits = dict(zip(repos, executor.map(self.get_direct_collaborators, repos)))
+            direct_collaborators = {repo: users for repo, users in audits.items() if users}
+            removals = [(repo, user) for repo, users in direct_collaborators.items() for user in users]
+            if dry_run:
+                results = [False] * len(removals)
+            else:
+                results = list(executor.map(lambda removal: self._remove_collaborator(*removal), removals))
+
+        report = {}
+        for (repo, user), removed in zip(removals, results):
+            state = "found" if dry_run else ("removed" if removed else "failed")
+            report.setdefault(repo, {}).setdefault(state, []).append(user)
+            if removed:
+                # collaborator list changed, next audit needs a full request
+                self._invalidate(repo)
+        self._save_etag_cache()
+        return report
+
+    def _invalidate(self, repo: str):
+        prefix = f"{self.api_url}/repos/{repo}/collaborators"
+        for url in [u for u in self.etag_cache if u.startswith(prefix)]:
+            del self.etag_cache[url]
+
+    def _save_etag_cache(self):
+        if self.etag_cache_path:
+            tmp_path = f"{self.etag_cache_path}.tmp"
+            with open(tmp_path, "w") as stream:
+                json.dump(self.etag_cache, stream)
+            os.replace(tmp_path, self.etag_cache_path)
+
+    def get_summary(self, repos: List[str], report: Dict[str, Dict[str, List[str]]], dry_run: bool) -> str:
+        lines = [
+            f"Audited {len(repos)} repositories of org '{self.github_org}' ({self.unchanged_pages} unchanged collaborator pages)",
+            f"Repositories with direct collaborators: {len(report)}",
+        ]
+        for repo, entry in sorted(report.items()):
+            for state, users in sorted(entry.items()):
+                lines.append(f"- {repo}: {state} {', '.join(sorted(users))}")
+        if dry_run:
+            lines.append("Dry-run mode, no collaborators removed.")
+        lines.append(f"Github API usage: {self.scheduler.counters()}")
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Remove direct collaborators from working group repositories")
+    parser.add_argument("-go", "--githuborg", default="cloudfoundry", help="Github org name")
+    parser.add_argument(
+        "-gt", "--githubtoken", default=os.environ.get("GH_TOKEN"), help="Github API access token. Supported also as env var 'GH_TOKEN'"
+    )
+    parser.add_argument("-dr", "--dryrun", action="store_true", help="Report direct collaborators without removing them")
+    parser.add_argument(
+        "-w", "--workers", type=int, default=DirectCollaboratorHandler._MAX_WORKERS, help="Number of concurrent Github API requests"
+    )
+    parser.add_argument(
+        "-ec",
+        "--etagcache",
+        default=os.environ.get("COLLABORATOR_MANAGEMENT_ETAG_CACHE"),
+        help="ETag cache file for conditional requests. Supported also as env var 'COLLABORATOR_MANAGEMENT_ETAG_CACHE'",
+    )
+    args = parser.parse_args()
+
+    handler = DirectCollaboratorHandler(args.githuborg, args.githubtoken, max_workers=args.workers, etag_cache_path=args.etagcache)
+    repos = handler.get_wg_repos(json.loads(OrgGenerator.export_working_groups()))
+    report = handler.remove_direct_collaborators(repos, args.dryrun)
+    print(handler.get_summary(repos, report, args.dryrun))
+    if any("failed" in entry for entry in report.values()):
+        exit(1)
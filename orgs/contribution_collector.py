@@ -0,0 +1,225 @@
+# Collects the possible contributions of a user to the areas of a working group (e.g. for promotion cases, see RFC-0008)
+# and summarizes them per area in a gist (formerly toc/working-groups/contributions-for-user.sh):
+# - PRs commented on/reviewed (user events)
+# - issues created by or mentioning the user, issues commented on (user events)
+# - commits authored or committed by the user
+#
+# All repositories of the working group are queried concurrently, responses are cached on disk per repo, user and since date.
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote, urlencode
+
+from github_api import RequestScheduler
+from org_management import OrgGenerator
+
+
+class ContributionCollector:
+    _API_URL = "https://api.github.com"
+    _MAX_WORKERS = 16
+    _PAGE_SIZE = 100
+    _CACHE_TTL_HOURS = 24.0
+    # (kind, repo endpoint, user query parameter)
+    _REPO_QUERIES = [
+        ("commits_author", "commits", "author"),
+        ("commits_committer", "commits", "committer"),
+        ("issues_creator", "issues", "creator"),
+        ("issues_mentioned", "issues", "mentioned"),
+    ]
+
+    def __init__(
+        self,
+        user: str,
+        github_token: str,
+        since: Optional[str] = None,
+        api_url: str = _API_URL,
+        max_workers: int = _MAX_WORKERS,
+        cache_dir: Optional[str] = None,
+        cache_ttl_hours: float = _CACHE_TTL_HOURS,
+    ):
+        self.user = user
+        self.since = since
+        self.api_url = api_url
+        self.max_workers = max_workers
+        self.cache_dir = cache_dir
+        self.cache_ttl_hours = cache_ttl_hours
+        self.cache_hits = 0
+        self._lock = threading.Lock()
+        headers = {"Authorization": f"Bearer {github_token}", "Accept": "application/vnd.github+json"}
+        self.scheduler = RequestScheduler(headers, pool_size=max_workers)
+
+    def _cache_path(self, repo: Optional[str], kind: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        key = hashlib.sha256(json.dumps([self.api_url, repo, self.user, self.since, kind]).encode()).hexdigest()
+        return os.path.join(self.cache_dir, (repo or "users").replace("/", "_"), self.user, f"{kind}-{self.since or 'all'}-{key[:16]}.json")
+
+    # all pages of a list endpoint, [] if the repo doesn't exist, None on other errors (e.g. not accessible, server errors)
+    def _get_all(self, url: str, params: Dict[str, str]) -> Optional[List[Any]]:
+        items = []
+        url = f"{url}?{urlencode(params | {'per_page': self._PAGE_SIZE})}"
+        while url:
+            response = self.scheduler.get(url)
+            if response.status_code == 404 and not items:
+                print(f"Ignoring {url}, not found", file=sys.stderr)
+                return []
+            if response.status_code != 200:
+                print(f"Ignoring {url}, request failed with status code of {response.status_code}", file=sys.stderr)
+                return None
+            items += response.json()
+            url = response.links.get("next", {}).get("url")
+        return items
+
+    def _get_cached(self, repo: Optional[str], kind: str, url: str, params: Dict[str, str]) -> List[Any]:
+        path = self._cache_path(repo, kind)
+        if path and os.path.exists(path) and time.time() - os.path.getmtime(path) < self.cache_ttl_hours * 3600:
+            with self._lock:
+                self.cache_hits += 1
+            with open(path, "r") as stream:
+                return json.load(stream)
+        items = self._get_all(url, params)
+        if items is None:
+            # failed or partial results are not cached
+            return []
+        if path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "w") as stream:
+                json.dump(items, stream)
+            os.replace(tmp_path, path)
+        return items
+
+    def get_events(self) -> List[Any]:
+        return self._get_cached(None, "events", f"{self.api_url}/users/{self.user}/events", {})
+
+    def _get_repo_items(self, repo: str, kind: str, endpoint: str, user_param: str) -> List[Any]:
+        params = {user_param: self.user}
+        if endpoint == "issues":
+            params["state"] = "all"
+        if self.since:
+            params["since"] = self.since
+        return self._get_cached(repo, kind, f"{self.api_url}/repos/{repo}/{endpoint}", params)
+
+    # {repo: {kind: [items]}} for all repos, fetched concurrently
+    def collect(self, repos: List[str]) -> Dict[str, Dict[str, List[Any]]]:
+        tasks = [(repo, kind, endpoint, user_param) for repo in repos for kind, endpoint, user_param in self._REPO_QUERIES]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            events = executor.submit(self.get_events)
+            results = list(executor.map(lambda task: self._get_repo_items(*task), tasks))
+        contributions = {repo: {"events": events.result()} for repo in repos}
+        for (repo, kind, _, _), items in zip(tasks, results):
+            contributions[repo][kind] = items
+        return contributions
+
+    @staticmethod
+    def _line(date: str, title: str, url: str) -> str:
+        return f"- {date}: [{title}]({url})"
+
+    def _pr_lines(self, repo: str, events: List[Any]) -> List[str]:
+        lines = []
+        for e in events:
+            if e["repo"]["name"] != repo:
+                continue
+            pr = e.get("payload", {}).get("pull_request")
+            if e["type"] == "PullRequestReviewEvent" or (e["type"] == "PullRequestReviewCommentEvent" and pr["user"]["login"] != self.user):
+                lines.append(self._line(pr["created_at"], pr["title"], pr["html_url"]))
+        return lines
+
+    def _issue_lines(self, repo: str, items: Dict[str, List[Any]]) -> List[str]:
+        lines = [self._line(i["created_at"], i["title"], i["html_url"]) for i in items["issues_creator"] + items["issues_mentioned"]]
+        for e in items["events"]:
+            issue = e.get("payload", {}).get("issue")
+            if e["type"] == "IssueCommentEvent" and e["repo"]["name"] == repo and issue["user"]["login"] != self.user:
+                lines.append(self._line(issue["created_at"], issue["title"], issue["html_url"]))
+        return lines
+
+    def _commit_lines(self, items: Dict[str, List[Any]]) -> List[str]:
+        return [
+            self._line(c["commit"][role]["date"], c["commit"]["message"].split("\n")[0], c["html_url"])
+            for role in ["author", "committer"]
+            for c in items[f"commits_{role}"]
+        ]
+
+    # markdown summary of the contributions to the repos of an area
+    def render_area(self, wg_name: str, area: Dict[str, Any], contributions: Dict[str, Dict[str, List[Any]]]) -> str:
+        repos = [r for r in area.get("repositories", []) if r in contributions]
+        sections = [
+            ("PRs Commented on/Reviewed", [line for r in repos for line in self._pr_lines(r, contributions[r]["events"])]),
+            ("Issues that may be relevant", [line for r in repos for line in self._issue_lines(r, contributions[r])]),
+            ("Code contributions", [line for r in repos for line in self._commit_lines(contributions[r])]),
+        ]
+        body = [f"# {wg_name}: {area['name']} Contributions"]
+        for title, lines in sections:
+            body += [f"### {title}:"] + sorted(set(lines))
+        return "\n".join(body) + "\n\n"
+
+    @staticmethod
+    def gist_file_name(wg_name: str, area_name: str) -> str:
+        # uri safe, but readable: spaces kept, '(' -> ' ', ')' dropped, '/' -> 'and'
+        name = quote(f"{wg_name} - {area_name}.md", safe="")
+        return name.replace("%20", " ").replace("%28", " ").replace("%29", "").replace("%2F", "and")
+
+    def create_gist(self, description: str, file_name: str, content: str) -> str:
+        response = self.scheduler.post(
+            f"{self.api_url}/gists", json={"description": description, "public": False, "files": {file_name: {"content": content}}}
+        )
+        if response.status_code != 201:
+            raise Exception(f"Gist creation failed with status code of {response.status_code}. {response.text}")
+        return response.json()["html_url"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize possible contributions of a user to the areas of a working group")
+    parser.add_argument("user", help="Github user name")
+    parser.add_argument("workinggroup", nargs="+", help="Working group name")
+    parser.add_argument("-sd", "--sincedate", help="Only contributions since this date in format 'Y-m-dTH:M:SZ'")
+    parser.add_argument(
+        "-gt", "--githubtoken", default=os.environ.get("GH_TOKEN"), help="Github API access token. Supported also as env var 'GH_TOKEN'"
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=ContributionCollector._MAX_WORKERS, help="Number of concurrent Github API requests"
+    )
+    parser.add_argument(
+        "-c",
+        "--cachedir",
+        default=os.path.join(os.environ.get("ORG_MANAGEMENT_CACHE_DIR") or tempfile.gettempdir(), "contributions"),
+        help="Directory for cached Github API responses. Default in 'ORG_MANAGEMENT_CACHE_DIR' or temp dir",
+    )
+    parser.add_argument(
+        "--ttl", type=float, default=ContributionCollector._CACHE_TTL_HOURS, help="Hours until cached Github API responses expire"
+    )
+    parser.add_argument("-o", "--out", help="Write the summaries as markdown files to this directory instead of creating gists")
+    args = parser.parse_args()
+
+    working_groups = {wg["name"]: wg for wg in json.loads(OrgGenerator.export_working_groups())}
+    wg_name = " ".join(args.workinggroup)
+    if wg_name not in working_groups:
+        names = "\n".join(f"- {name}" for name in working_groups)
+        parser.error(f"Working group name must be one of:\n{names}")
+    wg = working_groups[wg_name]
+
+    collector = ContributionCollector(
+        args.user, args.githubtoken, args.sincedate, max_workers=args.workers, cache_dir=args.cachedir, cache_ttl_hours=args.ttl
+    )
+    print(f"Gathering contributions of {args.user} to the repositories of '{wg_name}'...")
+    contributions = collector.collect(sorted({r for area in wg.get("areas", []) for r in area.get("repositories", [])}))
+    print(f"Github API usage: {collector.scheduler.counters()}, {collector.cache_hits} cached responses")
+    for area in wg.get("areas", []):
+        body = collector.render_area(wg_name, area, contributions)
+        file_name = ContributionCollector.gist_file_name(wg_name, area["name"])
+        if args.out:
+            os.makedirs(args.out, exist_ok=True)
+            with open(os.path.join(args.out, file_name), "w") as stream:
+                stream.write(body)
+            print(f"Contributions to '{wg_name}: {area['name']}' have been summarized in {os.path.join(args.out, file_name)}")
+        else:
+            description = f"{args.user}'s Possible Contributions to {wg_name} - {area['name']}"
+            print(f"Contributions have been summarized at {collector.create_gist(description, file_name, body)}")
@@ -0,0 +1,193 @@
+# Github API access shared by the org automation scripts:
+# pooled http session, pacing against the rate limit budget, retries of transient failures with jittered exponential backoff
+#
+# Rate limit information is taken from
+# - X-RateLimit-Limit/Remaining/Reset response headers (REST and GraphQL)
+# - rateLimit { cost remaining resetAt } fields of GraphQL responses
+# - Retry-After headers of secondary rate limit responses
+
+import datetime
+import email.utils
+import random
+import threading
+import time
+import requests
+from typing import Any, Callable, Dict, Optional
+
+
+class RequestScheduler:
+    # transient failures which are retried
+    _RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+    _MAX_RETRIES = 5
+    _BACKOFF_BASE_SECONDS = 1.0
+    _BACKOFF_MAX_SECONDS = 60.0
+    # requests are spread over the time until rate limit reset once less than this share of the budget is left
+    _PACING_THRESHOLD = 0.1
+
+    def __init__(
+        self,
+        headers: Dict[str, str],
+        pool_size: int = 10,
+        max_retries: int = _MAX_RETRIES,
+        backoff_base: float = _BACKOFF_BASE_SECONDS,
+        backoff_max: float = _BACKOFF_MAX_SECONDS,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.time,
+    ):
+        # keep-alive connections shared by all worker threads
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(headers)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.sleep = sleep
+        self.clock = clock
+        self._lock = threading.Lock()
+        # rate limit budget as reported by the last response
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        # counters
+        self.requests = 0
+        self.retries = 0
+        self.cost = 0
+        self.waited_seconds = 0.0
+
+    def counters(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "cost": self.cost,
+            "waited_seconds": round(self.waited_seconds, 3),
+            "remaining": self.remaining,
+        }
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        attempt = 0
+        while True:
+            self._pace()
+            with self._lock:
+                self.requests += 1
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                print(f"Request {method} {url} failed: {e}")
+                self._wait(self._backoff(attempt))
+            else:
+                self._update_rate_limit(response)
+                retry_after = self._retry_after(response, attempt)
+                if retry_after is None or attempt >= self.max_retries:
+                    return response
+                print(f"Request {method} {url} failed with status code {response.status_code}, retrying in {retry_after:.1f}s")
+                self._wait(retry_after)
+                # budget is known again with the next response, the wait already covered the rate limit reset
+                with self._lock:
+                    self.remaining = None
+            attempt += 1
+            with self._lock:
+                self.retries += 1
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", url, **kwargs)
+
+    def _backoff(self, attempt: int) -> float:
+        # full jitter
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def _wait(self, seconds: float):
+        if seconds > 0:
+            with self._lock:
+                self.waited_seconds += seconds
+            self.sleep(seconds)
+
+    def _pace(self):
+        with self._lock:
+            if self.remaining is None or self.reset_at is None:
+                return
+            until_reset = max(0.0, self.reset_at - self.clock())
+            if self.remaining <= 0:
+                delay = until_reset
+            elif self.limit and self.remaining < self.limit * self._PACING_THRESHOLD:
+                delay = until_reset / self.remaining
+            else:
+                delay = 0.0
+            # reserve budget for this request, corrected by the response
+            self.remaining = max(0, self.remaining - 1)
+        self._wait(delay)
+
+    # seconds to wait before retrying the request or None if the response shall not be retried
+    def _retry_after(self, response: requests.Response, attempt: int) -> Optional[float]:
+        secondary_rate_limit = response.status_code == 403 and ("Retry-After" in response.headers or "rate limit" in response.text.lower())
+        if response.status_code in self._RETRY_STATUS_CODES or secondary_rate_limit:
+            if "Retry-After" in response.headers:
+                return self._parse_retry_after(response.headers["Retry-After"], attempt)
+            if response.headers.get("X-RateLimit-Remaining") == "0" and "X-RateLimit-Reset" in response.headers:
+                return max(0.0, float(response.headers["X-RateLimit-Reset"]) - self.clock())
+            return self._backoff(attempt)
+        if response.status_code == 200 and self._graphql_rate_limited(response):
+            return max(self._backoff(attempt), (self.reset_at or 0) - self.clock())
+        return None
+
+    # Retry-After as delay in seconds or as HTTP date (RFC 9110), backoff if neither form parses
+    def _parse_retry_after(self, value: str, attempt: int) -> float:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - self.clock())
+        except (TypeError, ValueError):
+            return self._backoff(attempt)
+
+    # body of graphql responses, REST response bodies are left to the caller
+    @staticmethod
+    def _graphql_body(response: requests.Response) -> Dict[str, Any]:
+        if not response.url.endswith("/graphql") or not response.headers.get("Content-Type", "").startswith("application/json"):
+            return {}
+        try:
+            body = response.json()
+        except ValueError:
+            return {}
+        return body if isinstance(body, dict) else {}
+
+    @staticmethod
+    def _graphql_rate_limited(response: requests.Response) -> bool:
+        errors = RequestScheduler._graphql_body(response).get("errors") or []
+        return any(e.get("type") == "RATE_LIMITED" for e in errors if isinstance(e, dict))
+
+    # graphql: rateLimit { cost remaining resetAt } of the response if the query asked for it
+    @staticmethod
+    def _graphql_rate_limit(response: requests.Response) -> Optional[Dict[str, Any]]:
+        if not response.ok:
+            return None
+        return (RequestScheduler._graphql_body(response).get("data") or {}).get("rateLimit")
+
+    def _update_rate_limit(self, response: requests.Response):
+        headers = response.headers
+        rate_limit = self._graphql_rate_limit(response)
+        with self._lock:
+            if "X-RateLimit-Remaining" in headers:
+                self.remaining = int(headers["X-RateLimit-Remaining"])
+            if "X-RateLimit-Limit" in headers:
+                self.limit = int(headers["X-RateLimit-Limit"])
+            if "X-RateLimit-Reset" in headers:
+                self.reset_at = float(headers["X-RateLimit-Reset"])
+            if rate_limit:
+                self.cost += rate_limit.get("cost", 1)
+                self.remaining = rate_limit.get("remaining", self.remaining)
+                if rate_limit.get("resetAt"):
+                    self.reset_at = datetime.datetime.fromisoformat(rate_limit["resetAt"].replace("Z", "+00:00")).timestamp()
+            elif response.ok and not self._graphql_rate_limited(response):
+                # REST requests cost one point each, rejected requests nothing
+                self.cost += 1
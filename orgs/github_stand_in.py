@@ -0,0 +1,333 @@
+# Local stand-in for the parts of the Github API used by the org automation scripts, for tests and load tests:
+# - GraphQL: rateLimit, organization.membersWithRole (cursor pagination), aliased user(login) with contributionsCollection(from)
+# - REST: GET/DELETE /repos/{owner}/{repo}/collaborators, GET /repos/{owner}/{repo}/commits, GET /repos/{owner}/{repo}/issues,
+#   GET /users/{user}/events (page pagination, ETag), POST /gists
+# Org size, latency, transient errors, secondary and primary rate limits are configurable.
+#
+# Usage: python -m github_stand_in [--port PORT] [--members N] [--inactive SHARE] [--latency SECONDS] [--error-rate SHARE]
+
+import argparse
+import datetime
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
+
+_MEMBERS_RE = re.compile(r'membersWithRole\(first:\s*(\d+),\s*after:\s*(?:null|"([^"]*)")\)')
+_USER_RE = re.compile(r'(\w+):\s*user\(login:\s*"([^"]+)"\)')
+_CONTRIBUTIONS_RE = re.compile(r'(?:(\w+):\s*)?contributionsCollection\(organizationID:\s*"[^"]*",\s*from:\s*"([^"]+)"\)')
+_COLLABORATORS_RE = re.compile(r"^/repos/([^/]+/[^/]+)/collaborators(?:/([^/]+))?$")
+_COMMITS_RE = re.compile(r"^/repos/([^/]+/[^/]+)/commits$")
+_ISSUES_RE = re.compile(r"^/repos/([^/]+/[^/]+)/issues$")
+_EVENTS_RE = re.compile(r"^/users/([^/]+)/events$")
+
+Response = Tuple[int, Dict[str, str], Any]
+
+
+# members with their last contribution date (None: no contributions), a share of them inactive since `inactive_before`
+def synthetic_members(
+    count: int, inactive: float = 0.1, inactive_before: str = "2024-01-01T00:00:00Z", seed: int = 0
+) -> Dict[str, Optional[str]]:
+    rnd = random.Random(seed)
+    cutoff = datetime.datetime.strptime(inactive_before, "%Y-%m-%dT%H:%M:%SZ")
+    members = {}
+    for i in range(count):
+        if rnd.random() < inactive:
+            days = rnd.randint(1, 1000)
+            members[f"user-{i}"] = None if days > 700 else (cutoff - datetime.timedelta(days=days)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        else:
+            members[f"user-{i}"] = (cutoff + datetime.timedelta(days=rnd.randint(0, 365))).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return members
+
+
+class GitHubStandIn:
+    def __init__(
+        self,
+        members: Dict[str, Optional[str]],
+        repos: Optional[Dict[str, Dict[str, List]]] = None,
+        events: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+        latency: float = 0.0,
+        latency_per_user: float = 0.0,
+        error_rate: float = 0.0,
+        secondary_rate_limit_rate: float = 0.0,
+        rate_limit: int = 5000,
+        rate_limit_window: float = 3600.0,
+        seed: int = 0,
+        port: int = 0,
+    ):
+        # login -> date of the last contribution to the org
+        self.members = members
+        self.member_logins = list(members)
+        # "owner/repo" -> {"collaborators": [login, ...], "commits": [{"sha", "author", "committer", "date", "message"}, ...],
+        #                  "issues": [{"number", "title", "creator", "mentioned": [login, ...], "created_at"}, ...]}
+        self.repos = repos or {}
+        # login -> public events in github's format, newest first
+        self.events = events or {}
+        # created gists: {"description", "public", "files": {name: {"content"}}}
+        self.gists: List[Dict[str, Any]] = []
+        self.latency = latency
+        self.latency_per_user = latency_per_user
+        self.error_rate = error_rate
+        self.secondary_rate_limit_rate = secondary_rate_limit_rate
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.remaining = rate_limit
+        self.reset_at = time.time() + rate_limit_window
+        self.random = random.Random(seed)
+        # scripted responses (status, headers, body), returned before regular responses
+        self.injected: List[Response] = []
+        # activity queries of these users fail with 401
+        self.failing_users = set()
+        # counters
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.checked_users: List[str] = []
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.graphql_url = f"{self.url}/graphql"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def inject(self, status: int, headers: Optional[Dict[str, str]] = None, body: Any = None):
+        with self._lock:
+            self.injected.append((status, headers or {}, body if body is not None else {}))
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # small keep-alive responses are otherwise delayed by nagle + delayed ack
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _respond(self, method: str):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                status, headers, response = stand_in.handle(method, self.path, body, self.headers.get("If-None-Match"))
+                payload = b"" if response is None else json.dumps(response).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._respond("GET")
+
+            def do_POST(self):
+                self._respond("POST")
+
+            def do_DELETE(self):
+                self._respond("DELETE")
+
+        return Handler
+
+    def _rate_limit_headers(self) -> Dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(math.ceil(self.reset_at)),
+            "X-RateLimit-Used": str(self.rate_limit - self.remaining),
+        }
+
+    def handle(self, method: str, path: str, body: Any, if_none_match: Optional[str] = None) -> Response:
+        with self._lock:
+            self.requests += 1
+            if self.injected:
+                return self.injected.pop(0)
+            if self.random.random() < self.error_rate:
+                self.errors += 1
+                return 502, {}, {"message": "Server Error"}
+            if self.random.random() < self.secondary_rate_limit_rate:
+                self.rate_limited += 1
+                return 403, {"Retry-After": "1"}, {"message": "You have exceeded a secondary rate limit."}
+            if time.time() >= self.reset_at:
+                self.remaining, self.reset_at = self.rate_limit, time.time() + self.rate_limit_window
+            if self.remaining <= 0:
+                self.rate_limited += 1
+                if path.startswith("/graphql"):
+                    return 200, self._rate_limit_headers(), {"errors": [{"type": "RATE_LIMITED", "message": "API rate limit exceeded"}]}
+                return 403, self._rate_limit_headers(), {"message": "API rate limit exceeded"}
+            self.remaining -= 1
+            headers = self._rate_limit_headers()
+        url = urlparse(path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if method == "POST" and url.path == "/graphql":
+            status, extra_headers, response = self._graphql(body["query"])
+        elif _COLLABORATORS_RE.match(url.path):
+            repo, user = _COLLABORATORS_RE.match(url.path).groups()
+            status, extra_headers, response = self._collaborators(method, repo, user, query)
+        elif method == "GET" and _COMMITS_RE.match(url.path):
+            status, extra_headers, response = self._commits(_COMMITS_RE.match(url.path).group(1), query)
+        elif method == "GET" and _ISSUES_RE.match(url.path):
+            status, extra_headers, response = self._issues(_ISSUES_RE.match(url.path).group(1), query)
+        elif method == "GET" and _EVENTS_RE.match(url.path):
+            user = _EVENTS_RE.match(url.path).group(1)
+            status, extra_headers, response = self._page(f"/users/{user}/events", self.events.get(user, []), query)
+        elif method == "POST" and url.path == "/gists":
+            with self._lock:
+                self.gists.append(body)
+                status, extra_headers, response = 201, {}, {"html_url": f"https://gist.github.com/{len(self.gists)}"}
+        else:
+            status, extra_headers, response = 404, {}, {"message": "Not Found"}
+        headers |= extra_headers
+        if method == "GET" and status == 200:
+            etag = '"%s"' % hashlib.sha1(json.dumps(response, sort_keys=True).encode()).hexdigest()
+            headers["ETag"] = etag
+            if if_none_match == etag:
+                # conditional requests answered with 304 don't count against the rate limit
+                with self._lock:
+                    self.remaining += 1
+                    headers |= self._rate_limit_headers()
+                return 304, headers, None
+        return status, headers, response
+
+    def _graphql(self, query: str) -> Response:
+        data: Dict[str, Any] = {}
+        errors = []
+        with self._lock:
+            rate_limit = {"cost": 1, "remaining": self.remaining, "resetAt": self._iso(self.reset_at)}
+        if "rateLimit" in query:
+            data["rateLimit"] = rate_limit
+        members = _MEMBERS_RE.search(query)
+        if members:
+            first, after = int(members.group(1)), members.group(2)
+            start = int(after) if after else 0
+            end = min(start + min(first, 100), len(self.member_logins))
+            data["organization"] = {
+                "membersWithRole": {
+                    "pageInfo": {"hasNextPage": end < len(self.member_logins), "endCursor": str(end)},
+                    "nodes": [{"login": login} for login in self.member_logins[start:end]],
+                }
+            }
+        users = list(_USER_RE.finditer(query))
+        if any(user.group(2) in self.failing_users for user in users):
+            return 401, {}, {"message": "Bad credentials"}
+        time.sleep(self.latency + self.latency_per_user * len(users))
+        for i, user in enumerate(users):
+            alias, login = user.groups()
+            fields = query[user.end() : users[i + 1].start() if i + 1 < len(users) else len(query)]
+            if login not in self.members:
+                data[alias] = None
+                errors.append(
+                    {"type": "NOT_FOUND", "path": [alias], "message": f"Could not resolve to a User with the login of '{login}'."}
+                )
+                continue
+            last_active = self.members[login]
+            data[alias] = {
+                (field_alias or "contributionsCollection"): {"hasAnyContributions": last_active is not None and last_active >= since}
+                for field_alias, since in _CONTRIBUTIONS_RE.findall(fields)
+            }
+            with self._lock:
+                self.checked_users.append(login)
+        return 200, {}, {"data": data, "errors": errors} if errors else {"data": data}
+
+    def _collaborators(self, method: str, repo: str, user: Optional[str], query: Dict[str, str]) -> Response:
+        time.sleep(self.latency)
+        if repo not in self.repos:
+            return 404, {}, {"message": "Not Found"}
+        collaborators = self.repos[repo].setdefault("collaborators", [])
+        if method == "DELETE" and user:
+            with self._lock:
+                if user in collaborators:
+                    collaborators.remove(user)
+            return 204, {}, None
+        if method == "GET" and not user:
+            return self._page(f"/repos/{repo}/collaborators", [{"login": c} for c in collaborators], query)
+        return 404, {}, {"message": "Not Found"}
+
+    def _commits(self, repo: str, query: Dict[str, str]) -> Response:
+        time.sleep(self.latency)
+        if repo not in self.repos:
+            return 404, {}, {"message": "Not Found"}
+        commits = [
+            {
+                "sha": c["sha"],
+                "html_url": f"https://github.com/{repo}/commit/{c['sha']}",
+                "commit": {
+                    "message": c["message"],
+                    "author": {"name": c["author"], "date": c["date"]},
+                    "committer": {"name": c["committer"], "date": c["date"]},
+                },
+                "author": {"login": c["author"]},
+                "committer": {"login": c["committer"]},
+            }
+            for c in self.repos[repo].get("commits", [])
+            if ("author" not in query or c["author"] == query["author"])
+            and ("committer" not in query or c["committer"] == query["committer"])
+            and ("since" not in query or c["date"] >= query["since"])
+        ]
+        return self._page(f"/repos/{repo}/commits", commits, query)
+
+    def _issues(self, repo: str, query: Dict[str, str]) -> Response:
+        time.sleep(self.latency)
+        if repo not in self.repos:
+            return 404, {}, {"message": "Not Found"}
+        issues = [
+            {
+                "number": i["number"],
+                "title": i["title"],
+                "html_url": f"https://github.com/{repo}/issues/{i['number']}",
+                "created_at": i["created_at"],
+                "updated_at": i["created_at"],
+                "user": {"login": i["creator"]},
+            }
+            for i in self.repos[repo].get("issues", [])
+            if ("creator" not in query or i["creator"] == query["creator"])
+            and ("mentioned" not in query or query["mentioned"] in i.get("mentioned", []))
+            and ("since" not in query or i["created_at"] >= query["since"])
+        ]
+        return self._page(f"/repos/{repo}/issues", issues, query)
+
+    def _page(self, path: str, items: List[Any], query: Dict[str, str]) -> Response:
+        per_page = min(int(query.get("per_page", 30)), 100)
+        page = int(query.get("page", 1))
+        headers = {}
+        if page * per_page < len(items):
+            next_query = urlencode(query | {"page": page + 1, "per_page": per_page})
+            headers["Link"] = f'<{self.url}{path}?{next_query}>; rel="next"'
+        return 200, headers, items[(page - 1) * per_page : page * per_page]
+
+    @staticmethod
+    def _iso(timestamp: float) -> str:
+        return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Github API stand-in")
+    parser.add_argument("--port", type=int, default=8080, help="port to listen on")
+    parser.add_argument("--members", type=int, default=5000, help="number of org members")
+    parser.add_argument("--inactive", type=float, default=0.1, help="share of inactive members")
+    parser.add_argument("--latency", type=float, default=0.0, help="latency per request in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failing with 502")
+    parser.add_argument("--rate-limit", type=int, default=5000, help="requests per rate limit window")
+    args = parser.parse_args()
+    stand_in = GitHubStandIn(
+        synthetic_members(args.members, args.inactive),
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        port=args.port,
+    )
+    print(f"Github API stand-in with {args.members} members listening on {stand_in.url}, GraphQL endpoint {stand_in.graphql_url}")
+    stand_in.httpd.serve_forever()
@@ -11,15 +11,30 @@ import yaml
 import re
 import os
 import argparse
+import contextlib
+import cProfile
+import hashlib
+import io
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
 import jsonschema
-from typing import Any, Dict, Set, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, Set, List, Optional, Tuple, Union
 
 _SCRIPT_PATH = os.path.dirname(os.path.abspath(__file__))
+# root of the community repo with ./orgs and ./toc
+_PROJECT_PATH = os.path.dirname(_SCRIPT_PATH)
+# exit code of --changed-only if the generated configuration didn't change
+_EXIT_NO_CHANGES = 3
 
 
 # pyyaml silently ignores duplicate keys but they shall be rejected
 # https://yaml.org/spec/1.2.2/ requires unique keys
-class UniqueKeyLoader(yaml.SafeLoader):
+class _UniqueKeyConstructor:
     def construct_mapping(self, node, deep=False):
         mapping = set()
         for key_node, _ in node.value:
@@ -30,6 +45,411 @@ class UniqueKeyLoader(yaml.SafeLoader):
         return super().construct_mapping(node, deep)
 
 
+class PyUniqueKeyLoader(_UniqueKeyConstructor, yaml.SafeLoader):
+    pass
+
+
+# libyaml (C) scanner/parser/emitter if pyyaml was built with it, pure python otherwise
+if yaml.__with_libyaml__:
+
+    class CUniqueKeyLoader(_UniqueKeyConstructor, yaml.CSafeLoader):
+        pass
+
+    UniqueKeyLoader = CUniqueKeyLoader
+    SafeDumper = yaml.CSafeDumper
+else:
+    UniqueKeyLoader = PyUniqueKeyLoader
+    SafeDumper = yaml.SafeDumper
+
+
+# content addressed on-disk cache for parsed and validated input files
+# entries are keyed by sha256 of the file content plus a version string (schemas, managed orgs),
+# i.e. a cache directory can be shared between workflows and runs on different commits
+class ParseCache:
+    def __init__(self, path: str, max_bytes: int = 32 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # total size of the entries, scanned once on the first store and counted up afterwards
+        self._size: Optional[int] = None
+        os.makedirs(path, exist_ok=True)
+
+    def load(self, path: str, kind: str, version: str, parse: Callable[[str], Any]) -> Any:
+        with open(path, "r") as stream:
+            content = stream.read()
+        key = hashlib.sha256(f"{kind}\0{version}\0{content}".encode()).hexdigest()
+        entry = os.path.join(self.path, f"{key}.json")
+        try:
+            with open(entry, "r") as stream:
+                result = json.load(stream)
+            os.utime(entry)  # LRU
+            self.hits += 1
+            return result
+        except (OSError, ValueError):
+            pass
+        self.misses += 1
+        result = parse(content)
+        self._store(entry, result)
+        return result
+
+    def _store(self, entry: str, value: Any):
+        try:
+            data = json.dumps(value)
+        except (TypeError, ValueError):
+            return  # not json serializable (e.g. yaml timestamps), don't cache
+        if json.loads(data) != value:
+            return  # a hit would differ from the parsed value (e.g. non-string keys like 1 or on/yes, tuples), don't cache
+        # atomic write, cache dir may be shared by concurrent runs
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(fd, "w") as stream:
+            stream.write(data)
+        os.replace(tmp, entry)
+        if self._size is None:
+            self._size = sum(e[1] for e in self._entries())
+        else:
+            self._size += len(data)
+        if self._size > self.max_bytes:
+            self._size = self._evict()
+
+    # (mtime, size, name) of all entries
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for name in os.listdir(self.path):
+            if name.endswith(".json"):
+                try:
+                    st = os.stat(os.path.join(self.path, name))
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, name))
+        return entries
+
+    # removes the least recently used entries until the cache fits into max_bytes, returns the remaining size
+    def _evict(self) -> int:
+        entries = self._entries()
+        total = sum(e[1] for e in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                pass
+            total -= size
+        return total
+
+
+# in-memory parse results of the watch mode (see ProjectWatcher), same interface as ParseCache
+# files are parsed again only if their modification time or size changed, parsed files of the last runs are listed in `parsed`
+class MemoryParseCache:
+    def __init__(self):
+        self.entries: Dict[str, Tuple[Any, Any]] = {}
+        self.parsed: List[str] = []
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, path: str, kind: str, version: str, parse: Callable[[str], Any]) -> Any:
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size, kind, version)
+        entry = self.entries.get(path)
+        if entry is not None and entry[0] == stamp:
+            self.hits += 1
+        else:
+            self.misses += 1
+            with open(path, "r") as stream:
+                entry = self.entries[path] = (stamp, parse(stream.read()))
+            self.parsed.append(path)
+        return MemoryParseCache._copy(kind, entry[1])
+
+    # copy of the levels of the static configuration modified by the generator (org members and teams, branch protection repos),
+    # the parsed values are never modified
+    @staticmethod
+    def _copy(kind: str, value: Any) -> Any:
+        if kind == "_validate_github_org_cfg":
+            orgs = {org: cfg | {"teams": dict(cfg.get("teams") or {})} for org, cfg in value["orgs"].items()}
+            return value | {"orgs": orgs}
+        if kind == "_validate_branch_protection":
+            rules = value["branch-protection"]
+            orgs = {org: cfg | {"repos": dict(cfg.get("repos") or {})} for org, cfg in rules["orgs"].items()}
+            return value | {"branch-protection": rules | {"orgs": orgs}}
+        return value
+
+    def retain(self, paths: List[str]):
+        self.entries = {p: e for p, e in self.entries.items() if p in paths}
+
+
+# per phase metrics of the generator CLI: wall time, cpu time and tracemalloc peak per phase plus arbitrary counters
+# disabled metrics are a no-op
+class PhaseMetrics:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, Any] = {}
+
+    def phase(self, name: str):
+        return self._measure(name) if self.enabled else contextlib.nullcontext()
+
+    @contextlib.contextmanager
+    def _measure(self, name: str):
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        memory_before, _ = tracemalloc.get_traced_memory()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield
+        finally:
+            measured = {
+                "wall_seconds": time.perf_counter() - wall,
+                "cpu_seconds": time.process_time() - cpu,
+                "peak_memory_bytes": tracemalloc.get_traced_memory()[1] - memory_before,
+            }
+            if started_tracing:
+                tracemalloc.stop()
+            self.add({name: measured})
+
+    # adds phases measured separately, e.g. per org in worker processes: times of phases with the same name are summed up,
+    # peak memory is the maximum
+    def add(self, phases: Dict[str, Dict[str, float]]):
+        for name, measured in phases.items():
+            current = self.phases.get(name)
+            if current is None:
+                self.phases[name] = dict(measured)
+            else:
+                current["wall_seconds"] += measured["wall_seconds"]
+                current["cpu_seconds"] += measured["cpu_seconds"]
+                current["peak_memory_bytes"] = max(current["peak_memory_bytes"], measured["peak_memory_bytes"])
+
+    def count(self, name: str, value: Any):
+        if self.enabled:
+            self.counters[name] = value
+
+    def count_files(self, name: str, paths: List[str]):
+        if self.enabled:
+            self.counters[name] = {"files": len(paths), "bytes": sum(os.path.getsize(p) for p in paths if os.path.exists(p))}
+
+    def write(self, path: str):
+        total = {k: sum(p[k] for p in self.phases.values()) for k in ["wall_seconds", "cpu_seconds"]}
+        total["peak_memory_bytes"] = max((p["peak_memory_bytes"] for p in self.phases.values()), default=0)
+        print(f"Writing metrics to {path}")
+        with open(path, "w") as stream:
+            json.dump({"phases": self.phases, "total": total, "counters": self.counters}, stream, indent=2)
+
+
+# typed model of the WG charters, built once after validation and used by all generators:
+# people and repos are shared between all areas and WGs of a generator (logins interned), role sets are computed once and frozen.
+# Read-only dict access (wg["name"]) and to_dict() keep working for callers of the validated charter dicts.
+class Person:
+    __slots__ = ("name", "github")
+
+    def __init__(self, name: str, github: str):
+        self.name = name
+        self.github = sys.intern(github)
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"name": self.name, "github": self.github}
+
+
+class RepoRef:
+    __slots__ = ("org", "name")
+
+    def __init__(self, full_name: str):
+        # "<org>/<repo>", repos w/o org are never part of an org
+        org, _, name = full_name.partition("/")
+        self.org = sys.intern(org) if name else None
+        self.name = name or full_name
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.org}/{self.name}" if self.org else self.name
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, RepoRef) and self.org == other.org and self.name == other.name
+
+    def __hash__(self) -> int:
+        return hash((self.org, self.name))
+
+
+class Area:
+    __slots__ = ("name", "approvers", "reviewers", "bots", "repositories", "approver_logins")
+
+    def __init__(
+        self,
+        name: str,
+        approvers: Tuple[Person, ...],
+        reviewers: Optional[Tuple[Person, ...]],
+        bots: Optional[Tuple[Person, ...]],
+        repositories: Tuple[RepoRef, ...],
+    ):
+        self.name = name
+        self.approvers = approvers
+        # None if not defined in the charter (no reviewers/bots team), empty tuple if defined as empty list
+        self.reviewers = reviewers
+        self.bots = bots
+        self.repositories = repositories
+        # approvers are needed by WG teams and branch protection, reviewers and bots only by their area teams
+        self.approver_logins = frozenset(p.github for p in approvers)
+
+    def to_dict(self) -> Dict[str, Any]:
+        area = {"name": self.name, "approvers": [p.to_dict() for p in self.approvers]}
+        if self.reviewers is not None:
+            area["reviewers"] = [p.to_dict() for p in self.reviewers]
+        if self.bots is not None:
+            area["bots"] = [p.to_dict() for p in self.bots]
+        area["repositories"] = [r.full_name for r in self.repositories]
+        return area
+
+
+class WorkingGroup:
+    __slots__ = (
+        "name",
+        "org",
+        "execution_leads",
+        "technical_leads",
+        "bots",
+        "areas",
+        "config",
+        "lead_logins",
+        "user_logins",
+        "_repo_index",
+        "_views",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        org: str,
+        execution_leads: Tuple[Person, ...],
+        technical_leads: Tuple[Person, ...],
+        bots: Tuple[Person, ...],
+        areas: Tuple[Area, ...],
+        config: Optional[Dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.org = org
+        self.execution_leads = execution_leads
+        self.technical_leads = technical_leads
+        self.bots = bots
+        self.areas = areas
+        self.config = config
+        self.lead_logins = frozenset(p.github for p in execution_leads + technical_leads)
+        users = set(self.lead_logins).union((p.github for p in bots), *(a.approver_logins for a in areas))
+        users.update(p.github for a in areas for p in (a.reviewers or ()) + (a.bots or ()))
+        # copy of the complete set is allocated with its final size
+        self.user_logins = frozenset(users)
+        self._repo_index: Optional[Dict[RepoRef, Dict[str, Any]]] = None
+        # dict views of people and areas built on first dict access (see __getitem__)
+        self._views: Optional[Dict[str, List[Dict[str, Any]]]] = None
+
+    # model of a validated charter, people and repos are looked up in and added to pool
+    @staticmethod
+    def from_dict(wg: Dict[str, Any], pool: Optional[Dict[Any, Any]] = None) -> "WorkingGroup":
+        pool = {} if pool is None else pool
+
+        def people(users: Optional[List[Dict[str, str]]]) -> Optional[Tuple[Person, ...]]:
+            if users is None:
+                return None
+            result = []
+            for u in users:
+                key = (u["name"], u["github"])
+                person = pool.get(key)
+                if person is None:
+                    person = pool[key] = Person(u["name"], u["github"])
+                result.append(person)
+            return tuple(result)
+
+        def repos(names: List[str]) -> Tuple[RepoRef, ...]:
+            result = []
+            for name in names:
+                repo = pool.get(name)
+                if repo is None:
+                    repo = pool[name] = RepoRef(name)
+                result.append(repo)
+            return tuple(result)
+
+        areas = tuple(
+            Area(a["name"], people(a["approvers"]), people(a.get("reviewers")), people(a.get("bots")), repos(a["repositories"]))
+            for a in wg["areas"]
+        )
+        return WorkingGroup(
+            wg["name"],
+            wg.get("org", OrgGenerator._DEFAULT_ORG),
+            people(wg["execution_leads"]),
+            people(wg["technical_leads"]),
+            people(wg["bots"]),
+            areas,
+            wg.get("config"),
+        )
+
+    # index of the WG repos built once in one pass over the WG areas, used by branch protection and the access index:
+    # repo -> names of areas listing the repo, union of their approvers and their area bot teams (in area order)
+    @property
+    def repo_index(self) -> Dict[RepoRef, Dict[str, Any]]:
+        if self._repo_index is None:
+            wg_name = f"wg-{self.name}"
+            index = {}
+            for a in self.areas:
+                bot_team = OrgGenerator._kebab_case(f"{wg_name}-{a.name}-bots") if a.bots else None
+                for r in dict.fromkeys(a.repositories):
+                    entry = index.get(r)
+                    if entry is None:
+                        entry = index[r] = {"areas": [], "approvers": set(), "bot_teams": []}
+                    entry["areas"].append(a.name)
+                    entry["approvers"] |= a.approver_logins
+                    if bot_team:
+                        entry["bot_teams"].append(bot_team)
+            self._repo_index = index
+        return self._repo_index
+
+    # adapter for generators called with charter dicts
+    @staticmethod
+    def of(wg: Union["WorkingGroup", Dict[str, Any]]) -> "WorkingGroup":
+        return wg if isinstance(wg, WorkingGroup) else WorkingGroup.from_dict(wg)
+
+    def to_dict(self) -> Dict[str, Any]:
+        wg = {
+            "name": self.name,
+            "org": self.org,
+            "execution_leads": [p.to_dict() for p in self.execution_leads],
+            "technical_leads": [p.to_dict() for p in self.technical_leads],
+            "bots": [p.to_dict() for p in self.bots],
+            "areas": [a.to_dict() for a in self.areas],
+        }
+        if self.config is not None:
+            wg["config"] = self.config
+        return wg
+
+    _LIST_KEYS = ("execution_leads", "technical_leads", "bots", "areas")
+
+    # read-only dict access: scalar keys map to attributes, lists of people and areas are converted once per key and cached
+    def __getitem__(self, key: str) -> Any:
+        if key in ("name", "org") or (key == "config" and self.config is not None):
+            return getattr(self, key)
+        if key not in WorkingGroup._LIST_KEYS:
+            raise KeyError(key)
+        if self._views is None:
+            self._views = {}
+        view = self._views.get(key)
+        if view is None:
+            view = self._views[key] = [v.to_dict() for v in getattr(self, key)]
+        return view
+
+    def __contains__(self, key: str) -> bool:
+        return key in ("name", "org") + WorkingGroup._LIST_KEYS or (key == "config" and self.config is not None)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self else default
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (WorkingGroup, dict)):
+            return self.to_dict() == (other.to_dict() if isinstance(other, WorkingGroup) else other)
+        return NotImplemented
+
+    __hash__ = None
+
+
 class OrgGenerator:
     # list of managed orgs, should match ./ORGS.md
     _MANAGED_ORGS = ["cloudfoundry"]
@@ -65,55 +485,70 @@ class OrgGenerator:
             for org in contributors_yaml["orgs"]:
                 self.contributors[org] = set(contributors_yaml["orgs"][org]["contributors"])
 
-        self.toc = OrgGenerator._yaml_load(toc) if toc else OrgGenerator._empty_wg_config("TOC")
-        OrgGenerator._validate_wg(self.toc)
-        self.toc_org = self.toc["org"]
+        # files read by load_from_project
+        self.input_files: List[str] = []
+
+        # validated charters as WorkingGroup models sharing people and repos
+        pool = {}
+        toc_yaml = OrgGenerator._yaml_load(toc) if toc else OrgGenerator._empty_wg_config("TOC")
+        self.toc = WorkingGroup.from_dict(OrgGenerator._validate_wg(toc_yaml), pool)
+        self.toc_org = self.toc.org
         wgs = [OrgGenerator._validate_wg(OrgGenerator._yaml_load(wg)) for wg in working_groups] if working_groups else []
         for wg in wgs:
             org = wg["org"]
             if org not in OrgGenerator._MANAGED_ORGS:
                 raise ValueError(f"Invalid org {org} in WG {wg['name']}, expected one of {OrgGenerator._MANAGED_ORGS}")
-            self.working_groups[org].append(wg)
+            self.working_groups[org].append(WorkingGroup.from_dict(wg, pool))
 
-    def load_from_project(self):
-        path = f"{_SCRIPT_PATH}/orgs.yml"
+    def load_from_project(self, cache: Optional[ParseCache] = None, project_path: str = _PROJECT_PATH):
+        path = f"{project_path}/orgs/orgs.yml"
         print(f"Reading static org configuration from {path}")
-        self.org_cfg = OrgGenerator._validate_github_org_cfg(OrgGenerator._read_yml_file(path))
+        self.org_cfg = OrgGenerator._read_yml_file(path, OrgGenerator._validate_github_org_cfg, cache)
+        self.input_files.append(path)
         for org in OrgGenerator._MANAGED_ORGS:
             if org not in self.org_cfg["orgs"]:
                 self.org_cfg["orgs"][org] = {"admins": [], "members": [], "teams": {}, "repos": {}}
 
-        path = f"{_SCRIPT_PATH}/contributors.yml"
+        path = f"{project_path}/orgs/contributors.yml"
         if os.path.exists(path):
             print(f"Reading contributors from {path}")
-            contributors_yaml = OrgGenerator._read_yml_file(path)
-            OrgGenerator._validate_contributors(contributors_yaml)
+            contributors_yaml = OrgGenerator._read_yml_file(path, OrgGenerator._validate_contributors, cache)
+            self.input_files.append(path)
             for org in contributors_yaml["orgs"]:
                 self.contributors[org] = set(contributors_yaml["orgs"][org]["contributors"])
 
-        path = f"{_SCRIPT_PATH}/branchprotection.yml"
+        path = f"{project_path}/orgs/branchprotection.yml"
         print(f"Reading branch protection configuration from {path}")
-        self.branch_protection = OrgGenerator._validate_branch_protection(OrgGenerator._read_yml_file(path))
+        self.branch_protection = OrgGenerator._read_yml_file(path, OrgGenerator._validate_branch_protection, cache)
+        self.input_files.append(path)
         for org in OrgGenerator._MANAGED_ORGS:
             if org not in self.branch_protection["branch-protection"]["orgs"]:
                 self.branch_protection["branch-protection"]["orgs"][org] = {"repos": {}}
 
         # working group charters (including TOC and ADMIN), ignore WGs without yaml block
-        toc = OrgGenerator._read_wg_charter(f"{_SCRIPT_PATH}/../toc/TOC.md")
+        pool = {}
+        path = f"{project_path}/toc/TOC.md"
+        toc = OrgGenerator._read_wg_charter(path, cache)
+        self.input_files.append(path)
         if toc:
-            self.toc = toc
-            self.toc_org = toc["org"]
-
-        wg_files = glob.glob(f"{_SCRIPT_PATH}/../toc/working-groups/*.md")
-        wg_files += glob.glob(f"{_SCRIPT_PATH}/../toc/ADMIN.md")
-        for wg_file in wg_files:
-            if not wg_file.endswith("/WORKING-GROUPS.md"):
-                wg = OrgGenerator._read_wg_charter(wg_file)
-                if wg:
-                    org = wg["org"]
-                    if org not in OrgGenerator._MANAGED_ORGS:
-                        raise ValueError(f"Invalid org {org} in WG {wg['name']}, expected one of {OrgGenerator._MANAGED_ORGS}")
-                    self.working_groups[org].append(wg)
+            self.toc = WorkingGroup.from_dict(toc, pool)
+            self.toc_org = self.toc.org
+
+        for wg_file in OrgGenerator._wg_charter_files(project_path):
+            wg = OrgGenerator._read_wg_charter(wg_file, cache)
+            self.input_files.append(wg_file)
+            if wg:
+                org = wg["org"]
+                if org not in OrgGenerator._MANAGED_ORGS:
+                    raise ValueError(f"Invalid org {org} in WG {wg['name']}, expected one of {OrgGenerator._MANAGED_ORGS}")
+                self.working_groups[org].append(WorkingGroup.from_dict(wg, pool))
+
+    # WG charters read by load_from_project (w/o TOC), sorted for a deterministic WG order
+    @staticmethod
+    def _wg_charter_files(project_path: str) -> List[str]:
+        wg_files = sorted(glob.glob(f"{project_path}/toc/working-groups/*.md"))
+        wg_files += glob.glob(f"{project_path}/toc/ADMIN.md")
+        return [f for f in wg_files if not f.endswith("/WORKING-GROUPS.md")]
 
     # rfc-0007-repository-ownership: a repo can't be owned by multiple WGs, scope is github org
     def validate_repo_ownership(self) -> bool:
@@ -121,11 +556,11 @@ class OrgGenerator:
         for org in OrgGenerator._MANAGED_ORGS:
             repo_owners = {}
             for wg in self.working_groups[org]:
-                wg_name = wg["name"]
-                wg_repos = set(r for a in wg["areas"] for r in a["repositories"])
+                wg_name = wg.name
+                wg_repos = set(r for a in wg.areas for r in a.repositories)
                 for repo in wg_repos:
                     if repo in repo_owners:
-                        print(f"ERROR: Repository {repo} is owned by multiple WGs: {repo_owners[repo]}, {wg_name}")
+                        print(f"ERROR: Repository {repo.full_name} is owned by multiple WGs: {repo_owners[repo]}, {wg_name}")
                         valid = False
                     else:
                         repo_owners[repo] = wg_name
@@ -138,110 +573,670 @@ class OrgGenerator:
         # TOC is always added
         result = {"toc": set(OrgGenerator._wg_github_users(self.toc))}
         for wg in self.working_groups[org]:
-            result[wg["name"]] = OrgGenerator._wg_github_users(wg)
+            result[wg.name] = set(OrgGenerator._wg_github_users(wg))
         return result
 
+    # generation is split per org, work crossing orgs only depends on the leads of the WGs per org (see _wg_leads_by_org):
+    # - leads of the WGs of all orgs are members of the TOC org
+    # - leads of the WGs of other orgs get a wg-leads-<org> team in the TOC org
     def generate_org_members(self):
+        wg_leads = self._wg_leads_by_org()
         for org in OrgGenerator._MANAGED_ORGS:
-            org_members = set(self.org_cfg["orgs"][org]["members"])  # just in case, should be empty list
-            org_members |= self.get_contributors(org)
-            for wg in self.working_groups[org]:
-                org_members |= OrgGenerator._wg_github_users(wg)
-            # wg-leads of all WGs shall be members in cloudfoundy org for access to community repo
-            if org == self.toc_org:
-                for _org in OrgGenerator._MANAGED_ORGS:
-                    for wg in self.working_groups[_org]:
-                        org_members |= OrgGenerator._wg_github_users_leads(wg)
-            org_admins = set(self.org_cfg["orgs"][org]["admins"])
-            org_admins |= OrgGenerator._wg_github_users_leads(self.toc)
-            org_members = org_members - org_admins
-            self.org_cfg["orgs"][org]["members"] = sorted(org_members)
-            self.org_cfg["orgs"][org]["admins"] = sorted(org_admins)
+            self._generate_org_members(org, wg_leads)
 
     def generate_teams(self):
+        wg_leads = self._wg_leads_by_org()
+        for org in OrgGenerator._MANAGED_ORGS:
+            self._generate_org_teams(org, wg_leads)
+
+    def generate_branch_protection(self):
+        for org in OrgGenerator._MANAGED_ORGS:
+            self._generate_org_branch_protection(org)
+
+    # members, teams and branch protection of all orgs, independent orgs are generated in a process pool of max_workers processes
+    # (None for the number of CPUs, 1 for no pool) and optionally written to per org output files (see _org_output_path).
+    # Result is the same as the single process generation. Phases members, teams, branch_protection (and write of per org output files)
+    # are added to metrics, summed up over all orgs.
+    def generate(
+        self,
+        max_workers: Optional[int] = 1,
+        out: Optional[str] = None,
+        branch_protection_out: Optional[str] = None,
+        metrics: Optional[PhaseMetrics] = None,
+    ):
+        wg_leads = self._wg_leads_by_org()
+        orgs = OrgGenerator._MANAGED_ORGS
+        metrics_enabled = metrics is not None and metrics.enabled
+        if max_workers == 1 or len(orgs) == 1:
+            results = [self._generate_org(org, wg_leads, out, branch_protection_out, metrics_enabled) for org in orgs]
+        else:
+            arguments = (orgs, repeat(wg_leads), repeat(out), repeat(branch_protection_out), repeat(metrics_enabled))
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(self._generate_org, *arguments))
+            for org, (org_cfg, branch_protection, _) in zip(orgs, results):
+                self.org_cfg["orgs"][org] = org_cfg
+                self.branch_protection["branch-protection"]["orgs"][org] = branch_protection
+        if metrics_enabled:
+            for _, _, phases in results:
+                metrics.add(phases)
+
+    # runs in a worker process for process pool generation, returns the generated config of the org and the measured phases
+    def _generate_org(
+        self,
+        org: str,
+        wg_leads: Dict[str, List[str]],
+        out: Optional[str] = None,
+        branch_protection_out: Optional[str] = None,
+        metrics_enabled: bool = False,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Dict[str, float]]]:
+        metrics = PhaseMetrics(metrics_enabled)
+        with metrics.phase("members"):
+            self._generate_org_members(org, wg_leads)
+        with metrics.phase("teams"):
+            self._generate_org_teams(org, wg_leads)
+        with metrics.phase("branch_protection"):
+            self._generate_org_branch_protection(org)
+        with metrics.phase("write"):
+            if out:
+                self.write_org_config(OrgGenerator._org_output_path(out, org), org)
+            if branch_protection_out:
+                self.write_branch_protection(OrgGenerator._org_output_path(branch_protection_out, org), org)
+        return (self.org_cfg["orgs"][org], self.branch_protection["branch-protection"]["orgs"][org], metrics.phases)
+
+    # sorted leads of all WGs per org
+    def _wg_leads_by_org(self) -> Dict[str, List[str]]:
+        return {
+            org: sorted(frozenset().union(*(OrgGenerator._wg_github_users_leads(wg) for wg in self.working_groups[org])))
+            for org in OrgGenerator._MANAGED_ORGS
+        }
+
+    def _generate_org_members(self, org: str, wg_leads: Dict[str, List[str]]):
+        org_members = set(self.org_cfg["orgs"][org]["members"])  # just in case, should be empty list
+        org_members |= self.get_contributors(org)
+        for wg in self.working_groups[org]:
+            org_members |= OrgGenerator._wg_github_users(wg)
+        # wg-leads of all WGs shall be members in cloudfoundy org for access to community repo
+        if org == self.toc_org:
+            for leads in wg_leads.values():
+                org_members.update(leads)
+        org_admins = set(self.org_cfg["orgs"][org]["admins"])
+        org_admins |= OrgGenerator._wg_github_users_leads(self.toc)
+        org_members = org_members - org_admins
+        self.org_cfg["orgs"][org]["members"] = sorted(org_members)
+        self.org_cfg["orgs"][org]["admins"] = sorted(org_admins)
+
+    def _generate_org_teams(self, org: str, wg_leads: Dict[str, List[str]]):
         # overwrites any teams in orgs.yml that match a generated team name according to RFC-0005
+        teams = self.org_cfg["orgs"][org]["teams"]
         # toc team, only in cloudfoundry org
         # TOC members have org admin access in all managed orgs
-        (name, team) = OrgGenerator._generate_toc_team(self.toc)
-        self.org_cfg["orgs"][self.toc["org"]]["teams"][name] = team
-        # wg teams for all orgs
-        for org in OrgGenerator._MANAGED_ORGS:
-            # working group teams
-            for wg in self.working_groups[org]:
-                if wg["org"] == org:
-                    (name, team) = OrgGenerator._generate_wg_teams(wg)
-                    self.org_cfg["orgs"][org]["teams"][name] = team
-            # wg-leads team
-            (name, team) = OrgGenerator._generate_wg_leads_team(self.working_groups[org])
-            self.org_cfg["orgs"][org]["teams"][name] = team
-
-        # wg-leads get write access to community repo which is in cloudfoundry org
-        # RFC-0005 lists community repo explicitly (not all TOC repos)
-        self.org_cfg["orgs"][self.toc_org]["teams"]["wg-leads"]["repos"] = {"community": "write"}
-        # wg leads of other orgs -> create extra wg-leads-<org> team in cloudfoundry org
-        for org in OrgGenerator._MANAGED_ORGS:
-            if org != self.toc_org:
-                wg_leads_other_org = self.org_cfg["orgs"][org]["teams"]["wg-leads"]
-                team = {
-                    "description": f"Technical and Execution Leads for all WGs in organization {org}",
-                    "privacy": "closed",
-                    "members": wg_leads_other_org["members"],
-                    "repos": {"community": "write"},
-                }
-                self.org_cfg["orgs"][self.toc_org]["teams"][f"wg-leads-{org}"] = team
+        if org == self.toc_org:
+            (name, team) = OrgGenerator._generate_toc_team(self.toc)
+            teams[name] = team
+        # working group teams
+        for wg in self.working_groups[org]:
+            if wg.org == org:
+                (name, team) = OrgGenerator._generate_wg_teams(wg)
+                teams[name] = team
+        # wg-leads team
+        (name, team) = OrgGenerator._generate_wg_leads_team(self.working_groups[org])
+        teams[name] = team
 
-    def generate_branch_protection(self):
+        if org == self.toc_org:
+            # wg-leads get write access to community repo which is in cloudfoundry org
+            # RFC-0005 lists community repo explicitly (not all TOC repos)
+            teams["wg-leads"]["repos"] = {"community": "write"}
+            # wg leads of other orgs -> create extra wg-leads-<org> team in cloudfoundry org
+            for other_org, leads in wg_leads.items():
+                if other_org != self.toc_org:
+                    teams[f"wg-leads-{other_org}"] = {
+                        "description": f"Technical and Execution Leads for all WGs in organization {other_org}",
+                        "privacy": "closed",
+                        "members": leads,
+                        "repos": {"community": "write"},
+                    }
+
+    def _generate_org_branch_protection(self, org: str):
         # basis is static config in self.branch_protection which is never overwritten
         # generate RFC0015 branch protection rules for every WG+TOC by default
+        branch_protection_repos = self.branch_protection["branch-protection"]["orgs"][org]["repos"]
+        wgs = self.working_groups[org] + ([self.toc] if org == self.toc_org else [])
+        for wg in wgs:
+            repo_rules = self._generate_wg_branch_protection(wg)
+            for repo in repo_rules:
+                if repo not in branch_protection_repos:
+                    branch_protection_repos[repo] = repo_rules[repo]
+
+    # minimal change set between the generated and a previous org configuration, e.g. orgs.out.yml of the last run
+    # or a peribolos --dump-full snapshot. Only non-empty changes are included, i.e. no changes = empty dict.
+    def diff_org_config(self, previous: Dict[str, Any]) -> Dict[str, Any]:
+        changes = {}
+        previous_orgs = (previous or {}).get("orgs") or {}
+        for org, cfg in self.org_cfg["orgs"].items():
+            prev = previous_orgs.get(org) or {}
+            org_changes = {}
+            for key in ["admins", "members"]:
+                delta = OrgGenerator._diff_lists(prev.get(key) or [], cfg.get(key) or [])
+                if delta:
+                    org_changes[key] = delta
+            teams = OrgGenerator._diff_teams(
+                OrgGenerator._flatten_teams(prev.get("teams") or {}), OrgGenerator._flatten_teams(cfg.get("teams") or {})
+            )
+            if teams:
+                org_changes["teams"] = teams
+            repos = OrgGenerator._diff_dicts(prev.get("repos") or {}, cfg.get("repos") or {})
+            if repos:
+                org_changes["repos"] = repos
+            settings = OrgGenerator._diff_settings(prev, cfg, ["admins", "members", "teams", "repos"])
+            if settings:
+                org_changes["settings"] = settings
+            if org_changes:
+                changes[org] = org_changes
+        return {"orgs": changes} if changes else {}
+
+    def diff_branch_protection(self, previous: Dict[str, Any]) -> Dict[str, Any]:
+        changes = {}
+        prev_bp = (previous or {}).get("branch-protection") or {}
+        bp = self.branch_protection["branch-protection"]
+        previous_orgs = prev_bp.get("orgs") or {}
+        for org, cfg in bp["orgs"].items():
+            prev = previous_orgs.get(org) or {}
+            org_changes = OrgGenerator._diff_dicts(prev.get("repos") or {}, cfg.get("repos") or {})
+            settings = OrgGenerator._diff_settings(prev, cfg, ["repos"])
+            if settings:
+                org_changes["settings"] = settings
+            if org_changes:
+                changes[org] = org_changes
+        settings = OrgGenerator._diff_settings(prev_bp, bp, ["orgs"])
+        if settings:
+            changes["settings"] = settings
+        return {"branch-protection": changes} if changes else {}
+
+    @staticmethod
+    def _diff_lists(old: List[str], new: List[str]) -> Dict[str, List[str]]:
+        delta = {"added": sorted(set(new) - set(old)), "removed": sorted(set(old) - set(new))}
+        return {k: v for k, v in delta.items() if v}
+
+    @staticmethod
+    def _diff_dicts(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, List[str]]:
+        delta = {
+            "added": sorted(set(new) - set(old)),
+            "removed": sorted(set(old) - set(new)),
+            "changed": sorted(k for k in set(new) & set(old) if new[k] != old[k]),
+        }
+        return {k: v for k, v in delta.items() if v}
+
+    @staticmethod
+    def _diff_settings(old: Dict[str, Any], new: Dict[str, Any], ignore: List[str]) -> List[str]:
+        return sorted(k for k in set(old) | set(new) if k not in ignore and old.get(k) != new.get(k))
+
+    @staticmethod
+    def _flatten_teams(teams: Dict[str, Any]) -> Dict[str, Any]:
+        # team names are unique per org, child teams are listed in "teams" of the parent team
+        result = {}
+        for name, team in teams.items():
+            team = team or {}
+            result[name] = team
+            result |= OrgGenerator._flatten_teams(team.get("teams") or {})
+        return result
+
+    @staticmethod
+    def _diff_teams(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+        changes = OrgGenerator._diff_lists(list(old), list(new))
+        members = {}
+        repos = {}
+        settings = {}
+        # removed teams are deleted with all their memberships, no need to list them
+        for name in sorted(new):
+            prev = old.get(name) or {}
+            team = new[name]
+            delta = {}
+            for key in ["maintainers", "members"]:
+                d = OrgGenerator._diff_lists(prev.get(key) or [], team.get(key) or [])
+                if d:
+                    delta[key] = d
+            if delta:
+                members[name] = delta
+            prev_repos = prev.get("repos") or {}
+            team_repos = team.get("repos") or {}
+            permissions = {
+                r: {"from": prev_repos.get(r), "to": team_repos.get(r)}
+                for r in sorted(set(prev_repos) | set(team_repos))
+                if prev_repos.get(r) != team_repos.get(r)
+            }
+            if permissions:
+                repos[name] = permissions
+            team_settings = OrgGenerator._diff_settings(prev, team, ["maintainers", "members", "repos", "teams"])
+            if team_settings and name in old:
+                settings[name] = team_settings
+        if members:
+            changes["members"] = members
+        if repos:
+            changes["repos"] = repos
+        if settings:
+            changes["settings"] = settings
+        return changes
+
+    # github permissions in ascending order
+    _PERMISSIONS = ["read", "triage", "write", "maintain", "admin"]
+    # role names of the user lists of WGs and their areas
+    _WG_ROLES = {"execution_leads": "execution_lead", "technical_leads": "technical_lead", "bots": "bot"}
+    _AREA_ROLES = {"approvers": "approver", "reviewers": "reviewer", "bots": "bot"}
+
+    # ownership and access index of the generated org configuration (after generate_teams), repos and teams as "<org>/<name>":
+    # - repos: owning WG (None for repos not listed in any charter), areas listing the repo, teams with their permission
+    # - users: roles in orgs, WGs and areas, teams
+    # - teams: parent team, members (incl. maintainers), repo permissions
+    def build_access_index(self) -> Dict[str, Any]:
+        index: Dict[str, Dict[str, Any]] = {"repos": {}, "users": {}, "teams": {}}
+
+        def user(login: str) -> Dict[str, Any]:
+            entry = index["users"].get(login)
+            if entry is None:
+                entry = index["users"][login] = {"roles": [], "teams": []}
+            return entry
+
+        def add_role(login: str, role: Dict[str, str]):
+            roles = user(login)["roles"]
+            if role not in roles:
+                roles.append(role)
+
+        def repo(name: str) -> Dict[str, Any]:
+            entry = index["repos"].get(name)
+            if entry is None:
+                entry = index["repos"][name] = {"wg": None, "areas": [], "teams": {}}
+            return entry
+
+        def add_teams(org: str, teams: Dict[str, Any], parent: Optional[str]):
+            for name, team in teams.items():
+                key = f"{org}/{name}"
+                members = sorted(set(team.get("maintainers") or []) | set(team.get("members") or []))
+                repos = {f"{org}/{r}": p for r, p in (team.get("repos") or {}).items()}
+                index["teams"][key] = {"parent": parent, "members": members, "repos": repos}
+                for r, p in repos.items():
+                    repo(r)["teams"][key] = p
+                for login in members:
+                    user(login)["teams"].append(key)
+                add_teams(org, team.get("teams") or {}, key)
+
+        for org in OrgGenerator._MANAGED_ORGS:
+            for role in ["admins", "members"]:
+                for login in self.org_cfg["orgs"][org].get(role) or []:
+                    add_role(login, {"org": org, "role": role[:-1]})
+            wgs = [self.toc] if self.toc.org == org else []
+            for wg in wgs + self.working_groups[org]:
+                for key, role in OrgGenerator._WG_ROLES.items():
+                    for u in getattr(wg, key):
+                        add_role(u.github, {"wg": wg.name, "role": role})
+                for a in wg.areas:
+                    for key, role in OrgGenerator._AREA_ROLES.items():
+                        for u in getattr(a, key) or ():
+                            add_role(u.github, {"wg": wg.name, "area": a.name, "role": role})
+                for r, repo_entry in wg.repo_index.items():
+                    entry = repo(r.full_name)
+                    # first WG wins for repos owned by multiple WGs, see validate_repo_ownership
+                    entry["wg"] = entry["wg"] or wg.name
+                    for area in repo_entry["areas"]:
+                        if area not in entry["areas"]:
+                            entry["areas"].append(area)
         for org in OrgGenerator._MANAGED_ORGS:
-            branch_protection_repos = self.branch_protection["branch-protection"]["orgs"][org]["repos"]
-            wgs = self.working_groups[org]
-            if org == self.toc["org"]:
-                wgs.append(self.toc)
-            for wg in wgs:
-                repo_rules = self._generate_wg_branch_protection(wg)
-                for repo in repo_rules:
-                    if repo not in branch_protection_repos:
-                        branch_protection_repos[repo] = repo_rules[repo]
-
-    def write_org_config(self, path: str):
+            add_teams(org, self.org_cfg["orgs"][org].get("teams") or {}, None)
+        for entry in index["users"].values():
+            entry["teams"].sort()
+        return index
+
+    @staticmethod
+    def _max_permission(p1: Optional[str], p2: str) -> str:
+        return p2 if p1 is None or OrgGenerator._PERMISSIONS.index(p2) > OrgGenerator._PERMISSIONS.index(p1) else p1
+
+    def write_access_index(self, path: str):
+        print(f"Writing access index to {path}")
+        with open(path, "w") as stream:
+            json.dump(self.build_access_index(), stream, sort_keys=True, separators=(",", ":"))
+
+    # looks up a repo, user or team in an index of build_access_index (case insensitive like github), None if not found.
+    # Repos and teams w/o org are looked up in the default org. The repos of a user are resolved from the user's teams:
+    # highest permission and the permission granted by each team (child teams inherit the permissions of their parent team).
+    @staticmethod
+    def query_access_index(index: Dict[str, Any], kind: str, name: str) -> Optional[Dict[str, Any]]:
+        entries = index[f"{kind}s"]
+        if kind != "user" and "/" not in name:
+            name = f"{OrgGenerator._DEFAULT_ORG}/{name}"
+        if name not in entries:
+            name = next((key for key in entries if key.lower() == name.lower()), None)
+            if name is None:
+                return None
+        result = {"name": name} | entries[name]
+        if kind == "user":
+            repos: Dict[str, Dict[str, Any]] = {}
+            for team in result["teams"]:
+                parent = team
+                while parent:
+                    for r, p in index["teams"][parent]["repos"].items():
+                        entry = repos.setdefault(r, {"permission": p, "teams": {}})
+                        entry["permission"] = OrgGenerator._max_permission(entry["permission"], p)
+                        entry["teams"][team] = OrgGenerator._max_permission(entry["teams"].get(team), p)
+                    parent = index["teams"][parent]["parent"]
+            result["repos"] = dict(sorted(repos.items()))
+        return result
+
+    @staticmethod
+    def format_access_query(kind: str, result: Dict[str, Any]) -> str:
+        lines = [result["name"]]
+        if kind == "repo":
+            lines.append(f"  working group: {result['wg'] or '-'}")
+            lines.append(f"  areas: {', '.join(result['areas']) or '-'}")
+            lines += ["  teams:"] + [f"    {t}: {p}" for t, p in sorted(result["teams"].items())]
+        elif kind == "user":
+            lines.append("  roles:")
+            for role in result["roles"]:
+                scope = role.get("org") or " / ".join(filter(None, [role["wg"], role.get("area")]))
+                lines.append(f"    {scope}: {role['role']}")
+            lines += ["  teams:"] + [f"    {t}" for t in result["teams"]]
+            lines.append("  repos:")
+            for r, e in result["repos"].items():
+                lines.append(f"    {r}: {e['permission']} ({', '.join(f'{t}: {p}' for t, p in e['teams'].items())})")
+        else:
+            lines.append(f"  parent: {result['parent'] or '-'}")
+            lines += ["  members:"] + [f"    {m}" for m in result["members"]]
+            lines += ["  repos:"] + [f"    {r}: {p}" for r, p in sorted(result["repos"].items())]
+        return "\n".join(lines)
+
+    # optional org: configuration of this org only, e.g. to apply the orgs with parallel peribolos runs
+    def write_org_config(self, path: str, org: Optional[str] = None):
         print(f"Writing org configuration to {path}")
+        org_cfg = self.org_cfg if org is None else self.org_cfg | {"orgs": {org: self.org_cfg["orgs"][org]}}
         with open(path, "w") as stream:
-            return yaml.safe_dump(self.org_cfg, stream)
+            # orgs -> org -> sections -> teams/repos
+            OrgGenerator._yaml_stream(org_cfg, stream, 4)
 
-    def write_branch_protection(self, path: str):
+    def write_branch_protection(self, path: str, org: Optional[str] = None):
         print(f"Writing branch protection to {path}")
+        branch_protection = self.branch_protection
+        if org is not None:
+            rules = self.branch_protection["branch-protection"]
+            branch_protection = self.branch_protection | {"branch-protection": rules | {"orgs": {org: rules["orgs"][org]}}}
         with open(path, "w") as stream:
-            return yaml.safe_dump(self.branch_protection, stream)
+            # branch-protection -> orgs -> org -> repos -> repo
+            OrgGenerator._yaml_stream(branch_protection, stream, 5)
+
+    # sections of the org configuration written to separate shards, other org settings are written to settings.yml
+    _SHARD_SECTIONS = {"members": ["admins", "members"], "teams": ["teams"], "repos": ["repos"]}
+
+    # generated configuration as shards of the org configuration and branch protection rules (yaml docs with the same structure):
+    # <org>/settings.yml, <org>/members.yml, <org>/teams.yml, <org>/repos.yml and <org>/branchprotection.yml
+    def _shards(self) -> Dict[str, Any]:
+        shards = {}
+        for org, cfg in sorted(self.org_cfg["orgs"].items()):
+            sectioned = {k for keys in OrgGenerator._SHARD_SECTIONS.values() for k in keys}
+            shards[f"{org}/settings.yml"] = {"orgs": {org: {k: v for k, v in cfg.items() if k not in sectioned}}}
+            for section, keys in OrgGenerator._SHARD_SECTIONS.items():
+                shards[f"{org}/{section}.yml"] = {"orgs": {org: {k: cfg[k] for k in keys if k in cfg}}}
+        rules = self.branch_protection["branch-protection"]
+        for org, org_rules in sorted(rules["orgs"].items()):
+            shards[f"{org}/branchprotection.yml"] = {"branch-protection": rules | {"orgs": {org: org_rules}}}
+        return shards
+
+    # writes the shards to `path` plus shards.json with the sha256 of each shard. Output is deterministic, i.e. unchanged shards
+    # are byte-identical and are not rewritten, shards of a previous run that are not generated anymore are removed.
+    # returns the changed shards
+    def write_shards(self, path: str) -> List[str]:
+        print(f"Writing configuration shards to {path}")
+        manifest_path = os.path.join(path, "shards.json")
+        previous = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r") as stream:
+                previous = json.load(stream)
+        manifest = {}
+        changed = []
+        for name, shard in self._shards().items():
+            content = io.StringIO()
+            OrgGenerator._yaml_stream(shard, content, 5)
+            data = content.getvalue().encode()
+            manifest[name] = hashlib.sha256(data).hexdigest()
+            shard_path = os.path.join(path, name)
+            if previous.get(name) == manifest[name] and os.path.exists(shard_path):
+                continue
+            changed.append(name)
+            os.makedirs(os.path.dirname(shard_path), exist_ok=True)
+            with open(shard_path, "wb") as stream:
+                stream.write(data)
+        for name in previous.keys() - manifest.keys():
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(path, name))
+        with open(manifest_path, "w") as stream:
+            json.dump(manifest, stream, indent=2, sort_keys=True)
+        return changed
 
+    # per org output file next to the output file of all orgs: orgs.out.yml -> orgs.out.<org>.yml
     @staticmethod
-    def _yaml_load(stream) -> dict[str, Any]:
+    def _org_output_path(path: str, org: str) -> str:
+        root, ext = os.path.splitext(path)
+        return f"{root}.{org}{ext}"
+
+    @staticmethod
+    def _yaml_load(stream, loader=None) -> dict[str, Any]:
         # safe_load + reject unique keys
-        return yaml.load(stream, UniqueKeyLoader)
+        return yaml.load(stream, loader or UniqueKeyLoader)
+
+    @staticmethod
+    def _yaml_dump(data, stream=None, dumper=None):
+        # same as safe_dump, but with libyaml emitter if available
+        return yaml.dump(data, stream, Dumper=dumper or SafeDumper)
 
+    # streaming variant of _yaml_dump for the generated configuration: the mappings of the first `levels` levels (e.g. orgs, org sections,
+    # teams) are emitted entry by entry, only the values below are represented as yaml nodes. I.e. no node tree of the complete document
+    # is built. Keys are sorted like in _yaml_dump, output is identical except that objects used multiple times are repeated, not aliased.
     @staticmethod
-    def _read_yml_file(path: str):
+    def _yaml_stream(data, stream, levels: int, dumper=None):
+        dumper = (dumper or SafeDumper)(stream, default_flow_style=False, sort_keys=True)
+        dumper.emit(yaml.StreamStartEvent())
+        dumper.emit(yaml.DocumentStartEvent(explicit=False))
+        for event in OrgGenerator._yaml_events(dumper, data, levels):
+            dumper.emit(event)
+        dumper.emit(yaml.DocumentEndEvent(explicit=False))
+        dumper.emit(yaml.StreamEndEvent())
+
+    @staticmethod
+    def _yaml_events(dumper, data, levels: int) -> Iterator[yaml.Event]:
+        if levels > 0 and isinstance(data, dict) and data:
+            yield yaml.MappingStartEvent(None, None, True, flow_style=False)
+            for key in sorted(data):
+                yield from OrgGenerator._yaml_events(dumper, key, 0)
+                yield from OrgGenerator._yaml_events(dumper, data[key], levels - 1)
+            yield yaml.MappingEndEvent()
+        else:
+            node = dumper.represent_data(data)
+            dumper.represented_objects = {}
+            dumper.object_keeper = []
+            yield from OrgGenerator._yaml_node_events(dumper, node)
+
+    # events of a yaml node w/o anchors, see yaml.serializer.Serializer.serialize_node
+    @staticmethod
+    def _yaml_node_events(dumper, node: yaml.Node) -> Iterator[yaml.Event]:
+        if isinstance(node, yaml.ScalarNode):
+            implicit = (
+                node.tag == dumper.resolve(yaml.ScalarNode, node.value, (True, False)),
+                node.tag == dumper.resolve(yaml.ScalarNode, node.value, (False, True)),
+            )
+            yield yaml.ScalarEvent(None, node.tag, implicit, node.value, style=node.style)
+        elif isinstance(node, yaml.SequenceNode):
+            implicit = node.tag == dumper.resolve(yaml.SequenceNode, node.value, True)
+            yield yaml.SequenceStartEvent(None, node.tag, implicit, flow_style=node.flow_style)
+            for item in node.value:
+                yield from OrgGenerator._yaml_node_events(dumper, item)
+            yield yaml.SequenceEndEvent()
+        else:
+            implicit = node.tag == dumper.resolve(yaml.MappingNode, node.value, True)
+            yield yaml.MappingStartEvent(None, node.tag, implicit, flow_style=node.flow_style)
+            for key, value in node.value:
+                yield from OrgGenerator._yaml_node_events(dumper, key)
+                yield from OrgGenerator._yaml_node_events(dumper, value)
+            yield yaml.MappingEndEvent()
+
+    @staticmethod
+    def _read_yml_file(path: str, validate: Callable[[Any], Any], cache: Optional[ParseCache] = None):
+        if cache:
+            return cache.load(path, validate.__name__, OrgGenerator._cache_version(), lambda c: validate(OrgGenerator._yaml_load(c)))
         with open(path, "r") as stream:
-            return OrgGenerator._yaml_load(stream)
+            return validate(OrgGenerator._yaml_load(stream))
 
     @staticmethod
-    def _read_wg_charter(path: str):
+    def _read_wg_charter(path: str, cache: Optional[ParseCache] = None):
         print(f"Reading WG from {path}")
-        with open(path, "r") as stream:
-            wg_charter = stream.read()
-            wg = OrgGenerator._extract_wg_config(wg_charter)
-            if not wg:
-                wg = None
-                print("... Ignoring. Missing yaml block with WG definition.")
-            return wg
+        if cache:
+            wg = cache.load(path, "wg_charter", OrgGenerator._cache_version(), lambda c: OrgGenerator._extract_wg_config(c, path))
+        else:
+            with open(path, "r") as stream:
+                wg = OrgGenerator._extract_wg_config(stream, path)
+        if not wg:
+            wg = None
+            print("... Ignoring. Missing yaml block with WG definition.")
+        return wg
+
+    @staticmethod
+    def _cache_version() -> str:
+        # parse results depend on schemas and managed orgs, invalidate cache entries if these change
+        return json.dumps(
+            [
+                OrgGenerator._MANAGED_ORGS,
+                OrgGenerator._DEFAULT_ORG,
+                OrgGenerator._CONTRIBUTORS_SCHEMA,
+                OrgGenerator._WG_SCHEMA,
+                OrgGenerator._GITHUB_ORG_CFG_SCHEMA,
+                OrgGenerator._BRANCH_PROTECTION_SCHEMA,
+                OrgGenerator._YAML_BLOCK_START,
+                OrgGenerator._YAML_BLOCK_END,
+            ]
+        )
 
-    _YAML_BLOCK_RE = re.compile("```yaml(.*)```", re.DOTALL)
+    _YAML_BLOCK_START = "```yaml"
+    _YAML_BLOCK_END = "```"
 
+    # first fenced yaml block of a charter (string or text stream) in one pass, reading stops at the closing fence
+    # returns the block and the line number of its first line (the line of the opening fence), None if there is no closed block
     @staticmethod
-    def _extract_wg_config(wg_charter: str):
-        # extract (first) yaml block
-        match = re.search(OrgGenerator._YAML_BLOCK_RE, wg_charter)
-        return OrgGenerator._validate_wg(OrgGenerator._yaml_load(match.group(1))) if match else None
+    def _yaml_block(charter: Union[str, Iterable[str]]) -> Optional[Tuple[str, int]]:
+        if isinstance(charter, str):
+            start = charter.find(OrgGenerator._YAML_BLOCK_START)
+            end = charter.find(OrgGenerator._YAML_BLOCK_END, start + len(OrgGenerator._YAML_BLOCK_START)) if start >= 0 else -1
+            if end < 0:
+                return None
+            return charter[start + len(OrgGenerator._YAML_BLOCK_START) : end], charter.count("\n", 0, start) + 1
+        block = None
+        first_line = 0
+        for number, line in enumerate(charter, 1):
+            if block is None:
+                start = line.find(OrgGenerator._YAML_BLOCK_START)
+                if start < 0:
+                    continue
+                block = []
+                first_line = number
+                line = line[start + len(OrgGenerator._YAML_BLOCK_START) :]
+            end = line.find(OrgGenerator._YAML_BLOCK_END)
+            if end >= 0:
+                block.append(line[:end])
+                return "".join(block), first_line
+            block.append(line)
+        return None
+
+    # charter as string or text stream, path for the error messages
+    # yaml and schema errors refer to the line in the charter file
+    @staticmethod
+    def _extract_wg_config(wg_charter: Union[str, Iterable[str]], path: Optional[str] = None):
+        block = OrgGenerator._yaml_block(wg_charter)
+        wg = OrgGenerator._load_wg_block(block, path)
+        if not wg:
+            return None
+        try:
+            return OrgGenerator._validate_wg(wg)
+        except jsonschema.ValidationError as e:
+            node = ProjectValidator._node(OrgGenerator._yaml_compose(block[0]), e.absolute_path)
+            if node is not None:
+                e.add_note(f'in "{path or "<charter>"}", line {node.start_mark.line + block[1]}')
+            raise
+
+    # extract (first) yaml block, as written in the charter
+    @staticmethod
+    def _load_wg_block(block: Optional[Tuple[str, int]], path: Optional[str] = None):
+        if block is None:
+            return None
+        try:
+            return OrgGenerator._yaml_load(block[0])
+        except yaml.MarkedYAMLError as e:
+            # marks of the block -> marks of the charter (libyaml marks are read-only)
+            for attr in ["context_mark", "problem_mark"]:
+                mark = getattr(e, attr)
+                if mark is not None:
+                    line = mark.line + block[1] - 1
+                    setattr(e, attr, yaml.Mark(path or mark.name, mark.index, line, mark.column, mark.buffer, mark.pointer))
+            raise
+
+    @staticmethod
+    def _yaml_compose(content: str) -> Optional[yaml.Node]:
+        loader = UniqueKeyLoader(content)
+        try:
+            return loader.get_single_node()
+        finally:
+            loader.dispose()
+
+    # charters exported by export-wgs (formerly toc/working-groups/parsable-working-groups.sh), in this order:
+    # toc/*.md and toc/working-groups/*.md, sorted, w/o files whose name contains one of the excludes
+    _EXPORT_WG_FILES = [
+        ("toc/*.md", ["ROLES", "CHANGEPLAN", "PRINCIPLES", "GOVERNANCE"]),
+        ("toc/working-groups/*.md", ["WORKING-GROUPS", "paketo", "vulnerability", "concourse"]),
+    ]
+
+    @staticmethod
+    def _export_wg_files(project_path: str) -> List[str]:
+        return [
+            path
+            for pattern, excludes in OrgGenerator._EXPORT_WG_FILES
+            for path in sorted(glob.glob(f"{project_path}/{pattern}"))
+            if not any(e in os.path.basename(path) for e in excludes)
+        ]
+
+    # default cache file of export-wgs, one per project checkout in the shared cache or temp dir
+    @staticmethod
+    def _export_cache_path(project_path: str = _PROJECT_PATH) -> str:
+        cache_dir = os.environ.get("ORG_MANAGEMENT_CACHE_DIR") or tempfile.gettempdir()
+        project_hash = hashlib.sha256(os.path.abspath(project_path).encode()).hexdigest()[:16]
+        return os.path.join(cache_dir, f"org-management-working-groups-{project_hash}.json")
+
+    # compact json list of the yaml blocks of all charters, as written in the charters (no defaults applied)
+    # the result is cached in a file stamped with the hash of all charters, i.e. repeated exports only read and hash the charters
+    # invalid charters fail the export unless validate is False (behaviour of parsable-working-groups.sh)
+    @staticmethod
+    def export_working_groups(project_path: str = _PROJECT_PATH, cache_path: Optional[str] = None, validate: bool = True) -> str:
+        paths = OrgGenerator._export_wg_files(project_path)
+        charters = {}
+        stamp = hashlib.sha256(OrgGenerator._cache_version().encode() + (b"\0validate\0" if validate else b"\0"))
+        for path in paths:
+            with open(path, "rb") as stream:
+                charters[path] = stream.read()
+            stamp.update(os.path.relpath(path, project_path).encode() + b"\0" + charters[path] + b"\0")
+        stamp = stamp.hexdigest()
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, "r") as stream:
+                cached = json.load(stream)
+            if cached.get("stamp") == stamp:
+                return cached["working_groups"]
+
+        wgs = []
+        for path in paths:
+            wg = OrgGenerator._load_wg_block(OrgGenerator._yaml_block(charters[path].decode()), path)
+            if wg:
+                # fail on invalid charters like the generator, but export the block as written
+                if validate:
+                    OrgGenerator._validate_wg(json.loads(json.dumps(wg, default=str)))
+                wgs.append(wg)
+        working_groups = json.dumps(wgs, separators=(",", ":"), ensure_ascii=False, default=str)
+        if cache_path:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(cache_path)))
+            with os.fdopen(fd, "w") as stream:
+                json.dump({"stamp": stamp, "working_groups": working_groups}, stream)
+            os.replace(tmp_path, cache_path)
+        return working_groups
 
     @staticmethod
     def _empty_wg_config(name: str):
@@ -254,24 +1249,34 @@ class OrgGenerator:
             "areas": [],
         }
 
+    # role sets are computed once per WorkingGroup, charter dicts are converted
     @staticmethod
-    def _wg_github_users(wg) -> Set[str]:
-        users = {u["github"] for u in wg["execution_leads"]}
-        users |= {u["github"] for u in wg["technical_leads"]}
-        users |= {u["github"] for u in wg["bots"]}
-        for area in wg["areas"]:
-            users |= {u["github"] for u in area["approvers"]}
-            if "reviewers" in area:
-                users |= {u["github"] for u in area["reviewers"]}
-            if "bots" in area:
-                users |= {u["github"] for u in area["bots"]}
-        return users
+    def _wg_github_users(wg) -> FrozenSet[str]:
+        return WorkingGroup.of(wg).user_logins
 
     @staticmethod
-    def _wg_github_users_leads(wg) -> Set[str]:
-        users = {u["github"] for u in wg["execution_leads"]}
-        users |= {u["github"] for u in wg["technical_leads"]}
-        return users
+    def _wg_github_users_leads(wg) -> FrozenSet[str]:
+        return WorkingGroup.of(wg).lead_logins
+
+    # validators are created once per process, jsonschema.validate checks the schema and creates a new validator on every call
+    _SCHEMA_VALIDATORS: Dict[str, Any] = {}
+
+    @staticmethod
+    def _schema_validator(schema_name: str):
+        validator = OrgGenerator._SCHEMA_VALIDATORS.get(schema_name)
+        if validator is None:
+            schema = getattr(OrgGenerator, schema_name)
+            cls = jsonschema.validators.validator_for(schema)
+            cls.check_schema(schema)
+            validator = OrgGenerator._SCHEMA_VALIDATORS[schema_name] = cls(schema)
+        return validator
+
+    @staticmethod
+    def _schema_validate(instance, schema_name: str):
+        # same semantics as jsonschema.validate: raise the best matching error (incl. its json path)
+        error = jsonschema.exceptions.best_match(OrgGenerator._schema_validator(schema_name).iter_errors(instance))
+        if error is not None:
+            raise error
 
     _CONTRIBUTORS_SCHEMA = {
         "type": "object",
@@ -295,7 +1300,7 @@ class OrgGenerator:
 
     @staticmethod
     def _validate_contributors(contributors) -> dict[str, Any]:
-        jsonschema.validate(contributors, OrgGenerator._CONTRIBUTORS_SCHEMA)
+        OrgGenerator._schema_validate(contributors, "_CONTRIBUTORS_SCHEMA")
         # check that orgs are in _ORGS
         for org in contributors["orgs"]:
             if org not in OrgGenerator._MANAGED_ORGS:
@@ -341,7 +1346,7 @@ class OrgGenerator:
 
     @staticmethod
     def _validate_wg(wg) -> dict[str, Any]:
-        jsonschema.validate(wg, OrgGenerator._WG_SCHEMA)
+        OrgGenerator._schema_validate(wg, "_WG_SCHEMA")
         # validate org and use 'cloudfoundry' if missing
         if "org" not in wg:
             wg["org"] = OrgGenerator._DEFAULT_ORG
@@ -373,7 +1378,7 @@ class OrgGenerator:
 
     @staticmethod
     def _validate_github_org_cfg(cfg):
-        jsonschema.validate(cfg, OrgGenerator._GITHUB_ORG_CFG_SCHEMA)
+        OrgGenerator._schema_validate(cfg, "_GITHUB_ORG_CFG_SCHEMA")
         # check that orgs are in _ORGS
         for org in cfg["orgs"]:
             if org not in OrgGenerator._MANAGED_ORGS:
@@ -408,7 +1413,7 @@ class OrgGenerator:
 
     @staticmethod
     def _validate_branch_protection(cfg):
-        jsonschema.validate(cfg, OrgGenerator._BRANCH_PROTECTION_SCHEMA)
+        OrgGenerator._schema_validate(cfg, "_BRANCH_PROTECTION_SCHEMA")
         # check that orgs are in _ORGS
         for org in cfg["branch-protection"]["orgs"]:
             if org not in OrgGenerator._MANAGED_ORGS:
@@ -418,91 +1423,87 @@ class OrgGenerator:
     # https://github.com/cloudfoundry/community/blob/main/toc/rfc/rfc-0005-github-teams-and-access.md
     @staticmethod
     def _generate_wg_teams(wg) -> Tuple[str, Dict[str, Any]]:
-        org = wg["org"]
-        org_prefix = org + "/"
-        org_prefix_len = len(org_prefix)
-        name = OrgGenerator._kebab_case(f"wg-{wg['name']}")
-        maintainers = {u["github"] for u in wg["execution_leads"]}
-        maintainers |= {u["github"] for u in wg["technical_leads"]}
-        approvers = {u["github"] for a in wg["areas"] for u in a["approvers"]}
-        repositories = {r[org_prefix_len:] for a in wg["areas"] for r in a["repositories"] if r.startswith(org_prefix)}
+        wg = WorkingGroup.of(wg)
+        org = wg.org
+        name = OrgGenerator._kebab_case(f"wg-{wg.name}")
+        maintainers = wg.lead_logins
+        approvers = frozenset().union(*(a.approver_logins for a in wg.areas))
+        repositories = {r.name for a in wg.areas for r in a.repositories if r.org == org}
         # WG team and teams for WG areas
         team = {
-            "description": f"Leads and approvers for {wg['name']} WG",
+            "description": f"Leads and approvers for {wg.name} WG",
             "privacy": "closed",
             "maintainers": sorted(maintainers),
             "members": sorted(approvers - maintainers),
             "teams": {
                 f"{name}-leads": {
-                    "description": f"Leads for {wg['name']} WG",
+                    "description": f"Leads for {wg.name} WG",
                     "privacy": "closed",
                     "maintainers": sorted(maintainers),
                     "repos": {r: "admin" for r in repositories},
                 },
                 f"{name}-bots": {
-                    "description": f"Bot accounts for {wg['name']} WG",
+                    "description": f"Bot accounts for {wg.name} WG",
                     "privacy": "closed",
                     "maintainers": sorted(maintainers),
-                    "members": sorted({u["github"] for u in wg["bots"]} - maintainers),
+                    "members": sorted({u.github for u in wg.bots} - maintainers),
                     "repos": {r: "write" for r in repositories},
                 },
             },
         }
         # approvers per area
         team["teams"] |= {
-            OrgGenerator._kebab_case(f"{name}-{a['name']}-approvers"): {
-                "description": f"Approvers for {wg['name']} WG, {a['name']} area",
+            OrgGenerator._kebab_case(f"{name}-{a.name}-approvers"): {
+                "description": f"Approvers for {wg.name} WG, {a.name} area",
                 "privacy": "closed",
                 "maintainers": sorted(maintainers),
-                "members": sorted({u["github"] for u in a["approvers"]} - maintainers),
-                "repos": {r[org_prefix_len:]: "write" for r in a["repositories"] if r.startswith(org_prefix)},
+                "members": sorted(a.approver_logins - maintainers),
+                "repos": {r.name: "write" for r in a.repositories if r.org == org},
             }
-            for a in wg["areas"]
+            for a in wg.areas
         }
         # optional reviewers per area
         team["teams"] |= {
-            OrgGenerator._kebab_case(f"{name}-{a['name']}-reviewers"): {
-                "description": f"Reviewers for {wg['name']} WG, {a['name']} area",
+            OrgGenerator._kebab_case(f"{name}-{a.name}-reviewers"): {
+                "description": f"Reviewers for {wg.name} WG, {a.name} area",
                 "privacy": "closed",
                 "maintainers": sorted(maintainers),
-                "members": sorted({u["github"] for u in a["reviewers"]} - maintainers),
-                "repos": {r[org_prefix_len:]: "read" for r in a["repositories"] if r.startswith(org_prefix)},
+                "members": sorted({u.github for u in a.reviewers} - maintainers),
+                "repos": {r.name: "read" for r in a.repositories if r.org == org},
             }
-            for a in wg["areas"]
-            if "reviewers" in a
+            for a in wg.areas
+            if a.reviewers is not None
         }
         # optional bots per area
         team["teams"] |= {
-            OrgGenerator._kebab_case(f"{name}-{a['name']}-bots"): {
-                "description": f"Bot accounts for {wg['name']} WG, {a['name']} area",
+            OrgGenerator._kebab_case(f"{name}-{a.name}-bots"): {
+                "description": f"Bot accounts for {wg.name} WG, {a.name} area",
                 "privacy": "closed",
                 "maintainers": sorted(maintainers),
-                "members": sorted({u["github"] for u in a["bots"]} - maintainers),
-                "repos": {r[org_prefix_len:]: "write" for r in a["repositories"] if r.startswith(org_prefix)},
+                "members": sorted({u.github for u in a.bots} - maintainers),
+                "repos": {r.name: "write" for r in a.repositories if r.org == org},
             }
-            for a in wg["areas"]
-            if "bots" in a
+            for a in wg.areas
+            if a.bots is not None
         }
         return (name, team)
 
     @staticmethod
     def _generate_toc_team(wg) -> Tuple[str, Dict[str, Any]]:
-        org = wg["org"]
-        org_prefix = org + "/"
-        org_prefix_len = len(org_prefix)
+        wg = WorkingGroup.of(wg)
         # assumption: TOC members are execution_leads
-        repositories = {r[org_prefix_len:] for a in wg["areas"] for r in a["repositories"] if r.startswith(org_prefix)}
+        repositories = {r.name for a in wg.areas for r in a.repositories if r.org == wg.org}
         team = {
-            "description": wg["name"],
+            "description": wg.name,
             "privacy": "closed",
-            "maintainers": sorted({u["github"] for u in wg["execution_leads"]}),
+            "maintainers": sorted({u.github for u in wg.execution_leads}),
             "repos": {r: "admin" for r in repositories},
         }
         return ("toc", team)
 
     @staticmethod
     def _generate_wg_leads_team(wgs: List[Any]) -> Tuple[str, Dict[str, Any]]:
-        members = {u for wg in wgs for u in OrgGenerator._wg_github_users_leads(wg)}
+        members = frozenset().union(*(OrgGenerator._wg_github_users_leads(wg) for wg in wgs))
         team = {
             "description": "Technical and Execution Leads for all WGs",
             "privacy": "closed",
@@ -513,40 +1514,28 @@ class OrgGenerator:
     # https://github.com/cloudfoundry/community/blob/main/toc/rfc/rfc-0015-branch-protection.md
     # returns hash with branch protection rules per repo
     def _generate_wg_branch_protection(self, wg) -> Dict[str, Any]:
-        org = wg["org"]
-        org_prefix = org + "/"
-        org_prefix_len = len(org_prefix)
+        wg = WorkingGroup.of(wg)
+        org = wg.org
         # count approvers per repo over all WG areas, TODO: repos shared between WGs?
-        repos = {r[org_prefix_len:] for a in wg["areas"] for r in a["repositories"] if r.startswith(org_prefix)}
-        wg_name = f"wg-{wg['name']}"
+        wg_name = f"wg-{wg.name}"
         wg_bots = OrgGenerator._kebab_case(f"{wg_name}-bots")
         return {
-            repo: {
+            r.name: {
                 "protect": True,
                 "enforce_admins": True,
                 "allow_force_pushes": False,
                 "allow_deletions": False,
                 "allow_disabled_policies": True,  # needed to allow branches w/o branch protection
-                "include": [f"^{self._get_default_branch(org, repo)}$", "^v[0-9]*$"],
+                "include": [f"^{self._get_default_branch(org, r.name)}$", "^v[0-9]*$"],
                 "required_pull_request_reviews": {
                     "dismiss_stale_reviews": True,
                     "require_code_owner_reviews": True,
-                    "required_approving_review_count": (
-                        0
-                        if len({u["github"] for a in wg["areas"] if org_prefix + repo in a["repositories"] for u in a["approvers"]}) < 4
-                        else 1
-                    ),
-                    "bypass_pull_request_allowances": {
-                        "teams": [wg_bots]  # wg bot team
-                        + [
-                            OrgGenerator._kebab_case(f"{wg_name}-{a['name']}-bots")
-                            for a in wg["areas"]
-                            if org_prefix + repo in a["repositories"] and "bots" in a and len(a["bots"]) > 0
-                        ]  # area bot teams
-                    },
+                    "required_approving_review_count": 0 if len(entry["approvers"]) < 4 else 1,
+                    "bypass_pull_request_allowances": {"teams": [wg_bots] + entry["bot_teams"]},  # wg bot team + area bot teams
                 },
             }
-            for repo in repos
+            for r, entry in wg.repo_index.items()
+            if r.org == org
         }
 
     def _get_default_branch(self, org: str, repo: str) -> str:
@@ -565,22 +1554,414 @@ class OrgGenerator:
         return OrgGenerator._KEBAB_CASE_RE.sub("-", name.lower()).strip("-")
 
 
+# validation of all input files in one pass (validate command): orgs.yml, contributors.yml, branchprotection.yml and the charters are
+# parsed and schema-checked concurrently in worker processes. Unlike load_from_project, which stops at the first error, every error
+# is collected with its file, line and json path, including repos owned by multiple WGs (RFC-0007) at the line where they are listed.
+class ProjectValidator:
+    # rule id -> description, for SARIF
+    _RULES = {
+        "yaml": "Invalid yaml (syntax error or duplicate key)",
+        "schema": "Violation of the input file schema",
+        "org": "Github org is not managed, see ORGS.md",
+        "ownership": "Repository is owned by multiple WGs, see RFC-0007",
+    }
+
+    def __init__(self, project_path: str = _PROJECT_PATH, max_workers: Optional[int] = None):
+        self.project_path = project_path
+        self.max_workers = max_workers
+        self.files: List[str] = []
+        # {"file", "line", "path", "rule", "message"}, file relative to project path, line and path may be None
+        self.errors: List[Dict[str, Any]] = []
+
+    def validate(self) -> bool:
+        toc = f"{self.project_path}/toc/TOC.md"
+        files = [(f"{self.project_path}/orgs/orgs.yml", "_GITHUB_ORG_CFG_SCHEMA")]
+        if os.path.exists(f"{self.project_path}/orgs/contributors.yml"):
+            files.append((f"{self.project_path}/orgs/contributors.yml", "_CONTRIBUTORS_SCHEMA"))
+        files.append((f"{self.project_path}/orgs/branchprotection.yml", "_BRANCH_PROTECTION_SCHEMA"))
+        files += [(path, "_WG_SCHEMA") for path in [toc] + OrgGenerator._wg_charter_files(self.project_path)]
+        self.files = [os.path.relpath(path, self.project_path) for path, _ in files]
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            paths, schemas = zip(*files)
+            results = list(executor.map(ProjectValidator._validate_file, paths, schemas, repeat(OrgGenerator._MANAGED_ORGS)))
+        wgs = []
+        for file, (errors, wg) in zip(self.files, results):
+            self.errors += [{"file": file} | e for e in errors]
+            if wg and file != os.path.relpath(toc, self.project_path):
+                wgs.append((file, wg))
+
+        # rfc-0007-repository-ownership, same semantics as OrgGenerator.validate_repo_ownership
+        for org in OrgGenerator._MANAGED_ORGS:
+            repo_owners = {}
+            for file, wg in wgs:
+                if wg["org"] != org:
+                    continue
+                for repo, (line, path) in wg["repos"].items():
+                    if repo in repo_owners:
+                        message = f"Repository {repo} is owned by multiple WGs: {repo_owners[repo]}, {wg['name']}"
+                        self.errors.append({"file": file, "line": line, "path": path, "rule": "ownership", "message": message})
+                    else:
+                        repo_owners[repo] = wg["name"]
+        return not self.errors
+
+    # errors of one input file and for WG charters the WG name, org and repos with line and json path of their first listing
+    @staticmethod
+    def _validate_file(path: str, schema_name: str, managed_orgs: List[str]) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        with open(path, "r") as stream:
+            # line of the yaml content in the file
+            if schema_name == "_WG_SCHEMA":
+                block = OrgGenerator._yaml_block(stream)
+                if block is None:
+                    # charters w/o yaml block are ignored like in load_from_project
+                    return [], None
+                content, offset = block
+            else:
+                content, offset = stream.read(), 1
+        errors = []
+
+        def error(rule: str, message: str, node: Optional[yaml.Node], path: Optional[List[Any]]):
+            line = node.start_mark.line + offset if node is not None else None
+            json_path = ProjectValidator._json_path(path) if path is not None else None
+            errors.append({"line": line, "path": json_path, "rule": rule, "message": message})
+
+        def yaml_error(e: yaml.YAMLError):
+            if isinstance(e, yaml.MarkedYAMLError):
+                mark, message = e.problem_mark or e.context_mark, e.problem or e.context
+            else:
+                mark, message = None, str(e)
+            errors.append({"line": mark.line + offset if mark else None, "path": None, "rule": "yaml", "message": message})
+
+        loader = UniqueKeyLoader(content)
+        try:
+            root = loader.get_single_node()
+        except yaml.YAMLError as e:
+            yaml_error(e)
+            return errors, None
+        finally:
+            loader.dispose()
+
+        for key_node, path in ProjectValidator._duplicate_keys(root, []):
+            error("yaml", f"Duplicate key {key_node.value!r} found.", key_node, path)
+        # duplicate keys are reported above, construct the data nevertheless (last value wins) to check the schema
+        try:
+            data = yaml.constructor.SafeConstructor().construct_document(root) if root is not None else None
+        except yaml.YAMLError as e:
+            # e.g. non-scalar (unhashable) keys
+            yaml_error(e)
+            return errors, None
+        for e in sorted(OrgGenerator._schema_validator(schema_name).iter_errors(data), key=lambda e: [str(p) for p in e.absolute_path]):
+            error("schema", e.message, ProjectValidator._node(root, e.absolute_path), list(e.absolute_path))
+        if errors:
+            return errors, None
+
+        if schema_name == "_WG_SCHEMA":
+            org = data.get("org", OrgGenerator._DEFAULT_ORG)
+            if org not in managed_orgs:
+                message = f"Invalid org {org} in {data['name']}, expected one of {managed_orgs}"
+                error("org", message, ProjectValidator._node(root, ["org"]), ["org"])
+            repos = {}
+            for i, a in enumerate(data["areas"]):
+                for j, repo in enumerate(a["repositories"]):
+                    path = ["areas", i, "repositories", j]
+                    repos.setdefault(repo, (ProjectValidator._node(root, path).start_mark.line + offset, ProjectValidator._json_path(path)))
+            return errors, {"name": data["name"], "org": org, "repos": repos}
+
+        orgs_path = ["branch-protection", "orgs"] if schema_name == "_BRANCH_PROTECTION_SCHEMA" else ["orgs"]
+        orgs = data
+        for key in orgs_path:
+            orgs = orgs[key]
+        for org in orgs:
+            if org not in managed_orgs:
+                message = f"Invalid org {org} in {os.path.basename(path)}, expected one of {managed_orgs}"
+                error("org", message, ProjectValidator._node(root, orgs_path + [org]), orgs_path + [org])
+        return errors, None
+
+    # (key node, json path of the mapping) of all scalar keys that occur more than once in their mapping,
+    # non-scalar keys are skipped (reported when constructing the data)
+    @staticmethod
+    def _duplicate_keys(node: Optional[yaml.Node], path: List[Any]) -> Iterator[Tuple[yaml.Node, List[Any]]]:
+        if isinstance(node, yaml.MappingNode):
+            keys = set()
+            for key_node, value_node in node.value:
+                if not isinstance(key_node, yaml.ScalarNode):
+                    continue
+                if key_node.value in keys:
+                    yield key_node, path
+                keys.add(key_node.value)
+                yield from ProjectValidator._duplicate_keys(value_node, path + [key_node.value])
+        elif isinstance(node, yaml.SequenceNode):
+            for i, value_node in enumerate(node.value):
+                yield from ProjectValidator._duplicate_keys(value_node, path + [i])
+
+    # node marking the json path (key node of mapping entries) or its deepest existing ancestor
+    @staticmethod
+    def _node(node: Optional[yaml.Node], path: Iterable[Any]) -> Optional[yaml.Node]:
+        marker = node
+        for p in path:
+            if isinstance(node, yaml.MappingNode):
+                entry = next(((k, v) for k, v in node.value if k.value == str(p)), None)
+                if entry is None:
+                    break
+                marker, node = entry
+            elif isinstance(node, yaml.SequenceNode) and isinstance(p, int) and p < len(node.value):
+                marker = node = node.value[p]
+            else:
+                break
+        return marker
+
+    @staticmethod
+    def _json_path(path: Iterable[Any]) -> str:
+        return "$" + "".join(f"[{p}]" if isinstance(p, int) else f".{p}" for p in path)
+
+    def format_errors(self) -> str:
+        lines = []
+        for e in self.errors:
+            location = f"{e['file']}:{e['line']}" if e["line"] else e["file"]
+            lines.append(f"ERROR: {location}: {e['path'] + ': ' if e['path'] else ''}{e['message']}")
+        lines.append(f"Validated {len(self.files)} files: {len(self.errors)} errors")
+        return "\n".join(lines)
+
+    # https://docs.oasis-open.org/sarif/sarif/v2.1.0/sarif-v2.1.0.html
+    def sarif(self) -> Dict[str, Any]:
+        results = []
+        for e in self.errors:
+            location: Dict[str, Any] = {"physicalLocation": {"artifactLocation": {"uri": e["file"]}}}
+            if e["line"]:
+                location["physicalLocation"]["region"] = {"startLine": e["line"]}
+            if e["path"]:
+                location["logicalLocations"] = [{"fullyQualifiedName": e["path"]}]
+            results.append({"ruleId": e["rule"], "level": "error", "message": {"text": e["message"]}, "locations": [location]})
+        rules = [{"id": rule, "shortDescription": {"text": text}} for rule, text in ProjectValidator._RULES.items()]
+        return {
+            "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+            "version": "2.1.0",
+            "runs": [{"tool": {"driver": {"name": "org_management", "rules": rules}}, "results": results}],
+        }
+
+
+# watch mode of the generator CLI: polls the input files, re-parses only the changed files (see MemoryParseCache),
+# regenerates org configuration and branch protection rules in memory and prints the changes compared to the last generation
+class ProjectWatcher:
+    def __init__(self, project_path: str = _PROJECT_PATH, interval: float = 0.5):
+        self.project_path = project_path
+        self.interval = interval
+        self.cache = MemoryParseCache()
+        self.generator: Optional[OrgGenerator] = None
+        self.stamps: Dict[str, Tuple[int, int]] = {}
+
+    def _input_files(self) -> List[str]:
+        paths = [f"{self.project_path}/orgs/{f}" for f in ["orgs.yml", "contributors.yml", "branchprotection.yml"]]
+        return paths + [f"{self.project_path}/toc/TOC.md"] + OrgGenerator._wg_charter_files(self.project_path)
+
+    # added, removed and modified input files since the last call
+    def changed_files(self) -> List[str]:
+        stamps = {}
+        for path in self._input_files():
+            with contextlib.suppress(FileNotFoundError):
+                stat = os.stat(path)
+                stamps[path] = (stat.st_mtime_ns, stat.st_size)
+        changed = sorted(p for p in stamps.keys() | self.stamps.keys() if stamps.get(p) != self.stamps.get(p))
+        self.stamps = stamps
+        return changed
+
+    # changes of org configuration and branch protection rules compared to the last generation
+    def regenerate(self) -> Dict[str, Any]:
+        generator = OrgGenerator()
+        self.cache.parsed = []
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            generator.load_from_project(self.cache, self.project_path)
+            generator.validate_repo_ownership()
+            # in process, a pool per regeneration would cost more than generating the orgs
+            generator.generate(max_workers=1)
+        for line in output.getvalue().splitlines():
+            if line.startswith("ERROR"):
+                print(line)
+        self.cache.retain(generator.input_files)
+        changes = {}
+        if self.generator:
+            changes = generator.diff_org_config(self.generator.org_cfg) | generator.diff_branch_protection(self.generator.branch_protection)
+        self.generator = generator
+        return changes
+
+    # regenerates if input files changed, returns the changes or None if nothing was regenerated
+    def poll(self) -> Optional[Dict[str, Any]]:
+        changed = self.changed_files()
+        if not changed:
+            return None
+        start = time.perf_counter()
+        try:
+            changes = self.regenerate()
+        except (OSError, ValueError, yaml.YAMLError, jsonschema.ValidationError) as e:
+            # keep the last generation until the input is fixed
+            print(f"ERROR: {e}")
+            return None
+        parsed = ", ".join(os.path.relpath(p, self.project_path) for p in self.cache.parsed) or "none"
+        print(f"Regenerated in {(time.perf_counter() - start) * 1000:.1f} ms, parsed: {parsed}")
+        print(f"Changes:\n{OrgGenerator._yaml_dump(changes)}" if changes else "No changes")
+        return changes
+
+    def run(self):
+        self.changed_files()
+        self.regenerate()
+        print(f"Watching {len(self.stamps)} input files in {self.project_path}, press Ctrl-C to stop")
+        while True:
+            time.sleep(self.interval)
+            self.poll()
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="CFF Managed Github Orgs Generator")
     parser.add_argument("-o", "--out", default="orgs.out.yml", help="output file for generated org configuration")
     parser.add_argument(
         "-b", "--branchprotection", default="branchprotection.out.yml", help="output file for generated branch protection rules"
     )
+    parser.add_argument(
+        "-c",
+        "--cachedir",
+        default=os.environ.get("ORG_MANAGEMENT_CACHE_DIR"),
+        help="directory for cached parse results of unchanged input files. Supported also as env var 'ORG_MANAGEMENT_CACHE_DIR'",
+    )
+    parser.add_argument("-p", "--previous", help="previous org configuration (last output or peribolos --dump-full) to compute changes")
+    parser.add_argument("-pb", "--previousbranchprotection", help="previous branch protection rules (last output) to compute changes")
+    parser.add_argument("--changes", help="output file for the change set compared to --previous and --previousbranchprotection")
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help=f"exit with code {_EXIT_NO_CHANGES} if there are no changes compared to --previous and --previousbranchprotection",
+    )
+    parser.add_argument("--metrics-out", help="output file for json metrics per phase (wall/cpu time, memory peak, file counts and sizes)")
+    parser.add_argument("--profile", help="output file for cProfile stats of the generation (see python -m pstats)")
+    parser.add_argument("-i", "--index", help="output file for the ownership and access index of repos, users and teams (see query)")
+    parser.add_argument(
+        "-w", "--workers", type=int, default=1, help="number of worker processes generating the orgs in parallel, 0 for the number of CPUs"
+    )
+    parser.add_argument(
+        "--watch", action="store_true", help="keep running, regenerate on changes of the input files and print changes (no output files)"
+    )
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between checks for changed input files in --watch mode")
+    parser.add_argument(
+        "--shards", help="output directory for the configuration sharded per org and section, unchanged shards are not rewritten"
+    )
+    parser.add_argument(
+        "--per-org",
+        action="store_true",
+        help="write the configuration of each org also to separate files, e.g. orgs.out.<org>.yml and branchprotection.out.<org>.yml",
+    )
+    subparsers = parser.add_subparsers(dest="command", title="commands", metavar="{export-wgs,query,validate}")
+    export_parser = subparsers.add_parser(
+        "export-wgs", help="print the yaml blocks of all charters as json list (replaces toc/working-groups/parsable-working-groups.sh)"
+    )
+    export_parser.add_argument(
+        "--cachefile",
+        help="cache file of the export, reused while the charters are unchanged. Default: per project in the cache or temp dir",
+    )
+    export_parser.add_argument(
+        "--no-validate", action="store_true", help="export invalid charters instead of failing, as parsable-working-groups.sh does"
+    )
+    query_parser = subparsers.add_parser("query", help="look up a repo, user or team in an index written with --index")
+    query_parser.add_argument("kind", choices=["repo", "user", "team"], help="kind of the looked up name")
+    query_parser.add_argument("name", help="github user, repo or team name ('<org>/' is optional for the default org)")
+    query_parser.add_argument("-i", "--index", required=True, help="ownership and access index written with --index")
+    query_parser.add_argument("--json", action="store_true", help="print the result as json")
+    validate_parser = subparsers.add_parser(
+        "validate", help="check all input files and report every error with file, line and json path, incl. RFC-0007 ownership conflicts"
+    )
+    validate_parser.add_argument("--sarif", help="output file for the errors in SARIF format")
+    validate_parser.add_argument("--json", help="output file for the errors as json")
+    validate_parser.add_argument("-w", "--workers", type=int, help="number of worker processes, default is the number of CPUs")
     args = parser.parse_args()
+    if args.changed_only and not (args.previous or args.previousbranchprotection):
+        parser.error("--changed-only requires --previous or --previousbranchprotection")
+
+    if args.command == "validate":
+        validator = ProjectValidator(max_workers=args.workers)
+        valid = validator.validate()
+        print(validator.format_errors())
+        if args.sarif:
+            with open(args.sarif, "w") as stream:
+                json.dump(validator.sarif(), stream, indent=2)
+        if args.json:
+            with open(args.json, "w") as stream:
+                json.dump({"files": validator.files, "errors": validator.errors}, stream, indent=2)
+        exit(0 if valid else 1)
+    if args.command == "export-wgs":
+        cache_path = args.cachefile or OrgGenerator._export_cache_path()
+        print(OrgGenerator.export_working_groups(cache_path=cache_path, validate=not args.no_validate))
+        exit(0)
+    if args.command == "query":
+        with open(args.index, "r") as stream:
+            result = OrgGenerator.query_access_index(json.load(stream), args.kind, args.name)
+        if result is None:
+            print(f"ERROR: {args.kind} {args.name} not found in {args.index}")
+            exit(1)
+        print(json.dumps(result, indent=2) if args.json else OrgGenerator.format_access_query(args.kind, result))
+        exit(0)
+
+    if args.watch:
+        try:
+            ProjectWatcher(interval=args.interval).run()
+        except KeyboardInterrupt:
+            pass
+        exit(0)
 
     print("Generating CFF Managed Github Org configuration.")
-    generator = OrgGenerator()
-    generator.load_from_project()
-    if not generator.validate_repo_ownership():
-        print("ERROR: Repository ownership is invalid. Refer to RFC-0007.")
-        exit(1)
-    generator.generate_org_members()
-    generator.generate_teams()
-    generator.generate_branch_protection()
-    generator.write_org_config(args.out)
-    generator.write_branch_protection(args.branchprotection)
+    metrics = PhaseMetrics(enabled=bool(args.metrics_out))
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    try:
+        generator = OrgGenerator()
+        cache = ParseCache(args.cachedir) if args.cachedir else None
+        with metrics.phase("load"):
+            generator.load_from_project(cache)
+        metrics.count_files("inputs", generator.input_files)
+        metrics.count("working_groups", {org: len(wgs) for org, wgs in generator.working_groups.items()})
+        if cache:
+            print(f"Parse cache {args.cachedir}: {cache.hits} hits, {cache.misses} misses")
+            metrics.count("parse_cache", {"hits": cache.hits, "misses": cache.misses})
+        with metrics.phase("validate_ownership"):
+            valid = generator.validate_repo_ownership()
+        if not valid:
+            print("ERROR: Repository ownership is invalid. Refer to RFC-0007.")
+            exit(1)
+        per_org_outputs = (args.out, args.branchprotection) if args.per_org else (None, None)
+        generator.generate(args.workers or None, *per_org_outputs, metrics)
+        with metrics.phase("write"):
+            generator.write_org_config(args.out)
+            generator.write_branch_protection(args.branchprotection)
+            if args.index:
+                generator.write_access_index(args.index)
+            if args.shards:
+                changed_shards = generator.write_shards(args.shards)
+                print(f"Changed shards: {', '.join(changed_shards) if changed_shards else 'none'}")
+        outputs = [args.out, args.branchprotection] + ([args.index] if args.index else [])
+        if args.per_org:
+            for org in OrgGenerator._MANAGED_ORGS:
+                outputs += [OrgGenerator._org_output_path(args.out, org), OrgGenerator._org_output_path(args.branchprotection, org)]
+        metrics.count_files("outputs", outputs)
+
+        if args.previous or args.previousbranchprotection:
+            with metrics.phase("diff"):
+                changes = {}
+                for path, diff in [
+                    (args.previous, generator.diff_org_config),
+                    (args.previousbranchprotection, generator.diff_branch_protection),
+                ]:
+                    if path:
+                        previous = OrgGenerator._read_yml_file(path, lambda x: x) if os.path.exists(path) else {}
+                        changes |= diff(previous)
+            print(f"Changes compared to previous configuration:\n{OrgGenerator._yaml_dump(changes) if changes else 'none'}")
+            if args.changes:
+                with open(args.changes, "w") as stream:
+                    OrgGenerator._yaml_dump(changes, stream)
+            if args.changed_only and not changes:
+                exit(_EXIT_NO_CHANGES)
+    finally:
+        if profiler:
+            profiler.disable()
+            print(f"Writing cProfile stats to {args.profile}")
+            profiler.dump_stats(args.profile)
+        if args.metrics_out:
+            metrics.write(args.metrics_out)
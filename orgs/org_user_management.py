@@ -1,27 +1,107 @@
-import requests
 import argparse
 import datetime
+import json
+import requests
+import threading
 import yaml
 import os
 import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
-from org_management import OrgGenerator
+from github_api import RequestScheduler
+from org_management import OrgGenerator, UniqueKeyLoader
 
 _SCRIPT_PATH = os.path.dirname(os.path.abspath(__file__))
+_DATE_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+# ISO 8601 date or date time as accepted by the GraphQL DateTime type (e.g. 2024-01-01, 2024-01-01T00:00:00Z,
+# 2024-01-01T00:00:00+00:00), UTC if w/o offset
+def _parse_date(date):
+    parsed = datetime.datetime.fromisoformat(date.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=datetime.timezone.utc)
+
+
+# failed request or query, e.g. authentication, permissions, invalid queries
+class RequestFailed(Exception):
+    pass
+
+
+# timeouts, server errors and exceeded resource limits may succeed when retried with fewer users
+class TransientRequestFailed(RequestFailed):
+    pass
+
+
+# last confirmed contribution date per login (a lower bound: the start of the window in which activity was seen),
+# persisted as json {github_org: {login: date}} across runs
+class ActivityStore:
+    def __init__(self, path: str, github_org: str):
+        self.path = path
+        self.github_org = github_org
+        self._lock = threading.Lock()
+        self.stores = {}
+        if os.path.exists(path):
+            with open(path, "r") as stream:
+                self.stores = json.load(stream)
+        self.last_active = self.stores.setdefault(github_org, {})
+
+    def get(self, user):
+        return self.last_active.get(user)
+
+    def record(self, user, date):
+        with self._lock:
+            if self.last_active.get(user, "") < date:
+                self.last_active[user] = date
+
+    def save(self):
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as stream:
+                json.dump(self.stores, stream, sort_keys=True, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
 
 
 class InactiveUserHandler:
+    _GRAPHQL_URL = "https://api.github.com/graphql"
+    # maximum page size of the github graphql api
+    _MEMBERS_PAGE_SIZE = 100
+    _MAX_WORKERS = 8
+    # users per activity query: each aliased user is a single node, i.e. far below the node limit (500k) and costs
+    # 1 rate limit point per query, but contributionsCollection is expensive to compute and large batches hit the
+    # server side timeout (10s)
+    _ACTIVITY_BATCH_SIZE = 50
+    _MAX_ATTEMPTS = 3
+    # with an activity store, users are additionally checked for activity in this recent window;
+    # users with known activity later than the cutoff plus margin are not checked again
+    _RECENT_ACTIVITY_DAYS = 90
+    _ACTIVITY_MARGIN_DAYS = 30
+
     def __init__(
         self,
         github_org: str,
         github_org_id: str,
         activity_date: str,
         github_token: str,
+        graphql_url: str = _GRAPHQL_URL,
+        max_workers: int = _MAX_WORKERS,
+        batch_size: int = _ACTIVITY_BATCH_SIZE,
+        activity_store: ActivityStore = None,
     ):
         self.github_org = github_org
         self.github_org_id = github_org_id
         self.activity_date = activity_date
+        self.activity_since = _parse_date(activity_date)
         self.github_token = github_token
+        self.graphql_url = graphql_url
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.activity_store = activity_store
+        now = datetime.datetime.now(datetime.timezone.utc)
+        self.recent_date = (now - datetime.timedelta(days=self._RECENT_ACTIVITY_DAYS)).strftime(_DATE_FORMAT)
+        # pooled session, rate limit pacing and retries of transient failures
+        # (workers plus the member page fetching thread)
+        self.scheduler = RequestScheduler(self._get_request_headrs(), pool_size=max_workers + 1)
 
     def _get_request_headrs(self):
         return {"Authorization": f"Bearer {self.github_token}"}
@@ -30,61 +110,210 @@ class InactiveUserHandler:
         if request.status_code == 200 or request.status_code == 201:
             return request.json()
         else:
-            raise Exception(f"Request execution failed with status code of {request.status_code}. {request.status_code}")
+            message = f"Request execution failed with status code of {request.status_code}. {request.status_code}"
+            raise TransientRequestFailed(message) if request.status_code >= 500 else RequestFailed(message)
 
     def _execute_query(self, query):
-        request = requests.post("https://api.github.com/graphql", json={"query": query}, headers=self._get_request_headrs())
+        request = self.scheduler.post(self.graphql_url, json={"query": query})
         return self._process_request_result(request)
 
-    def _build_query(self, after_cursor_value=None):
+    def _build_members_query(self, after_cursor_value=None):
         after_cursor = '"{}"'.format(after_cursor_value) if after_cursor_value else "null"
         query = """
         {
+            rateLimit {
+                cost
+                remaining
+                resetAt
+            }
             organization(login: \"%s\") {
-                membersWithRole(first: 20, after:%s) {
+                membersWithRole(first: %d, after:%s) {
                     pageInfo {
                         hasNextPage
                         endCursor
                     }
                     nodes {
                         login
-                        contributionsCollection(organizationID: \"%s\", from: \"%s\") {
-                            hasAnyContributions
-                        }
                     }
                 }
             }
         }
         """ % (
             self.github_org,
+            self._MEMBERS_PAGE_SIZE,
             after_cursor,
-            self.github_org_id,
-            self.activity_date,
         )
         return query
 
-    def get_inactive_users(self):
-        inactive_users = set()
+    # activity of a batch of users in one request using field aliases u0, u1, ...
+    def _build_activity_query(self, users):
+        field = """
+            u%d: user(login: \"%s\") {
+                contributionsCollection(organizationID: \"%s\", from: \"%s\") {
+                    hasAnyContributions
+                }%s
+            }"""
+        recent = ""
+        if self._check_recent_activity():
+            recent = """
+                recent: contributionsCollection(organizationID: \"%s\", from: \"%s\") {
+                    hasAnyContributions
+                }""" % (
+                self.github_org_id,
+                self.recent_date,
+            )
+        fields = [field % (i, user, self.github_org_id, self.activity_date, recent) for i, user in enumerate(users)]
+        return "{\n            rateLimit { cost remaining resetAt }%s\n}" % "".join(fields)
+
+    def get_member_pages(self, after_cursor_value=None):
+        # cursor based pagination, pages can only be fetched one after another
         has_next_page = True
-        after_cursor_value = None
         while has_next_page:
-            result = self._execute_query(self._build_query(after_cursor_value))
-            for user_node in result["data"]["organization"]["membersWithRole"]["nodes"]:
-                user = user_node["login"]
-                activity = user_node["contributionsCollection"]["hasAnyContributions"]
-                print(f"The user '{user}' has activity value {activity} contributions")
-                if not activity:
-                    print(f"Adding user '{user}' as inactive")
-                    inactive_users.add(user)
+            result = self._execute_query(self._build_members_query(after_cursor_value))
+            members = result["data"]["organization"]["membersWithRole"]
+            has_next_page = members["pageInfo"]["hasNextPage"]
+            after_cursor_value = members["pageInfo"]["endCursor"]
+            yield [user_node["login"] for user_node in members["nodes"]], after_cursor_value
 
-            has_next_page = result["data"]["organization"]["membersWithRole"]["pageInfo"]["hasNextPage"]
-            after_cursor_value = result["data"]["organization"]["membersWithRole"]["pageInfo"]["endCursor"]
+    def _get_activity(self, users):
+        # graphql returns partial results: users with errors are missing in the result,
+        # users that can't be resolved anymore (e.g. renamed) have activity None
+        result = self._execute_query(self._build_activity_query(users))
+        data = result.get("data") or {}
+        errors = result.get("errors") or []
+        not_found = {e["path"][0] for e in errors if e.get("type") == "NOT_FOUND" and e.get("path")}
+        # users of transient errors are missing in the result and retried, other errors fail the check
+        failed = [e for e in errors if e.get("type") != "NOT_FOUND" and not InactiveUserHandler._is_transient_error(e)]
+        if failed:
+            raise RequestFailed(f"Activity query failed: {'; '.join(e.get('message', str(e)) for e in failed)}")
+        if errors and not data:
+            # transient failure of the whole query, the batch is split
+            raise TransientRequestFailed(f"Activity query failed: {'; '.join(e.get('message', str(e)) for e in errors)}")
+        activity = {}
+        for i, user in enumerate(users):
+            alias = f"u{i}"
+            if data.get(alias) is not None:
+                activity[user] = data[alias]["contributionsCollection"]["hasAnyContributions"]
+                if (data[alias].get("recent") or {}).get("hasAnyContributions"):
+                    self.activity_store.record(user, self.recent_date)
+            elif alias in not_found:
+                activity[user] = None
+        return activity
 
-        return inactive_users
+    @staticmethod
+    def _is_transient_error(error):
+        return error.get("type") == "RESOURCE_LIMITS_EXCEEDED" or "timeout" in error.get("message", "").lower()
 
-    def _load_yaml_file(self, path):
-        with open(path, "r") as stream:
-            return yaml.safe_load(stream)
+    @staticmethod
+    def _is_transient(exception):
+        return isinstance(exception, (TransientRequestFailed, requests.ConnectionError, requests.Timeout))
+
+    def _check_recent_activity(self):
+        return self.activity_store is not None and _parse_date(self.recent_date) > self.activity_since
+
+    # known activity after the cutoff (plus margin) can't have disappeared, no need to ask github again
+    def _is_known_active(self, user):
+        if self.activity_store is None or self.activity_store.get(user) is None:
+            return False
+        cutoff = self.activity_since + datetime.timedelta(days=self._ACTIVITY_MARGIN_DAYS)
+        return _parse_date(self.activity_store.get(user)) >= cutoff
+
+    def _check_activity(self, users, attempt=1):
+        try:
+            activity = self._get_activity(users)
+        except Exception as e:
+            # failed batch (e.g. timeout of an expensive query) is split, single users are retried.
+            # Other failures (e.g. bad credentials) would fail for every user, no need to spend the rate limit on them
+            if not InactiveUserHandler._is_transient(e):
+                raise
+            if len(users) > 1:
+                print(f"Activity check of {len(users)} users failed, splitting batch: {e}")
+                half = len(users) // 2
+                return self._check_activity(users[:half], attempt) | self._check_activity(users[half:], attempt)
+            if attempt >= self._MAX_ATTEMPTS:
+                raise
+            return self._check_activity(users, attempt + 1)
+        # partial failures are retried per user
+        for user in users:
+            if user not in activity:
+                if attempt >= self._MAX_ATTEMPTS:
+                    raise Exception(f"Activity check of user '{user}' failed")
+                activity |= self._check_activity([user], attempt + 1)
+        return activity
+
+    # progress of a scan: end cursor of the last member page with all activity checks done and the activity of its users
+    def _load_checkpoint(self, checkpoint_path):
+        if not checkpoint_path or not os.path.exists(checkpoint_path):
+            return None
+        with open(checkpoint_path, "r") as stream:
+            checkpoint = json.load(stream)
+        org, activity_date = checkpoint.get("github_org"), checkpoint.get("activity_date")
+        if org != self.github_org or activity_date != self.activity_date:
+            print(f"Checkpoint {checkpoint_path} is for org '{org}' and activity since {activity_date}, ignoring it")
+            return None
+        return checkpoint
+
+    def _write_checkpoint(self, checkpoint_path, cursor, activity):
+        checkpoint = {"github_org": self.github_org, "activity_date": self.activity_date, "cursor": cursor, "activity": activity}
+        # atomic replace, an interrupted write keeps the previous checkpoint
+        tmp_path = f"{checkpoint_path}.tmp"
+        with open(tmp_path, "w") as stream:
+            json.dump(checkpoint, stream)
+        os.replace(tmp_path, checkpoint_path)
+
+    @staticmethod
+    def get_checkpoint_activity_date(checkpoint_path):
+        if not checkpoint_path or not os.path.exists(checkpoint_path):
+            return None
+        with open(checkpoint_path, "r") as stream:
+            return json.load(stream).get("activity_date")
+
+    def get_inactive_users(self, checkpoint_path=None, resume=False):
+        checkpoint = self._load_checkpoint(checkpoint_path) if resume else None
+        cursor = checkpoint["cursor"] if checkpoint else None
+        activity = checkpoint["activity"] if checkpoint else {}
+        if checkpoint:
+            print(f"Resuming scan after {len(activity)} checked users")
+        # activity checks of a page run concurrently while the next member pages are fetched,
+        # pages are completed in order so that the checkpoint cursor never skips unchecked users
+        pending_pages = deque()
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for users, end_cursor in self.get_member_pages(cursor):
+                    for user in [u for u in users if u not in activity and self._is_known_active(u)]:
+                        print(f"The user '{user}' is known to be active since {self.activity_store.get(user)}")
+                        activity[user] = True
+                    users = [u for u in users if u not in activity]
+                    checks = [
+                        executor.submit(self._check_activity, users[i : i + self.batch_size]) for i in range(0, len(users), self.batch_size)
+                    ]
+                    pending_pages.append((end_cursor, checks))
+                    while pending_pages and all(c.done() for c in pending_pages[0][1]):
+                        self._complete_page(pending_pages.popleft(), activity, checkpoint_path)
+                while pending_pages:
+                    self._complete_page(pending_pages.popleft(), activity, checkpoint_path)
+        finally:
+            # activity seen so far is kept also for interrupted scans
+            if self.activity_store is not None:
+                self.activity_store.save()
+
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        return {user for user, user_activity in activity.items() if user_activity is False}
+
+    def _complete_page(self, page, activity, checkpoint_path):
+        end_cursor, checks = page
+        for check in checks:
+            for user, user_activity in check.result().items():
+                if user_activity is None:
+                    print(f"The user '{user}' can't be resolved anymore, skipping")
+                else:
+                    print(f"The user '{user}' has activity value {user_activity} contributions")
+                    if not user_activity:
+                        print(f"Adding user '{user}' as inactive")
+                activity[user] = user_activity
+        if checkpoint_path:
+            self._write_checkpoint(checkpoint_path, end_cursor, activity)
 
     def _write_yaml_file(self, path, data):
         with open(path, "w") as f:
@@ -97,14 +326,40 @@ class InactiveUserHandler:
             result += f'Inactive users of Working Group "{wg}" are: \n{wg_users_as_list}\n'
         return result
 
-    def delete_inactive_contributors(self, users_to_delete):
-        path = f"{_SCRIPT_PATH}/contributors.yml"
-        contributors_yaml = self._load_yaml_file(path)
-        users_to_delete_lower = [user.lower() for user in users_to_delete]
-        contributors_yaml["orgs"][self.github_org]["contributors"] = [
-            c for c in contributors_yaml["orgs"][self.github_org]["contributors"] if c.lower() not in users_to_delete_lower
-        ]
-        self._write_yaml_file(path, contributors_yaml)
+    # line numbers of the contributors of the org or None if they are not one block sequence item per line
+    def _get_contributor_lines(self, content):
+        node = yaml.compose(content, Loader=UniqueKeyLoader)
+        keys = ["orgs", self.github_org, "contributors"]
+        for i, key in enumerate(keys):
+            node = next((v for k, v in node.value if k.value == key), None) if isinstance(node, yaml.MappingNode) else None
+            if node is None:
+                raise ValueError(f"Missing {'.'.join(keys[: i + 1])} in contributors file")
+        contributors = node
+        if not isinstance(contributors, yaml.SequenceNode):
+            raise ValueError(f"Invalid {'.'.join(keys)} in contributors file, expected a list")
+        if contributors.flow_style or any(c.start_mark.line != c.end_mark.line for c in contributors.value):
+            return None
+        lines = [c.start_mark.line for c in contributors.value]
+        return dict(zip(lines, (c.value for c in contributors.value))) if len(set(lines)) == len(lines) else None
+
+    def delete_inactive_contributors(self, users_to_delete, path=f"{_SCRIPT_PATH}/contributors.yml"):
+        users_to_delete_lower = {user.lower() for user in users_to_delete}
+        with open(path, "r") as stream:
+            content = stream.read()
+        contributor_lines = self._get_contributor_lines(content) or {}
+        deleted_lines = {line for line, c in contributor_lines.items() if c.lower() in users_to_delete_lower}
+        if not contributor_lines or len(deleted_lines) == len(contributor_lines):
+            # no line per contributor or empty list afterwards, fall back to rewriting the file
+            contributors_yaml = yaml.safe_load(content)
+            contributors_yaml["orgs"][self.github_org]["contributors"] = [
+                c for c in contributors_yaml["orgs"][self.github_org]["contributors"] if c.lower() not in users_to_delete_lower
+            ]
+            self._write_yaml_file(path, contributors_yaml)
+            return
+        # only the lines of deleted contributors are removed, comments and formatting are kept
+        lines = content.split("\n")
+        with open(path, "w") as stream:
+            stream.write("\n".join(line for i, line in enumerate(lines) if i not in deleted_lines))
 
     def get_inactive_users_msg(self, users_to_delete, inactive_users_by_wg, tagusers):
         rfc = (
@@ -144,12 +399,14 @@ class InactiveUserHandler:
 
 
 if __name__ == "__main__":
-    one_year_back = (datetime.datetime.now() - datetime.timedelta(days=365)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    one_year_back = (datetime.datetime.now() - datetime.timedelta(days=365)).strftime(_DATE_FORMAT)
 
     parser = argparse.ArgumentParser(description="Cloud Foundry Org Inactive User Handler")
     parser.add_argument("-goid", "--githuborgid", default="O_kgDOAAl8sg", help="Cloud Foundry Github org ID")
     parser.add_argument("-go", "--githuborg", default="cloudfoundry", help="Cloud Foundry Github org name")
-    parser.add_argument("-sd", "--sincedate", default=one_year_back, help="Since when to analyze in format 'Y-m-dTH:M:SZ'")
+    parser.add_argument(
+        "-sd", "--sincedate", help="Since when to analyze in format 'Y-m-dTH:M:SZ', default one year back or the date of the resumed scan"
+    )
     parser.add_argument(
         "-gt", "--githubtoken", default=os.environ.get("GH_TOKEN"), help="Github API access token. Supported also as env var 'GH_TOKEN'"
     )
@@ -165,7 +422,32 @@ if __name__ == "__main__":
         action="store_true",
         help="Tag users to be notified. Supported also as env var 'INACTIVE_USER_MANAGEMENT_TAG_USERS'",
     )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=InactiveUserHandler._MAX_WORKERS, help="Number of concurrent Github API requests"
+    )
+    parser.add_argument(
+        "-bs", "--batchsize", type=int, default=InactiveUserHandler._ACTIVITY_BATCH_SIZE, help="Number of users per activity query"
+    )
+    parser.add_argument(
+        "-cp",
+        "--checkpoint",
+        default=os.environ.get("INACTIVE_USER_MANAGEMENT_CHECKPOINT"),
+        help="Checkpoint file of the scan progress. Supported also as env var 'INACTIVE_USER_MANAGEMENT_CHECKPOINT'",
+    )
+    parser.add_argument("-r", "--resume", action="store_true", help="Resume an interrupted scan from the checkpoint file")
+    parser.add_argument(
+        "-as",
+        "--activitystore",
+        default=os.environ.get("INACTIVE_USER_MANAGEMENT_ACTIVITY_STORE"),
+        help="File with the last known activity per user, recently active users are not checked again. "
+        "Supported also as env var 'INACTIVE_USER_MANAGEMENT_ACTIVITY_STORE'",
+    )
     args = parser.parse_args()
+    if args.resume and not args.checkpoint:
+        parser.error("--resume requires --checkpoint")
+    if args.sincedate is None:
+        resumed_date = InactiveUserHandler.get_checkpoint_activity_date(args.checkpoint) if args.resume else None
+        args.sincedate = resumed_date or one_year_back
 
     print("Get information about community users")
     generator = OrgGenerator()
@@ -176,8 +458,18 @@ if __name__ == "__main__":
         community_members_with_role |= set(members)
 
     print("Analyzing Cloud Foundry org user activity.")
-    userHandler = InactiveUserHandler(args.githuborg, args.githuborgid, args.sincedate, args.githubtoken)
-    inactive_users = userHandler.get_inactive_users()
+    activity_store = ActivityStore(args.activitystore, args.githuborg) if args.activitystore else None
+    userHandler = InactiveUserHandler(
+        args.githuborg,
+        args.githuborgid,
+        args.sincedate,
+        args.githubtoken,
+        max_workers=args.workers,
+        batch_size=args.batchsize,
+        activity_store=activity_store,
+    )
+    inactive_users = userHandler.get_inactive_users(args.checkpoint, args.resume)
+    print(f"Github API usage: {userHandler.scheduler.counters()}")
 
     print(f"Inactive users length is {len(inactive_users)} and inactive users are {inactive_users}")
     users_to_delete = inactive_users - community_members_with_role
@@ -0,0 +1,116 @@
+# Generates a synthetic community project tree for benchmarks and scale tests of org_management.py:
+# - ./orgs/orgs.yml, ./orgs/contributors.yml, ./orgs/branchprotection.yml
+# - ./toc/TOC.md and ./toc/working-groups/*.md charters (yaml block)
+#
+# Usage: python -m synthetic_project -d DIR [--orgs N] [--wgs M] [--areas K] [--repos R] [--users U]
+
+import argparse
+import os
+import random
+import yaml
+from typing import Any, Dict, List
+from org_management import OrgGenerator, SafeDumper
+
+
+def synthetic_orgs(orgs: int) -> List[str]:
+    # first org is the default (TOC) org, naming like in test_org_management.py
+    return [OrgGenerator._DEFAULT_ORG] + [f"{OrgGenerator._DEFAULT_ORG}{i + 1}" for i in range(1, orgs)]
+
+
+def synthetic_wg(name: str, org: str, areas: int, repos: List[str], users: List[str], rnd: random.Random) -> Dict[str, Any]:
+    def people(count: int) -> List[Dict[str, str]]:
+        return [{"name": f"User {u}", "github": u} for u in rnd.sample(users, min(count, len(users)))]
+
+    bot_name = OrgGenerator._kebab_case(name)
+    wg = {
+        "name": name,
+        "org": org,
+        "execution_leads": people(rnd.randint(1, 2)),
+        "technical_leads": people(rnd.randint(1, 2)),
+        "bots": [{"name": f"{name} CI Bot", "github": f"{bot_name}-bot"}],
+        "areas": [],
+    }
+    for k in range(areas):
+        # round robin distribution of WG repos, some repos are shared with the next area
+        area_repos = repos[k::areas] + repos[(k + 1) % areas :: areas][:2]
+        area = {"name": f"Area {k}", "approvers": people(rnd.randint(2, 8)), "repositories": sorted(set(area_repos))}
+        if k % 2 == 0:
+            area["reviewers"] = people(rnd.randint(1, 5))
+        if k % 4 == 0:
+            area["bots"] = [{"name": f"{name} Area {k} Bot", "github": f"{bot_name}-area-{k}-bot"}]
+        wg["areas"].append(area)
+    return wg
+
+
+def _charter(wg: Dict[str, Any]) -> str:
+    block = yaml.dump(wg, Dumper=SafeDumper, sort_keys=False)
+    header = f"# {wg['name']}: Working Group Charter\n\n## Mission\n\nSynthetic working group.\n\n"
+    return f"{header}## Roles & Technical Assets\n\n```yaml\n{block}```\n"
+
+
+def _write(path: str, content: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as stream:
+        stream.write(content)
+
+
+# writes a project tree with `orgs` github orgs, `wgs` working groups (distributed round robin over the orgs) with `areas` areas each,
+# `repos` repositories (distributed over the orgs, each owned by one WG) and `users` users
+# returns the managed orgs to be set as OrgGenerator._MANAGED_ORGS
+def generate_project(
+    path: str, orgs: int = 1, wgs: int = 10, areas: int = 5, repos: int = 500, users: int = 2000, seed: int = 0
+) -> List[str]:
+    rnd = random.Random(seed)
+    org_names = synthetic_orgs(orgs)
+    logins = [f"user-{u}" for u in range(users)]
+    repos_by_org = {org: [f"repo-{r}" for r in range(i, repos, orgs)] for i, org in enumerate(org_names)}
+    wgs_by_org = {org: [w for w in range(wgs) if w % orgs == i] for i, org in enumerate(org_names)}
+
+    org_cfg = {"orgs": {}}
+    branch_protection = {"branch-protection": {"orgs": {}}}
+    for org in org_names:
+        org_repos = {r: {"description": f"Synthetic repository {r}", "has_projects": True} for r in repos_by_org[org]}
+        for i, r in enumerate(repos_by_org[org]):
+            if i % 3 != 0:
+                org_repos[r]["default_branch"] = "main"
+        if org == OrgGenerator._DEFAULT_ORG:
+            org_repos["community"] = {"default_branch": "main", "has_projects": True}
+        org_cfg["orgs"][org] = {"admins": [], "members": [], "name": org, "teams": {}, "repos": org_repos}
+        branch_protection["branch-protection"]["orgs"][org] = {"repos": {r: {"protect": False} for r in repos_by_org[org][::50]}}
+    contributors = {"orgs": {org: {"contributors": sorted(logins[i::orgs])} for i, org in enumerate(org_names)}}
+
+    _write(f"{path}/orgs/orgs.yml", yaml.dump(org_cfg, Dumper=SafeDumper))
+    _write(f"{path}/orgs/contributors.yml", yaml.dump(contributors, Dumper=SafeDumper))
+    _write(f"{path}/orgs/branchprotection.yml", yaml.dump(branch_protection, Dumper=SafeDumper))
+
+    toc = {
+        "name": "Technical Oversight Committee",
+        "execution_leads": [{"name": f"User {u}", "github": u} for u in logins[:5]],
+        "technical_leads": [],
+        "bots": [],
+        "areas": [{"name": "Community", "approvers": [], "repositories": [f"{org_names[0]}/community"]}],
+    }
+    _write(f"{path}/toc/TOC.md", _charter(toc))
+    _write(f"{path}/toc/working-groups/WORKING-GROUPS.md", "# Working Groups\n\nNo yaml block.\n")
+
+    for org in org_names:
+        org_wgs = wgs_by_org[org]
+        for i, w in enumerate(org_wgs):
+            wg_repos = [f"{org}/{r}" for r in repos_by_org[org][i :: len(org_wgs)]]
+            wg = synthetic_wg(f"Synthetic WG {w}", org, areas, wg_repos, logins, rnd)
+            _write(f"{path}/toc/working-groups/synthetic-wg-{w}.md", _charter(wg))
+    return org_names
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthetic community project generator")
+    parser.add_argument("-d", "--dir", required=True, help="output directory")
+    parser.add_argument("--orgs", type=int, default=1, help="number of github orgs")
+    parser.add_argument("--wgs", type=int, default=10, help="number of working groups")
+    parser.add_argument("--areas", type=int, default=5, help="number of areas per working group")
+    parser.add_argument("--repos", type=int, default=500, help="number of repositories")
+    parser.add_argument("--users", type=int, default=2000, help="number of users")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+    orgs = generate_project(args.dir, args.orgs, args.wgs, args.areas, args.repos, args.users, args.seed)
+    print(f"Generated project for orgs {orgs} in {args.dir}")
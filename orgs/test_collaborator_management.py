@@ -0,0 +1,51 @@
+import json
+import tempfile
+import unittest
+from collaborator_management import DirectCollaboratorHandler
+from github_stand_in import GitHubStandIn
+
+
+class TestDirectCollaboratorHandler(unittest.TestCase):
+    def setUp(self):
+        self.repos = {f"cloudfoundry/repo-{i}": {"collaborators": [f"user-{j}" for j in range(i)]} for i in range(5)}
+        self.repos["cloudfoundry/repo-4"]["collaborators"] += [f"user-{j}" for j in range(4, 150)]
+
+    def test_get_wg_repos(self):
+        wgs = [
+            {"name": "WG1", "areas": [{"name": "A", "repositories": ["cloudfoundry/b", "other/c"]}]},
+            {"name": "WG2", "areas": [{"name": "B", "repositories": ["cloudfoundry/a", "cloudfoundry/b"]}]},
+            {"name": "WG3"},
+        ]
+        self.assertEqual(["cloudfoundry/a", "cloudfoundry/b"], DirectCollaboratorHandler("cloudfoundry", "token").get_wg_repos(wgs))
+
+    def test_dry_run(self):
+        with GitHubStandIn({}, self.repos) as server:
+            handler = DirectCollaboratorHandler("cloudfoundry", "token", api_url=server.url)
+            report = handler.remove_direct_collaborators(sorted(self.repos), dry_run=True)
+        self.assertEqual(["cloudfoundry/repo-1", "cloudfoundry/repo-2", "cloudfoundry/repo-3", "cloudfoundry/repo-4"], sorted(report))
+        self.assertEqual({"found": ["user-0", "user-1"]}, report["cloudfoundry/repo-2"])
+        self.assertEqual(150, len(report["cloudfoundry/repo-4"]["found"]))
+        self.assertEqual(150, len(self.repos["cloudfoundry/repo-4"]["collaborators"]))
+        self.assertIn("Dry-run mode", handler.get_summary(sorted(self.repos), report, True))
+
+    def test_remove_direct_collaborators_with_etag_cache(self):
+        with tempfile.TemporaryDirectory() as tmp, GitHubStandIn({}, self.repos) as server:
+            etag_cache = f"{tmp}/etags.json"
+            self.repos["cloudfoundry/repo-5"] = {"collaborators": []}
+            handler = DirectCollaboratorHandler("cloudfoundry", "token", api_url=server.url, etag_cache_path=etag_cache)
+            report = handler.remove_direct_collaborators(sorted(self.repos))
+            self.assertEqual({"removed": ["user-0"]}, report["cloudfoundry/repo-1"])
+            self.assertEqual(1 + 2 + 3 + 150, sum(len(r["removed"]) for r in report.values()))
+            self.assertTrue(all(not r["collaborators"] for r in self.repos.values()))
+            # only the etags of unchanged repos are kept
+            with open(etag_cache) as stream:
+                self.assertEqual(2, len(json.load(stream)))
+
+            # second run: unchanged repos answered with 304, changed repos fetched again
+            handler = DirectCollaboratorHandler("cloudfoundry", "token", api_url=server.url, etag_cache_path=etag_cache)
+            self.assertEqual({}, handler.remove_direct_collaborators(sorted(self.repos)))
+            self.assertEqual(2, handler.unchanged_pages)
+            handler = DirectCollaboratorHandler("cloudfoundry", "token", api_url=server.url, etag_cache_path=etag_cache)
+            self.repos["cloudfoundry/repo-0"]["collaborators"].append("new-user")
+            self.assertEqual({"cloudfoundry/repo-0": {"removed": ["new-user"]}}, handler.remove_direct_collaborators(sorted(self.repos)))
+            self.assertEqual(5, handler.unchanged_pages)
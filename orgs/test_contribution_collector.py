@@ -0,0 +1,127 @@
+import tempfile
+import unittest
+from contribution_collector import ContributionCollector
+from github_stand_in import GitHubStandIn
+
+
+def _pr_event(event_type, repo, number, author, title):
+    pr = {
+        "title": title,
+        "html_url": f"https://github.com/{repo}/pull/{number}",
+        "created_at": f"2024-03-0{number}T00:00:00Z",
+        "user": {"login": author},
+    }
+    return {"type": event_type, "repo": {"name": repo}, "payload": {"pull_request": pr}}
+
+
+def _issue_event(repo, number, author, title):
+    issue = {
+        "title": title,
+        "html_url": f"https://github.com/{repo}/issues/{number}",
+        "created_at": f"2024-04-0{number}T00:00:00Z",
+        "user": {"login": author},
+    }
+    return {"type": "IssueCommentEvent", "repo": {"name": repo}, "payload": {"issue": issue}}
+
+
+class TestContributionCollector(unittest.TestCase):
+    def setUp(self):
+        commit = {"sha": "c1", "author": "alice", "committer": "alice", "date": "2024-01-01T00:00:00Z", "message": "Fix bug\n\nDetails"}
+        self.repos = {
+            "cloudfoundry/a": {
+                "commits": [commit, {"sha": "c2", "author": "bob", "committer": "bob", "date": "2024-01-02T00:00:00Z", "message": "Other"}],
+                "issues": [
+                    {"number": 1, "title": "Created", "creator": "alice", "mentioned": ["alice"], "created_at": "2024-02-01T00:00:00Z"},
+                    {"number": 2, "title": "Mentioned", "creator": "bob", "mentioned": ["alice"], "created_at": "2023-02-02T00:00:00Z"},
+                    {"number": 3, "title": "Unrelated", "creator": "bob", "mentioned": [], "created_at": "2024-02-03T00:00:00Z"},
+                ],
+            },
+            "cloudfoundry/b": {
+                "commits": [
+                    {"sha": f"b{i}", "author": "alice", "committer": "bob", "date": "2024-05-01T00:00:00Z", "message": "Feature"}
+                    for i in range(150)
+                ],
+            },
+        }
+        self.events = {
+            "alice": [
+                _pr_event("PullRequestReviewEvent", "cloudfoundry/a", 1, "bob", "Reviewed"),
+                _pr_event("PullRequestReviewCommentEvent", "cloudfoundry/a", 2, "bob", "Commented"),
+                _pr_event("PullRequestReviewCommentEvent", "cloudfoundry/a", 3, "alice", "Own PR"),
+                _pr_event("PullRequestReviewEvent", "other/c", 4, "bob", "Other repo"),
+                _issue_event("cloudfoundry/b", 1, "bob", "Issue comment"),
+                _issue_event("cloudfoundry/b", 2, "alice", "Own issue"),
+                {"type": "PushEvent", "repo": {"name": "cloudfoundry/a"}, "payload": {}},
+            ]
+        }
+        self.area = {"name": "Area (A/B)", "repositories": ["cloudfoundry/a", "cloudfoundry/b", "cloudfoundry/missing"]}
+
+    def test_render_area(self):
+        with GitHubStandIn({}, self.repos, self.events) as server:
+            collector = ContributionCollector("alice", "token", api_url=server.url)
+            contributions = collector.collect(self.area["repositories"])
+            body = collector.render_area("WG", self.area, contributions)
+        lines = body.split("\n")
+        self.assertEqual("# WG: Area (A/B) Contributions", lines[0])
+        self.assertEqual(
+            [
+                "### PRs Commented on/Reviewed:",
+                "- 2024-03-01T00:00:00Z: [Reviewed](https://github.com/cloudfoundry/a/pull/1)",
+                "- 2024-03-02T00:00:00Z: [Commented](https://github.com/cloudfoundry/a/pull/2)",
+                "### Issues that may be relevant:",
+                "- 2023-02-02T00:00:00Z: [Mentioned](https://github.com/cloudfoundry/a/issues/2)",
+                "- 2024-02-01T00:00:00Z: [Created](https://github.com/cloudfoundry/a/issues/1)",
+                "- 2024-04-01T00:00:00Z: [Issue comment](https://github.com/cloudfoundry/b/issues/1)",
+                "### Code contributions:",
+                "- 2024-01-01T00:00:00Z: [Fix bug](https://github.com/cloudfoundry/a/commit/c1)",
+            ],
+            lines[1:10],
+        )
+        # all pages of the commits authored in b
+        self.assertEqual(150, len([line for line in lines if "[Feature]" in line]))
+        self.assertEqual(["", ""], lines[-2:])
+
+    def test_since_and_cache(self):
+        with tempfile.TemporaryDirectory() as tmp, GitHubStandIn({}, self.repos, self.events) as server:
+            collector = ContributionCollector("alice", "token", "2024-01-01T00:00:00Z", api_url=server.url, cache_dir=tmp)
+            contributions = collector.collect(["cloudfoundry/a"])
+            self.assertEqual(["Created"], [i["title"] for i in contributions["cloudfoundry/a"]["issues_mentioned"]])
+            requests = server.requests
+
+            # second run answered from the cache
+            collector = ContributionCollector("alice", "token", "2024-01-01T00:00:00Z", api_url=server.url, cache_dir=tmp)
+            self.assertEqual(contributions, collector.collect(["cloudfoundry/a"]))
+            self.assertEqual(requests, server.requests)
+            self.assertEqual(5, collector.cache_hits)
+
+            # other since date and expired entries are fetched again
+            ContributionCollector("alice", "token", api_url=server.url, cache_dir=tmp).collect(["cloudfoundry/a"])
+            self.assertEqual(2 * requests, server.requests)
+            ContributionCollector("alice", "token", api_url=server.url, cache_dir=tmp, cache_ttl_hours=0).collect(["cloudfoundry/a"])
+            self.assertEqual(3 * requests, server.requests)
+
+    def test_cache_complete_results_only(self):
+        with tempfile.TemporaryDirectory() as tmp, GitHubStandIn({}, self.repos, self.events) as server:
+            collector = ContributionCollector("alice", "token", api_url=server.url, cache_dir=tmp)
+            # failed requests are not cached
+            server.inject(401)
+            self.assertEqual([], collector.get_events())
+            self.assertEqual(len(self.events["alice"]), len(collector.get_events()))
+            self.assertEqual(0, collector.cache_hits)
+            self.assertEqual(self.events["alice"], collector.get_events())
+            self.assertEqual(1, collector.cache_hits)
+
+            # missing repos are cached as empty
+            contributions = collector.collect(["cloudfoundry/missing"])
+            self.assertEqual([], contributions["cloudfoundry/missing"]["commits_author"])
+            requests = server.requests
+            self.assertEqual(contributions, collector.collect(["cloudfoundry/missing"]))
+            self.assertEqual(requests, server.requests)
+
+    def test_create_gist(self):
+        file_name = ContributionCollector.gist_file_name("Foundational Infrastructure", "Area (A/B)")
+        self.assertEqual("Foundational Infrastructure - Area  AandB.md", file_name)
+        with GitHubStandIn({}) as server:
+            collector = ContributionCollector("alice", "token", api_url=server.url)
+            self.assertEqual("https://gist.github.com/1", collector.create_gist("description", file_name, "body"))
+        self.assertEqual({file_name: {"content": "body"}}, server.gists[0]["files"])
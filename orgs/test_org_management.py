@@ -1,7 +1,23 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
 import unittest
 import yaml
 import jsonschema
-from org_management import OrgGenerator
+from org_management import (
+    OrgGenerator,
+    ParseCache,
+    PhaseMetrics,
+    ProjectValidator,
+    ProjectWatcher,
+    PyUniqueKeyLoader,
+    UniqueKeyLoader,
+    WorkingGroup,
+    _SCRIPT_PATH,
+)
+from synthetic_project import generate_project
 
 org_cfg = """
 ---
@@ -353,6 +369,25 @@ class TestOrgGenerator(unittest.TestCase):
         assert wg is not None
         self.assertEqual("WG1 Name", wg["name"])
 
+    def test_yaml_block(self):
+        charter = f"# WG\n\n```yaml\n{wg1}```\n\nExample:\n```yaml\nkey: value\n```\n"
+        block, line = OrgGenerator._yaml_block(charter.splitlines(keepends=True))
+        self.assertEqual(3, line)
+        self.assertEqual(OrgGenerator._yaml_load(wg1), OrgGenerator._yaml_load(block))
+        self.assertEqual("WG1 Name", OrgGenerator._extract_wg_config(charter)["name"])
+        self.assertEqual((" key: 1 ", 1), OrgGenerator._yaml_block(["```yaml key: 1 ``` ```yaml key: 2 ```"]))
+        # no closed block
+        self.assertIsNone(OrgGenerator._yaml_block(["```yaml\n", "key: 1\n"]))
+        self.assertIsNone(OrgGenerator._yaml_block(["no block\n"]))
+
+        # yaml and schema errors refer to the line in the charter
+        with self.assertRaises(yaml.MarkedYAMLError) as e:
+            OrgGenerator._extract_wg_config("# WG\n\n```yaml\nname: WG\nname: WG\n```\n", "wg.md")
+        self.assertIn('in "wg.md", line 5', str(e.exception))
+        with self.assertRaises(jsonschema.ValidationError) as e:
+            OrgGenerator._extract_wg_config(charter.replace("bots:\n- name: WG1 CI Bot", "bots:\n- nam: WG1 CI Bot"), "wg.md")
+        self.assertEqual(['in "wg.md", line 13'], e.exception.__notes__)
+
     def test_wg_github_users(self):
         wg = OrgGenerator._yaml_load(wg1)
         users = OrgGenerator._wg_github_users(wg)
@@ -369,6 +404,34 @@ class TestOrgGenerator(unittest.TestCase):
         users = OrgGenerator._wg_github_users_leads(wg)
         self.assertSetEqual({"execution-lead-wg1", "technical-lead-wg1"}, users)
 
+    def test_working_group_model(self):
+        pool = {}
+        wg = WorkingGroup.from_dict(OrgGenerator._validate_wg(OrgGenerator._yaml_load(wg1)), pool)
+        other = WorkingGroup.from_dict(OrgGenerator._validate_wg(OrgGenerator._yaml_load(wg3)), pool)
+        # adapter: dict access and round trip of the validated charter
+        self.assertEqual(OrgGenerator._yaml_load(wg1) | {"org": "cloudfoundry"}, wg.to_dict())
+        self.assertEqual(wg.to_dict(), wg)
+        self.assertEqual("WG1 Name", wg["name"])
+        self.assertNotIn("config", wg)
+        self.assertIsNone(wg.get("config"))
+        self.assertIn("areas", wg)
+        with self.assertRaises(KeyError):
+            wg["unknown"]
+        # list views are converted once
+        self.assertIs(wg["areas"], wg["areas"])
+        self.assertEqual([a.to_dict() for a in wg.areas], wg["areas"])
+        self.assertIs(wg, WorkingGroup.of(wg))
+        # role sets are computed once and frozen
+        self.assertIsInstance(wg.user_logins, frozenset)
+        self.assertIs(wg.lead_logins, OrgGenerator._wg_github_users_leads(wg))
+        self.assertSetEqual({"approver2-wg1-a1-a2", "approver3-wg1-a2"}, wg.areas[1].approver_logins)
+        self.assertIsNone(wg.areas[0].reviewers)
+        # people and repos are shared within the pool
+        self.assertIs(wg.areas[0].approvers[1], wg.areas[1].approvers[0])
+        self.assertIs(wg.areas[0].repositories[0], other.areas[0].repositories[0])
+        repo = other.areas[0].repositories[2]
+        self.assertEqual(("non-cloudfoundry", "repo12", "non-cloudfoundry/repo12"), (repo.org, repo.name, repo.full_name))
+
     def test_validate_yaml_unique_keys(self):
         with self.assertRaises(yaml.MarkedYAMLError):
             yml = """
@@ -376,6 +439,8 @@ class TestOrgGenerator(unittest.TestCase):
             key: 2
             """
             OrgGenerator._yaml_load(yml)
+        with self.assertRaises(yaml.MarkedYAMLError):
+            OrgGenerator._yaml_load("key: 1\nkey: 2\n", PyUniqueKeyLoader)
 
     def test_validate_contributors(self):
         OrgGenerator._validate_contributors({"orgs": {"cloudfoundry": {"contributors": []}}})
@@ -432,6 +497,15 @@ class TestOrgGenerator(unittest.TestCase):
         wg = OrgGenerator._validate_wg(OrgGenerator._yaml_load(wg4_other_org))
         self.assertEqual("cloudfoundry2", wg["org"])
 
+    def test_validate_error_json_path(self):
+        wg = OrgGenerator._yaml_load(wg1)
+        wg["areas"][1]["approvers"] = "x"
+        with self.assertRaises(jsonschema.ValidationError) as cm:
+            OrgGenerator._validate_wg(wg)
+        self.assertEqual("$.areas[1].approvers", cm.exception.json_path)
+        # validators are created once
+        self.assertIs(OrgGenerator._schema_validator("_WG_SCHEMA"), OrgGenerator._schema_validator("_WG_SCHEMA"))
+
     def test_validate_github_org_cfg(self):
         OrgGenerator._validate_github_org_cfg(OrgGenerator._yaml_load(org_cfg))
         with self.assertRaises(jsonschema.ValidationError):
@@ -721,6 +795,16 @@ class TestOrgGenerator(unittest.TestCase):
         self.assertEqual(1, pr_reviews["required_approving_review_count"])
         self.assertListEqual(["wg-wg3-name-bots", "wg-wg3-name-area-5-bots"], pr_reviews["bypass_pull_request_allowances"]["teams"])
 
+    def test_wg_repo_index(self):
+        _wg3 = OrgGenerator._validate_wg(OrgGenerator._yaml_load(wg3))
+        index = {r.name: entry for r, entry in WorkingGroup.from_dict(_wg3).repo_index.items() if r.org == "cloudfoundry"}
+        self.assertSetEqual({f"repo{i}" for i in range(1, 6)}, set(index.keys()))
+        self.assertListEqual(["Area 1", "Area 2", "Area 5"], index["repo2"]["areas"])
+        self.assertSetEqual({"u1", "u2"}, index["repo2"]["approvers"])
+        self.assertListEqual(["wg-wg3-name-area-5-bots"], index["repo2"]["bot_teams"])
+        self.assertSetEqual({"u1", "u2", "u3", "u4"}, index["repo3"]["approvers"])
+        self.assertListEqual([], index["repo3"]["bot_teams"])
+
     def test_generate_branch_protection(self):
         o = OrgGenerator(static_org_cfg=org_cfg, toc=toc, working_groups=[wg1, wg2, wg3], branch_protection=branch_protection)
         o.generate_branch_protection()
@@ -732,6 +816,57 @@ class TestOrgGenerator(unittest.TestCase):
         self.assertTrue(bp_repos["repo1"]["protect"])
         self.assertNotIn("required_pull_request_reviews", bp_repos["repo1"])
 
+    def test_diff_org_config(self):
+        o = OrgGenerator(static_org_cfg=org_cfg, contributors=contributors, toc=toc, working_groups=[wg1, wg2])
+        o.generate_org_members()
+        o.generate_teams()
+        previous = OrgGenerator._yaml_load(OrgGenerator._yaml_dump(o.org_cfg))
+        self.assertDictEqual({}, o.diff_org_config(previous))
+
+        cf = previous["orgs"]["cloudfoundry"]
+        cf["members"].remove("contributor1")
+        cf["members"].append("removed-user")
+        wg1_teams = cf["teams"]["wg-wg1-name"]["teams"]
+        wg1_teams["wg-wg1-name-area-1-approvers"]["members"].remove("approver1-wg1-a1")
+        wg1_teams["wg-wg1-name-area-1-approvers"]["repos"]["repo1"] = "read"
+        wg1_teams["wg-wg1-name-area-1-approvers"]["repos"]["old-repo"] = "write"
+        wg1_teams["wg-wg1-name-area-1-approvers"]["description"] = "old description"
+        del wg1_teams["wg-wg1-name-area-2-reviewers"]
+        cf["teams"]["old-team"] = {"members": ["x"]}
+        changes = o.diff_org_config(previous)["orgs"]["cloudfoundry"]
+        self.assertDictEqual({"added": ["contributor1"], "removed": ["removed-user"]}, changes["members"])
+        self.assertNotIn("admins", changes)
+        self.assertNotIn("repos", changes)
+        teams = changes["teams"]
+        self.assertListEqual(["wg-wg1-name-area-2-reviewers"], teams["added"])
+        self.assertListEqual(["old-team"], teams["removed"])
+        self.assertDictEqual(
+            {
+                "wg-wg1-name-area-1-approvers": {"members": {"added": ["approver1-wg1-a1"]}},
+                "wg-wg1-name-area-2-reviewers": {
+                    "maintainers": {"added": ["execution-lead-wg1", "technical-lead-wg1"]},
+                    "members": {"added": ["reviewer1-wg1-a2"]},
+                },
+            },
+            teams["members"],
+        )
+        self.assertDictEqual(
+            {"repo1": {"from": "read", "to": "write"}, "old-repo": {"from": "write", "to": None}},
+            teams["repos"]["wg-wg1-name-area-1-approvers"],
+        )
+        self.assertDictEqual({"wg-wg1-name-area-1-approvers": ["description"]}, teams["settings"])
+
+    def test_diff_branch_protection(self):
+        o = OrgGenerator(static_org_cfg=org_cfg, toc=toc, working_groups=[wg3], branch_protection=branch_protection)
+        previous = OrgGenerator._yaml_load(OrgGenerator._yaml_dump(o.branch_protection))
+        o.generate_branch_protection()
+        changes = o.diff_branch_protection(previous)
+        self.assertDictEqual({"added": ["community", "repo2", "repo3", "repo4", "repo5"]}, changes["branch-protection"]["cloudfoundry"])
+        previous = OrgGenerator._yaml_load(OrgGenerator._yaml_dump(o.branch_protection))
+        self.assertDictEqual({}, o.diff_branch_protection(previous))
+        previous["branch-protection"]["orgs"]["cloudfoundry"]["repos"]["repo2"]["enforce_admins"] = False
+        self.assertDictEqual({"changed": ["repo2"]}, o.diff_branch_protection(previous)["branch-protection"]["cloudfoundry"])
+
     def test_generate_branch_protection_multiple_orgs(self):
         OrgGenerator._MANAGED_ORGS = ["cloudfoundry", "cloudfoundry2"]
         o = OrgGenerator(
@@ -756,6 +891,419 @@ class TestOrgGenerator(unittest.TestCase):
         self.assertTrue(bp_repos["repo1"]["protect"])
         self.assertNotIn("required_pull_request_reviews", bp_repos["repo1"])
 
+    def test_write_config_and_shards(self):
+        o = OrgGenerator(static_org_cfg=org_cfg, toc=toc, working_groups=[wg1, wg2], branch_protection=branch_protection)
+        o.generate()
+        with tempfile.TemporaryDirectory() as tmp:
+            # streamed output is the same as a dump of the complete document
+            o.write_org_config(f"{tmp}/orgs.out.yml")
+            o.write_branch_protection(f"{tmp}/branchprotection.out.yml")
+            with open(f"{tmp}/orgs.out.yml") as stream:
+                self.assertEqual(OrgGenerator._yaml_dump(o.org_cfg), stream.read())
+            with open(f"{tmp}/branchprotection.out.yml") as stream:
+                self.assertEqual(OrgGenerator._yaml_dump(o.branch_protection), stream.read())
+
+            shards = f"{tmp}/shards"
+            sections = ["settings", "members", "teams", "repos", "branchprotection"]
+            self.assertEqual([f"cloudfoundry/{s}.yml" for s in sections], o.write_shards(shards))
+            merged = {"orgs": {"cloudfoundry": {}}}
+            for section in sections[:-1]:
+                shard = OrgGenerator._read_yml_file(f"{shards}/cloudfoundry/{section}.yml", lambda x: x)
+                merged["orgs"]["cloudfoundry"] |= shard["orgs"]["cloudfoundry"]
+            self.assertEqual(o.org_cfg, merged)
+            shard = OrgGenerator._read_yml_file(f"{shards}/cloudfoundry/branchprotection.yml", lambda x: x)
+            self.assertEqual(o.branch_protection, shard)
+
+            # unchanged shards are not rewritten
+            self.assertEqual([], o.write_shards(shards))
+            o.org_cfg["orgs"]["cloudfoundry"]["teams"]["wg-leads"]["members"].append("new-lead")
+            self.assertEqual(["cloudfoundry/teams.yml"], o.write_shards(shards))
+            with open(f"{shards}/shards.json") as stream:
+                self.assertEqual(5, len(json.load(stream)))
+
+    def test_access_index(self):
+        o = OrgGenerator(static_org_cfg=org_cfg, contributors=contributors, toc=toc, working_groups=[wg1, wg2])
+        o.generate_org_members()
+        o.generate_teams()
+        o.generate_branch_protection()
+        with tempfile.TemporaryDirectory() as tmp:
+            o.write_access_index(f"{tmp}/index.json")
+            with open(f"{tmp}/index.json") as stream:
+                index = json.load(stream)
+        self.assertEqual(o.build_access_index(), index)
+
+        repo = OrgGenerator.query_access_index(index, "repo", "repo3")
+        self.assertEqual("cloudfoundry/repo3", repo["name"])
+        self.assertEqual("WG1 Name", repo["wg"])
+        self.assertEqual(["Area 2"], repo["areas"])
+        self.assertEqual("admin", repo["teams"]["cloudfoundry/wg-wg1-name-leads"])
+        self.assertEqual("read", repo["teams"]["cloudfoundry/wg-wg1-name-area-2-reviewers"])
+        self.assertEqual("WG2 Name", OrgGenerator.query_access_index(index, "repo", "non-cloudfoundry/repo12")["wg"])
+        self.assertEqual("Technical Oversight Committee", OrgGenerator.query_access_index(index, "repo", "community")["wg"])
+        self.assertIsNone(OrgGenerator.query_access_index(index, "repo", "unknown"))
+
+        user = OrgGenerator.query_access_index(index, "user", "Approver2-WG1-A1-A2")
+        self.assertEqual("approver2-wg1-a1-a2", user["name"])
+        self.assertEqual(
+            [
+                {"org": "cloudfoundry", "role": "member"},
+                {"wg": "WG1 Name", "area": "Area 1", "role": "approver"},
+                {"wg": "WG1 Name", "area": "Area 2", "role": "approver"},
+            ],
+            user["roles"],
+        )
+        self.assertEqual(
+            {"permission": "write", "teams": {"cloudfoundry/wg-wg1-name-area-1-approvers": "write"}}, user["repos"]["cloudfoundry/repo1"]
+        )
+        self.assertEqual(["cloudfoundry/repo1", "cloudfoundry/repo2", "cloudfoundry/repo3", "cloudfoundry/repo4"], list(user["repos"]))
+        lead = OrgGenerator.query_access_index(index, "user", "technical-lead-wg1")
+        self.assertIn({"org": "cloudfoundry", "role": "member"}, lead["roles"])
+        self.assertIn({"wg": "WG1 Name", "role": "technical_lead"}, lead["roles"])
+        self.assertEqual("admin", lead["repos"]["cloudfoundry/repo1"]["permission"])
+        self.assertEqual("write", lead["repos"]["cloudfoundry/community"]["permission"])
+        toc_member = OrgGenerator.query_access_index(index, "user", "toc-member-1")
+        self.assertEqual({"org": "cloudfoundry", "role": "admin"}, toc_member["roles"][0])
+        self.assertEqual({"wg": "Technical Oversight Committee", "role": "execution_lead"}, toc_member["roles"][1])
+
+        team = OrgGenerator.query_access_index(index, "team", "wg-wg1-name-area-2-bots")
+        self.assertEqual("cloudfoundry/wg-wg1-name", team["parent"])
+        self.assertEqual(["bot2-wg1-a2", "execution-lead-wg1", "technical-lead-wg1"], team["members"])
+        self.assertEqual({"cloudfoundry/repo3": "write", "cloudfoundry/repo4": "write"}, team["repos"])
+        self.assertIn("  parent: cloudfoundry/wg-wg1-name", OrgGenerator.format_access_query("team", team))
+        self.assertIn("    WG1 Name / Area 1: approver", OrgGenerator.format_access_query("user", user))
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self) -> None:
+        OrgGenerator._MANAGED_ORGS = ["cloudfoundry"]
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ParseCache(os.path.join(self.tmp.name, "cache"))
+        self.parsed = 0
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _write(self, name: str, content: str) -> str:
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w") as stream:
+            stream.write(content)
+        return path
+
+    def _parse_yaml(self, content: str):
+        self.parsed += 1
+        return OrgGenerator._yaml_load(content)
+
+    def _parse(self, content: str):
+        self.parsed += 1
+        return OrgGenerator._extract_wg_config(content)
+
+    def test_cache_hit_by_content(self):
+        path = self._write("wg1.md", f"```yaml\n{wg1}\n```")
+        wg = self.cache.load(path, "wg_charter", "v1", self._parse)
+        self.assertEqual(wg, self.cache.load(path, "wg_charter", "v1", self._parse))
+        # same content in another file is a hit as well
+        other = self._write("other.md", f"```yaml\n{wg1}\n```")
+        self.assertEqual(wg, self.cache.load(other, "wg_charter", "v1", self._parse))
+        self.assertEqual(1, self.parsed)
+        self.assertEqual((2, 1), (self.cache.hits, self.cache.misses))
+
+        # changed content, other kind or version are misses
+        self._write("wg1.md", f"```yaml\n{wg2}\n```")
+        self.assertEqual("WG2 Name", self.cache.load(path, "wg_charter", "v1", self._parse)["name"])
+        self.cache.load(path, "wg_charter", "v2", self._parse)
+        self.cache.load(path, "other", "v2", self._parse)
+        self.assertEqual(4, self.parsed)
+
+    def test_cache_no_yaml_block(self):
+        path = self._write("wg.md", "no yaml block")
+        self.assertIsNone(self.cache.load(path, "wg_charter", "v1", self._parse))
+        self.assertIsNone(self.cache.load(path, "wg_charter", "v1", self._parse))
+        self.assertEqual(1, self.parsed)
+
+    def test_cache_hit_equals_miss(self):
+        # json round trip would change non-string keys (2, on/yes) and tuples, such results are not cached
+        path = self._write("data.yml", "2: two\non: true\nnested:\n  yes: [a, b]\n")
+        miss = self.cache.load(path, "yaml", "v1", self._parse_yaml)
+        self.assertEqual(miss, self.cache.load(path, "yaml", "v1", self._parse_yaml))
+        self.assertEqual((0, 2), (self.cache.hits, self.cache.misses))
+        path = self._write("tuple.yml", "a: b\n")
+        miss = self.cache.load(path, "tuple", "v1", lambda c: tuple(self._parse_yaml(c)))
+        self.assertEqual(miss, self.cache.load(path, "tuple", "v1", lambda c: tuple(self._parse_yaml(c))))
+        # json compatible results are hits, equal to the parsed result
+        path = self._write("wg1.md", f"```yaml\n{wg1}\n```")
+        miss = self.cache.load(path, "wg_charter", "v1", self._parse)
+        self.assertEqual(miss, self.cache.load(path, "wg_charter", "v1", self._parse))
+        self.assertEqual(1, self.cache.hits)
+
+    def test_cache_eviction(self):
+        cache = ParseCache(os.path.join(self.tmp.name, "small"), max_bytes=2000)
+        for i in range(20):
+            path = self._write("wg.md", f"```yaml\n{wg1}\n```\n{i}")
+            cache.load(path, "wg_charter", "v1", self._parse)
+        size = sum(os.path.getsize(os.path.join(cache.path, f)) for f in os.listdir(cache.path))
+        self.assertLessEqual(size, 2000)
+        self.assertGreater(size, 0)
+        # most recent entry survives
+        cache.load(path, "wg_charter", "v1", self._parse)
+        self.assertEqual(1, cache.hits)
+
+    def test_load_from_project_with_cache(self):
+        expected = OrgGenerator()
+        expected.load_from_project()
+        for _ in range(2):
+            o = OrgGenerator()
+            o.load_from_project(self.cache)
+            self.assertEqual(expected.org_cfg, o.org_cfg)
+            self.assertEqual(expected.contributors, o.contributors)
+            self.assertEqual(expected.branch_protection, o.branch_protection)
+            self.assertEqual(expected.toc, o.toc)
+            self.assertEqual(expected.working_groups, o.working_groups)
+        self.assertEqual(0, self.cache.misses - self.cache.hits)
+
+
+class TestPhaseMetrics(unittest.TestCase):
+    def test_disabled(self):
+        metrics = PhaseMetrics()
+        with metrics.phase("load"):
+            pass
+        metrics.count("x", 1)
+        self.assertDictEqual({}, metrics.phases)
+        self.assertDictEqual({}, metrics.counters)
+
+    def test_enabled(self):
+        metrics = PhaseMetrics(enabled=True)
+        with metrics.phase("load"):
+            data = [str(i) for i in range(10000)]
+        metrics.count_files("inputs", [f"{_SCRIPT_PATH}/orgs.yml"])
+        self.assertEqual(10000, len(data))
+        self.assertGreater(metrics.phases["load"]["peak_memory_bytes"], 10000)
+        self.assertGreaterEqual(metrics.phases["load"]["wall_seconds"], 0)
+        self.assertEqual(1, metrics.counters["inputs"]["files"])
+        with tempfile.TemporaryDirectory() as tmp:
+            metrics.write(f"{tmp}/metrics.json")
+            with open(f"{tmp}/metrics.json") as stream:
+                self.assertIn("load", yaml.safe_load(stream)["phases"])
+
+    def test_add(self):
+        metrics = PhaseMetrics(enabled=True)
+        metrics.add({"members": {"wall_seconds": 1.0, "cpu_seconds": 0.5, "peak_memory_bytes": 10}})
+        metrics.add({"members": {"wall_seconds": 2.0, "cpu_seconds": 1.5, "peak_memory_bytes": 5}})
+        self.assertDictEqual({"members": {"wall_seconds": 3.0, "cpu_seconds": 2.0, "peak_memory_bytes": 10}}, metrics.phases)
+
+
+class TestSyntheticProject(unittest.TestCase):
+    def tearDown(self) -> None:
+        OrgGenerator._MANAGED_ORGS = ["cloudfoundry"]
+
+    def test_synthetic_project(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            OrgGenerator._MANAGED_ORGS = generate_project(tmp, orgs=2, wgs=5, areas=3, repos=60, users=100)
+            self.assertListEqual(["cloudfoundry", "cloudfoundry2"], OrgGenerator._MANAGED_ORGS)
+            o = OrgGenerator()
+            o.load_from_project(project_path=tmp)
+        self.assertEqual(3, len(o.working_groups["cloudfoundry"]))
+        self.assertEqual(2, len(o.working_groups["cloudfoundry2"]))
+        self.assertEqual(5, len(o.toc["execution_leads"]))
+        self.assertTrue(o.validate_repo_ownership())
+        o.generate_org_members()
+        o.generate_teams()
+        o.generate_branch_protection()
+        self.assertIn("wg-synthetic-wg-1", o.org_cfg["orgs"]["cloudfoundry2"]["teams"])
+        self.assertEqual(30 + 1, len(o.branch_protection["branch-protection"]["orgs"]["cloudfoundry"]["repos"]))
+
+    def test_parallel_generation_is_identical(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            OrgGenerator._MANAGED_ORGS = generate_project(tmp, orgs=3, wgs=6, areas=3, repos=90, users=100)
+            sequential = OrgGenerator()
+            sequential.load_from_project(project_path=tmp)
+            sequential.generate_org_members()
+            sequential.generate_teams()
+            sequential.generate_branch_protection()
+
+            parallel = OrgGenerator()
+            parallel.load_from_project(project_path=tmp)
+            metrics = PhaseMetrics(enabled=True)
+            parallel.generate(3, f"{tmp}/orgs.out.yml", f"{tmp}/branchprotection.out.yml", metrics)
+            self.assertEqual(OrgGenerator._yaml_dump(sequential.org_cfg), OrgGenerator._yaml_dump(parallel.org_cfg))
+            self.assertEqual(OrgGenerator._yaml_dump(sequential.branch_protection), OrgGenerator._yaml_dump(parallel.branch_protection))
+            # leads of other orgs in the TOC org
+            self.assertIn("wg-leads-cloudfoundry3", parallel.org_cfg["orgs"]["cloudfoundry"]["teams"])
+            # phases of the worker processes summed up
+            self.assertListEqual(["members", "teams", "branch_protection", "write"], list(metrics.phases))
+
+            # per org files are the org configurations of the merged output
+            for org in OrgGenerator._MANAGED_ORGS:
+                org_cfg = OrgGenerator._read_yml_file(f"{tmp}/orgs.out.{org}.yml", lambda x: x)
+                self.assertEqual({"orgs": {org: parallel.org_cfg["orgs"][org]}}, org_cfg)
+                branch_protection = OrgGenerator._read_yml_file(f"{tmp}/branchprotection.out.{org}.yml", lambda x: x)
+                expected = {org: parallel.branch_protection["branch-protection"]["orgs"][org]}
+                self.assertEqual(expected, branch_protection["branch-protection"]["orgs"])
+
+    def test_export_working_groups(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            OrgGenerator._MANAGED_ORGS = generate_project(tmp, orgs=1, wgs=3, areas=2, repos=10, users=20)
+            cache_path = f"{tmp}/export.json"
+            exported = json.loads(OrgGenerator.export_working_groups(tmp, cache_path))
+            # TOC first, WORKING-GROUPS.md w/o yaml block is skipped, charters as written (no default org)
+            self.assertEqual(
+                ["Technical Oversight Committee", "Synthetic WG 0", "Synthetic WG 1", "Synthetic WG 2"], [wg["name"] for wg in exported]
+            )
+            self.assertNotIn("org", exported[0])
+            self.assertEqual("cloudfoundry", exported[1]["org"])
+
+            # cached export is returned while the charters are unchanged
+            with open(cache_path) as stream:
+                cached = json.load(stream)
+            with open(cache_path, "w") as stream:
+                json.dump({"stamp": cached["stamp"], "working_groups": "[]"}, stream)
+            self.assertEqual("[]", OrgGenerator.export_working_groups(tmp, cache_path))
+            with open(f"{tmp}/toc/working-groups/synthetic-wg-2.md", "w") as stream:
+                stream.write("# no yaml block\n")
+            self.assertEqual(3, len(json.loads(OrgGenerator.export_working_groups(tmp, cache_path))))
+
+            # invalid charters fail the export unless not validated
+            with open(f"{tmp}/toc/working-groups/synthetic-wg-2.md", "w") as stream:
+                stream.write("```yaml\nname: Invalid WG\nexecution_leads: none\n```\n")
+            with self.assertRaises(jsonschema.ValidationError):
+                OrgGenerator.export_working_groups(tmp, cache_path)
+            exported = json.loads(OrgGenerator.export_working_groups(tmp, cache_path, validate=False))
+            self.assertEqual({"name": "Invalid WG", "execution_leads": "none"}, exported[-1])
+
+    def test_export_cache_path(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertEqual(OrgGenerator._export_cache_path(tmp), OrgGenerator._export_cache_path(f"{tmp}/toc/.."))
+            self.assertNotEqual(OrgGenerator._export_cache_path(tmp), OrgGenerator._export_cache_path(f"{tmp}/other"))
+
+
+class TestProjectValidator(unittest.TestCase):
+    def setUp(self) -> None:
+        OrgGenerator._MANAGED_ORGS = ["cloudfoundry"]
+        self.tmp = tempfile.TemporaryDirectory()
+        generate_project(self.tmp.name, orgs=1, wgs=2, areas=2, repos=8, users=10)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _write(self, name: str, content: str):
+        with open(os.path.join(self.tmp.name, name), "w") as stream:
+            stream.write(content)
+
+    def test_valid_project(self):
+        validator = ProjectValidator(self.tmp.name, max_workers=2)
+        self.assertTrue(validator.validate())
+        self.assertEqual(["orgs/orgs.yml", "orgs/contributors.yml", "orgs/branchprotection.yml", "toc/TOC.md"], validator.files[:4])
+        self.assertEqual(4 + 2, len(validator.files))
+        self.assertIn("Validated 6 files: 0 errors", validator.format_errors())
+
+    def test_all_errors_in_one_pass(self):
+        self._write("orgs/contributors.yml", "orgs:\n  cloudfoundry:\n    contributors: []\n  other:\n    contributors: []\n")
+        with open(os.path.join(self.tmp.name, "toc/working-groups/synthetic-wg-0.md")) as stream:
+            charter = stream.read().split("\n")
+        block = charter.index("```yaml")
+        self._write("toc/working-groups/synthetic-wg-0.md", "\n".join(charter[: block + 2] + charter[block + 1 :]))
+        broken_wg2 = wg2.replace("  - github: approver1-wg2-a1\n", "  - gh: x\n")
+        self._write("toc/working-groups/broken-schema.md", "# WG\n```yaml\n" + broken_wg2 + "```\n")
+        self._write("toc/working-groups/broken-yaml.md", "# WG\n```yaml\nname: [unclosed\n```\n")
+        self._write("toc/working-groups/other-org.md", "```yaml\n" + wg4_other_org + "```\n")
+        self._write("toc/working-groups/wg1.md", "```yaml" + wg1 + "```\n")
+        self._write("toc/working-groups/wg3.md", "```yaml" + wg3 + "```\n")
+
+        validator = ProjectValidator(self.tmp.name)
+        self.assertFalse(validator.validate())
+        errors = [(e["file"], e["rule"], e["line"], e["path"]) for e in validator.errors]
+        self.assertIn(("orgs/contributors.yml", "org", 4, "$.orgs.other"), errors)
+        self.assertIn(("toc/working-groups/synthetic-wg-0.md", "yaml", block + 3, "$"), errors)
+        # 'gh' instead of 'github' of the approver in line 15: missing 'github', unexpected 'gh'
+        self.assertEqual(2, errors.count(("toc/working-groups/broken-schema.md", "schema", 15, "$.areas[0].approvers[0]")))
+        self.assertIn(("toc/working-groups/broken-yaml.md", "yaml", 4, None), errors)
+        self.assertIn(("toc/working-groups/other-org.md", "org", 4, "$.org"), errors)
+        # repos 1-4 of wg3 are owned by wg1, reported where wg3 lists them first
+        conflicts = [(e["file"], e["line"], e["path"]) for e in validator.errors if e["rule"] == "ownership"]
+        self.assertEqual(
+            [
+                ("toc/working-groups/wg3.md", 14, "$.areas[0].repositories[0]"),
+                ("toc/working-groups/wg3.md", 15, "$.areas[0].repositories[1]"),
+                ("toc/working-groups/wg3.md", 25, "$.areas[1].repositories[1]"),
+                ("toc/working-groups/wg3.md", 34, "$.areas[2].repositories[1]"),
+            ],
+            conflicts,
+        )
+        self.assertIn("Repository cloudfoundry/repo1 is owned by multiple WGs: WG1 Name, WG3 Name", validator.errors[-4]["message"])
+        self.assertEqual(1 + 1 + 2 + 1 + 1 + 4, len(validator.errors))
+
+        text = validator.format_errors()
+        self.assertIn("ERROR: toc/working-groups/broken-yaml.md:4: ", text)
+        self.assertIn("ERROR: orgs/contributors.yml:4: $.orgs.other: Invalid org other in contributors.yml", text)
+        sarif = validator.sarif()
+        self.assertEqual("2.1.0", sarif["version"])
+        results = sarif["runs"][0]["results"]
+        self.assertEqual(len(validator.errors), len(results))
+        self.assertEqual({"startLine": 4}, results[0]["locations"][0]["physicalLocation"]["region"])
+
+    def test_non_scalar_keys(self):
+        self._write("toc/working-groups/complex-key.md", "# WG\n```yaml\nname: WG\n? [a, b]\n: x\nname: WG\n```\n")
+        validator = ProjectValidator(self.tmp.name)
+        self.assertFalse(validator.validate())
+        errors = [(e["file"], e["rule"], e["line"], e["path"]) for e in validator.errors]
+        self.assertEqual(
+            [
+                ("toc/working-groups/complex-key.md", "yaml", 6, "$"),
+                ("toc/working-groups/complex-key.md", "yaml", 4, None),
+            ],
+            errors,
+        )
+        self.assertIn("unhashable key", validator.errors[1]["message"])
+
+
+class TestProjectWatcher(unittest.TestCase):
+    def tearDown(self) -> None:
+        OrgGenerator._MANAGED_ORGS = ["cloudfoundry"]
+
+    @staticmethod
+    def _edit(path, old, new):
+        with open(path, "r") as stream:
+            content = stream.read()
+        with open(path, "w") as stream:
+            stream.write(content.replace(old, new, 1))
+        # mtime granularity of some file systems
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+
+    def test_watch(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            OrgGenerator._MANAGED_ORGS = generate_project(tmp, orgs=1, wgs=2, areas=2, repos=10, users=20)
+            charter = f"{tmp}/toc/working-groups/synthetic-wg-0.md"
+            watcher = ProjectWatcher(tmp)
+            self.assertEqual(6, len(watcher.changed_files()))
+            self.assertEqual({}, watcher.regenerate())
+            self.assertEqual(6, len(watcher.cache.parsed))
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertIsNone(watcher.poll())
+                # unchanged inputs, static configuration is not modified by the generation
+                self.assertEqual({}, watcher.regenerate())
+                self.assertEqual([], watcher.cache.parsed)
+
+                # only the changed charter is parsed again
+                self._edit(charter, "- name: Area 1\n", "- name: Area One\n")
+                changes = watcher.poll()
+                self.assertEqual([charter], watcher.cache.parsed)
+                teams = changes["orgs"]["cloudfoundry"]["teams"]
+                self.assertIn("wg-synthetic-wg-0-area-one-approvers", teams["added"])
+                self.assertIn("wg-synthetic-wg-0-area-1-approvers", teams["removed"])
+
+                # invalid charter: error, last generation is kept
+                self._edit(charter, "name: Synthetic WG 0\n", "name: [Synthetic WG 0\n")
+                output = io.StringIO()
+                with contextlib.redirect_stdout(output):
+                    self.assertIsNone(watcher.poll())
+                self.assertIn(f'ERROR: while parsing a flow sequence\n  in "{charter}", line 10', output.getvalue())
+                self.assertIn("wg-synthetic-wg-0", watcher.generator.org_cfg["orgs"]["cloudfoundry"]["teams"])
+
+                os.remove(charter)
+                changes = watcher.poll()
+                self.assertIn("wg-synthetic-wg-0", changes["orgs"]["cloudfoundry"]["teams"]["removed"])
+                self.assertNotIn(charter, watcher.cache.entries)
+
 
 # integration test, depends on data in this repo which may change
 class TestOrgGeneratorIntegrationTest(unittest.TestCase):
@@ -805,3 +1353,18 @@ class TestOrgGeneratorIntegrationTest(unittest.TestCase):
         o.generate_branch_protection()
         bp_repos = o.branch_protection["branch-protection"]["orgs"]["cloudfoundry"]["repos"]
         self.assertGreaterEqual(len(bp_repos), 3)
+
+    @unittest.skipUnless(yaml.__with_libyaml__, "pyyaml built without libyaml")
+    def test_libyaml_and_python_yaml_are_identical(self):
+        for path in [f"{_SCRIPT_PATH}/orgs.yml", f"{_SCRIPT_PATH}/branchprotection.yml", f"{_SCRIPT_PATH}/contributors.yml"]:
+            with open(path) as stream:
+                content = stream.read()
+            self.assertEqual(OrgGenerator._yaml_load(content, PyUniqueKeyLoader), OrgGenerator._yaml_load(content, UniqueKeyLoader))
+
+        o = OrgGenerator()
+        o.load_from_project()
+        o.generate_org_members()
+        o.generate_teams()
+        o.generate_branch_protection()
+        for cfg in [o.org_cfg, o.branch_protection]:
+            self.assertEqual(OrgGenerator._yaml_dump(cfg, dumper=yaml.SafeDumper), OrgGenerator._yaml_dump(cfg, dumper=yaml.CSafeDumper))
@@ -0,0 +1,272 @@
+import email.utils
+import json
+import os
+import tempfile
+import unittest
+import requests
+import yaml
+from github_api import RequestScheduler
+from github_stand_in import GitHubStandIn, synthetic_members
+from org_user_management import ActivityStore, InactiveUserHandler, RequestFailed
+
+
+def _members(count, inactive, last_active="2024-06-01T00:00:00Z"):
+    return {f"user-{i}": None if f"user-{i}" in inactive else last_active for i in range(count)}
+
+
+class TestRequestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.sleeps = []
+
+    def _scheduler(self, **kwargs):
+        return RequestScheduler({}, sleep=self.sleeps.append, clock=lambda: 1000.0, **kwargs)
+
+    def test_retry_transient_failures(self):
+        with GitHubStandIn(_members(1, set())) as server:
+            server.inject(502, body={"message": "Bad Gateway"})
+            server.inject(403, {"Retry-After": "7"}, {"message": "secondary rate limit"})
+            scheduler = self._scheduler()
+            response = scheduler.post(server.graphql_url, json={"query": "{ viewer { login } }"})
+            self.assertEqual(200, response.status_code)
+            self.assertEqual(3, server.requests)
+        self.assertEqual(3, scheduler.requests)
+        self.assertEqual(2, scheduler.retries)
+        self.assertEqual(1, scheduler.cost)
+        self.assertEqual(4999, scheduler.remaining)
+        self.assertEqual(7.0, self.sleeps[1])
+        self.assertLessEqual(self.sleeps[0], RequestScheduler._BACKOFF_BASE_SECONDS)
+
+    def test_retry_after_http_date(self):
+        with GitHubStandIn(_members(1, set())) as server:
+            server.inject(503, {"Retry-After": email.utils.formatdate(1030, usegmt=True)})
+            server.inject(503, {"Retry-After": "invalid"})
+            response = self._scheduler().post(server.graphql_url, json={"query": "{}"})
+            self.assertEqual(200, response.status_code)
+            self.assertEqual(3, server.requests)
+        self.assertEqual(30.0, self.sleeps[0])
+        self.assertLessEqual(self.sleeps[1], RequestScheduler._BACKOFF_BASE_SECONDS * 2)
+
+    def test_retries_exhausted(self):
+        with GitHubStandIn(_members(1, set())) as server:
+            for _ in range(3):
+                server.inject(503)
+            response = self._scheduler(max_retries=2).post(server.graphql_url, json={"query": "{}"})
+            self.assertEqual(503, response.status_code)
+            self.assertEqual(3, server.requests)
+
+    def test_no_retry_of_client_errors(self):
+        with GitHubStandIn(_members(1, set())) as server:
+            server.inject(401, body={"message": "Bad credentials"})
+            response = self._scheduler().post(server.graphql_url, json={"query": "{}"})
+            self.assertEqual(401, response.status_code)
+            self.assertEqual(1, server.requests)
+        self.assertEqual([], self.sleeps)
+
+    def test_wait_for_reset_of_exhausted_budget(self):
+        with GitHubStandIn(_members(1, set())) as server:
+            server.inject(403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1030"}, {"message": "API rate limit exceeded"})
+            scheduler = self._scheduler()
+            scheduler.post(server.graphql_url, json={"query": "{}"})
+        self.assertEqual([30.0], self.sleeps)
+
+    def test_pacing_with_low_budget(self):
+        scheduler = self._scheduler()
+        scheduler.limit, scheduler.remaining, scheduler.reset_at = 5000, 10, 1100.0
+        scheduler._pace()
+        self.assertEqual([10.0], self.sleeps)
+        self.assertEqual(9, scheduler.remaining)
+
+    def test_no_pacing_with_sufficient_budget(self):
+        scheduler = self._scheduler()
+        scheduler.limit, scheduler.remaining, scheduler.reset_at = 5000, 4000, 1100.0
+        scheduler._pace()
+        self.assertEqual([], self.sleeps)
+
+
+class TestGitHubStandIn(unittest.TestCase):
+    def test_rest_endpoints(self):
+        commits = [
+            {"sha": f"sha{i}", "author": f"user-{i % 2}", "committer": "web-flow", "date": f"2024-0{i + 1}-01T00:00:00Z", "message": "fix"}
+            for i in range(5)
+        ]
+        repos = {"org/repo": {"collaborators": [f"user-{i}" for i in range(5)], "commits": commits}}
+        with GitHubStandIn({}, repos) as server:
+            response = requests.get(f"{server.url}/repos/org/repo/collaborators?affiliation=direct&per_page=3")
+            self.assertEqual(["user-0", "user-1", "user-2"], [c["login"] for c in response.json()])
+            next_page = requests.get(response.links["next"]["url"])
+            self.assertEqual(["user-3", "user-4"], [c["login"] for c in next_page.json()])
+            # conditional request, doesn't count against the rate limit
+            unchanged = requests.get(response.url, headers={"If-None-Match": response.headers["ETag"]})
+            self.assertEqual(304, unchanged.status_code)
+            self.assertEqual(next_page.headers["X-RateLimit-Remaining"], unchanged.headers["X-RateLimit-Remaining"])
+            self.assertEqual(204, requests.delete(f"{server.url}/repos/org/repo/collaborators/user-1").status_code)
+            self.assertNotIn("user-1", repos["org/repo"]["collaborators"])
+
+            response = requests.get(f"{server.url}/repos/org/repo/commits?author=user-0&since=2024-02-01T00:00:00Z")
+            self.assertEqual(["sha2", "sha4"], [c["sha"] for c in response.json()])
+            self.assertEqual(404, requests.get(f"{server.url}/repos/org/unknown/commits").status_code)
+
+    def test_rate_limit(self):
+        with GitHubStandIn(synthetic_members(10), rate_limit=2) as server:
+            query = {"query": "{ rateLimit { cost remaining resetAt } }"}
+            self.assertEqual(1, requests.post(server.graphql_url, json=query).json()["data"]["rateLimit"]["remaining"])
+            self.assertEqual(404, requests.get(f"{server.url}/repos/org/unknown/commits").status_code)
+            self.assertEqual("RATE_LIMITED", requests.post(server.graphql_url, json=query).json()["errors"][0]["type"])
+            response = requests.get(f"{server.url}/repos/org/repo/collaborators")
+            self.assertEqual(403, response.status_code)
+            self.assertEqual("0", response.headers["X-RateLimit-Remaining"])
+            self.assertEqual(2, server.rate_limited)
+
+
+class TestInactiveUserHandler(unittest.TestCase):
+    def test_get_inactive_users(self):
+        inactive = {"user-3", "user-17"}
+        with GitHubStandIn(_members(25, inactive)) as server:
+            server.inject(502)
+            server.inject(200, body={"errors": [{"type": "RATE_LIMITED", "message": "rate limit exceeded"}]})
+            handler = InactiveUserHandler("org", "org-id", "2024-01-01T00:00:00Z", "token", graphql_url=server.graphql_url, batch_size=10)
+            handler.scheduler.sleep = lambda seconds: None
+            self.assertEqual(inactive, handler.get_inactive_users())
+        self.assertEqual(2, handler.scheduler.retries)
+        self.assertEqual(4, handler.scheduler.cost)
+
+    def test_no_retry_of_permanent_failures(self):
+        with GitHubStandIn(_members(25, set())) as server:
+            server.failing_users = {"user-3"}
+            handler = InactiveUserHandler("org", "org-id", "2024-01-01T00:00:00Z", "token", graphql_url=server.graphql_url, max_workers=1)
+            with self.assertRaisesRegex(RequestFailed, "status code of 401"):
+                handler.get_inactive_users()
+            # member page and one activity query, the batch is neither split nor retried
+            self.assertEqual(2, server.requests)
+
+            server.failing_users = set()
+            server.requests = 0
+            server.inject(200, body={"errors": [{"message": "Field 'user' doesn't exist on type 'Query'"}]})
+            with self.assertRaisesRegex(RequestFailed, "doesn't exist"):
+                handler._check_activity(["user-0", "user-1"])
+            self.assertEqual(1, server.requests)
+
+    def test_split_transient_failures(self):
+        with GitHubStandIn(_members(4, {"user-2"})) as server:
+            handler = InactiveUserHandler("org", "org-id", "2024-01-01T00:00:00Z", "token", graphql_url=server.graphql_url)
+            handler.scheduler.sleep = lambda seconds: None
+            server.inject(200, body={"data": None, "errors": [{"type": "RESOURCE_LIMITS_EXCEEDED", "message": "resource limits exceeded"}]})
+            users = [f"user-{i}" for i in range(4)]
+            self.assertEqual({"user-0": True, "user-1": True, "user-2": False, "user-3": True}, handler._check_activity(users))
+            # failed batch and its two halves
+            self.assertEqual(3, server.requests)
+
+    def test_resume_interrupted_scan(self):
+        inactive = {"user-3", "user-117", "user-230"}
+        with tempfile.TemporaryDirectory() as tmp, GitHubStandIn(_members(250, inactive, "2025-06-01T00:00:00Z")) as server:
+            checkpoint = f"{tmp}/checkpoint.json"
+            handler = InactiveUserHandler(
+                "org", "org-id", "2024-01-01T00:00:00Z", "token", graphql_url=server.graphql_url, max_workers=1, batch_size=50
+            )
+            expected = handler.get_inactive_users()
+
+            # scan is interrupted on the third page, first two pages are checkpointed
+            server.failing_users = {"user-210"}
+            with self.assertRaisesRegex(Exception, "status code of 401"):
+                handler.get_inactive_users(checkpoint, resume=True)
+            with open(checkpoint) as stream:
+                self.assertEqual("200", json.load(stream)["cursor"])
+
+            # resumed scan only checks the remaining page
+            server.failing_users = set()
+            server.requests = 0
+            self.assertEqual(expected, handler.get_inactive_users(checkpoint, resume=True))
+            self.assertEqual(2, server.requests)
+            self.assertFalse(os.path.exists(checkpoint))
+
+            # checkpoint of another activity date is ignored
+            handler._write_checkpoint(checkpoint, "200", {})
+            handler.activity_date = "2025-01-01T00:00:00Z"
+            server.requests = 0
+            self.assertEqual(expected, handler.get_inactive_users(checkpoint, resume=True))
+            self.assertEqual(8, server.requests)
+
+    def test_activity_store(self):
+        inactive = {"user-3", "user-17"}
+        members = _members(20, inactive, "2024-09-20T00:00:00Z") | {f"user-{i}": "2024-12-01T00:00:00Z" for i in range(20, 30)}
+        with tempfile.TemporaryDirectory() as tmp, GitHubStandIn(members) as server:
+            store_path = f"{tmp}/activity.json"
+
+            def scan(activity_date, recent_date):
+                handler = InactiveUserHandler(
+                    "org", "org-id", activity_date, "token", graphql_url=server.graphql_url, activity_store=ActivityStore(store_path, "org")
+                )
+                handler.recent_date = recent_date
+                server.checked_users = []
+                return handler.get_inactive_users()
+
+            self.assertEqual(inactive, scan("2024-01-01T00:00:00Z", "2024-10-01T00:00:00Z"))
+            self.assertEqual(30, len(server.checked_users))
+            with open(store_path) as stream:
+                self.assertEqual({f"user-{i}": "2024-10-01T00:00:00Z" for i in range(20, 30)}, json.load(stream)["org"])
+
+            # recently active users are not checked again until the cutoff gets close to their known activity
+            self.assertEqual(inactive, scan("2024-02-01T00:00:00Z", "2024-11-01T00:00:00Z"))
+            self.assertEqual(list(members)[:20], sorted(server.checked_users, key=lambda u: int(u.split("-")[1])))
+            self.assertEqual(inactive, scan("2024-09-15T00:00:00Z", "2025-06-15T00:00:00Z"))
+            self.assertEqual(30, len(server.checked_users))
+
+            # other ISO 8601 forms of --sincedate
+            self.assertEqual(inactive, scan("2024-02-01", "2025-07-01T00:00:00Z"))
+            self.assertEqual(inactive, scan("2024-02-01T00:00:00+00:00", "2025-08-01T00:00:00Z"))
+
+    def test_recent_activity_null(self):
+        with tempfile.TemporaryDirectory() as tmp, GitHubStandIn(_members(1, set())) as server:
+            store = ActivityStore(f"{tmp}/activity.json", "org")
+            handler = InactiveUserHandler("org", "org-id", "2024-01-01", "token", graphql_url=server.graphql_url, activity_store=store)
+            server.inject(200, body={"data": {"u0": {"contributionsCollection": {"hasAnyContributions": True}, "recent": None}}})
+            self.assertEqual({"user-0": True}, handler._get_activity(["user-0"]))
+            self.assertIsNone(store.get("user-0"))
+
+    def test_delete_inactive_contributors(self):
+        contributors = """# contributors per org
+orgs:
+  cloudfoundry:
+    contributors:
+    - alice  # since 2020
+    - Bob
+    # bots
+    - "carol-bot"
+    - dave
+  other:
+    contributors:
+    - bob
+"""
+        expected = """# contributors per org
+orgs:
+  cloudfoundry:
+    contributors:
+    # bots
+    - "carol-bot"
+    - dave
+  other:
+    contributors:
+    - bob
+"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = f"{tmp}/contributors.yml"
+            with open(path, "w") as stream:
+                stream.write(contributors)
+            handler = InactiveUserHandler("cloudfoundry", "org-id", "2024-01-01T00:00:00Z", "token")
+            handler.delete_inactive_contributors({"ALICE", "bob", "unknown"}, path)
+            with open(path) as stream:
+                self.assertEqual(expected, stream.read())
+
+            # flow style list is rewritten
+            with open(path, "w") as stream:
+                stream.write("orgs:\n  cloudfoundry:\n    contributors: [alice, bob]\n")
+            handler.delete_inactive_contributors({"alice"}, path)
+            with open(path) as stream:
+                self.assertEqual({"orgs": {"cloudfoundry": {"contributors": ["bob"]}}}, yaml.safe_load(stream))
+
+            # org or contributors missing
+            for content in ["orgs:\n  other:\n    contributors: [bob]\n", "orgs:\n  cloudfoundry: {}\n", ""]:
+                with open(path, "w") as stream:
+                    stream.write(content)
+                with self.assertRaisesRegex(ValueError, "Missing orgs"):
+                    handler.delete_inactive_contributors({"alice"}, path)